@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Fixed vs adaptive (closed-loop) click rate against a slow backend.
+
+Runs ClickerThread on a RecordingBackend that sleeps ``latency`` plus up to
+``jitter`` seconds inside every click, once with the plain deadline scheduler
+and once with set_adaptive(True), and reports the CPM achieved over the last
+``--measure`` seconds of each run together with the controller status.
+
+    python benchmarks/bench_adaptive.py --cpm 12000 --latency 0 --jitter 0.0065 --duration 6
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import ClickerThread
+
+
+def run(cpm, adaptive, args):
+    backend = RecordingBackend(latency=args.latency, latency_jitter=args.jitter, seed=args.seed)
+    clicker = ClickerThread(backend=backend)
+    clicker.start()
+    clicker.set_speed(cpm)
+    clicker.set_adaptive(adaptive, tolerance=args.tolerance)
+    clicker.set_active(True)
+    time.sleep(args.duration)
+    clicker.stop()
+    clicker.join()
+
+    stamps = backend.recorded()
+    window = [t for t in stamps if t >= stamps[-1] - args.measure]
+    achieved = (len(window) - 1) * 60.0 / (window[-1] - window[0]) if len(window) > 1 else 0.0
+    status = clicker.rate_controller.status.value if adaptive else "-"
+    print(f"{'adaptive' if adaptive else 'fixed':>9}  {achieved:>9.1f} CPM  "
+          f"({(achieved / cpm - 1) * 100:+6.2f} %)  status={status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cpm", type=int, default=12000)
+    parser.add_argument("--latency", type=float, default=0.0, help="fixed seconds per click")
+    parser.add_argument("--jitter", type=float, default=0.0065, help="extra uniform seconds per click")
+    parser.add_argument("--duration", type=float, default=6.0)
+    parser.add_argument("--measure", type=float, default=2.0, help="trailing seconds to measure")
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(f"target {args.cpm} CPM, backend latency {args.latency * 1000:.2f} ms "
+          f"+ U(0, {args.jitter * 1000:.2f}) ms")
+    for adaptive in (False, True):
+        run(args.cpm, adaptive, args)
+
+
+if __name__ == "__main__":
+    main()
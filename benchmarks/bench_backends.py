@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Per-click cost of each click backend.
+
+Calls ``backend.click()`` back-to-back (no scheduler) and reports clicks/sec
+and microseconds per click. The X11 backends need a display; run headless
+under Xvfb:
+
+    xvfb-run -a python benchmarks/bench_backends.py --clicks 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import BACKENDS, BUTTON_LEFT, create_backend
+
+
+def bench(name, clicks, burst):
+    try:
+        backend = create_backend(name)
+    except (OSError, ImportError) as e:
+        print(f"{name:>10}  skipped ({e})")
+        return
+    calls = max(1, clicks // burst)
+    try:
+        backend.click(BUTTON_LEFT, 1)  # Warm up connections / lazy setup
+        start = time.perf_counter()
+        for _ in range(calls):
+            backend.click(BUTTON_LEFT, burst)
+        elapsed = time.perf_counter() - start
+    finally:
+        backend.close()
+    total = calls * burst
+    print(f"{name:>10}  {total / elapsed:>12,.0f} clicks/s  {elapsed / total * 1e6:>8.2f} us/click")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=10000)
+    parser.add_argument("--burst", type=int, default=1, help="clicks per backend call")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+    print(f"{args.clicks} clicks per backend, burst={args.burst}")
+    for name in args.backends:
+        bench(name, args.clicks, args.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Exactness of click and time budgets at MAX_CPM.
+
+Runs ClickerThread on the recording backend with a click budget (for
+several burst sizes) and with a time budget, a number of times each, and
+checks every run: exactly the budgeted clicks, and for time budgets
+exactly the clicks whose deadlines fall inside the limit, the last one
+before it. Runs use the catch-up policy, so a late wakeup can't drop a
+deadline and change the count. Also reports how long after the limit the
+clicker switched itself off. Exits non-zero if any run is off:
+
+    python benchmarks/bench_budget.py --runs 5 --clicks 5000 --seconds 2
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import MAX_CPM, ClickerThread
+from scheduler import CatchUpPolicy
+
+
+def run(backend, clicks=None, seconds=None, burst=1):
+    """One budgeted run; returns (clicks recorded, seconds from the limit to the switch-off)."""
+    backend.reset()
+    clicker = ClickerThread(backend=backend, catch_up_policy=CatchUpPolicy.CATCH_UP)
+    clicker.set_speed(MAX_CPM)
+    clicker.set_burst(burst)
+    clicker.set_budget(clicks, seconds)
+    finished = threading.Event()
+    ended = []
+
+    def on_finished(reason):
+        ended.append(time.perf_counter())
+        finished.set()
+
+    clicker.on_finished = on_finished
+    clicker.start()
+    clicker.set_active(True)
+    if not finished.wait(60.0):
+        raise RuntimeError("Budgeted run never finished")
+    overrun = ended[0] - (clicker.run_started_at + seconds) if seconds is not None else 0.0
+    time.sleep(0.05)  # Anything sent after the switch-off would show up here
+    clicker.stop()
+    clicker.join()
+    return backend.count, overrun
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--clicks", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    backend = RecordingBackend()
+    failures = 0
+    for burst in (1, 3, 7):
+        counts = [run(backend, clicks=args.clicks, burst=burst)[0] for _ in range(args.runs)]
+        failures += sum(count != args.clicks for count in counts)
+        print(f"click budget {args.clicks}, burst {burst}: recorded {sorted(set(counts))} over {args.runs} runs")
+
+    interval = 60.0 / MAX_CPM
+    expected = math.ceil(args.seconds / interval - 1e-9)  # Deadlines 0, interval, ... strictly before the limit
+    counts, overruns = [], []
+    for _ in range(args.runs):
+        count, overrun = run(backend, seconds=args.seconds)
+        counts.append(count)
+        overruns.append(overrun)
+        last = backend.recorded()[-1] - backend.recorded()[0]
+        if last >= args.seconds:
+            failures += 1
+            print(f"  click sent {last - args.seconds:.6f}s past the limit")
+    failures += sum(count != expected for count in counts)
+    print(f"time budget {args.seconds:g}s at {MAX_CPM} CPM: recorded {sorted(set(counts))} (expected {expected}), "
+          f"switched off {statistics.median(overruns) * 1e3:.3f} ms after the limit (median)")
+    if failures:
+        print(f"{failures} run(s) off budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
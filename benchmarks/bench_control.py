@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Load test for the control socket.
+
+Starts a ClickerThread (null backend, clicking at --cpm) behind a
+ControlServer, then has --clients concurrent connections send --commands
+commands in total (request-reply) while
+--subscribers more connections stream stats. Reports commands per second,
+round-trip latency percentiles for a lone client and under load (an upper
+bound on command-to-engine latency), the server-side cost of applying one
+command, and the click loop's interval error with and without the load.
+The load mix leaves the rate alone (activate/stats/ping) so interval
+errors stay comparable; the clients share the CPU with the server:
+
+    python benchmarks/bench_control.py --clients 50 --commands 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import NullBackend
+from control import ControlServer
+from engine import ClickerThread
+from timing import percentile
+
+COMMANDS = (b"activate\n", b"stats\n", b"ping\n")
+
+
+async def client(path, count, round_trips):
+    reader, writer = await asyncio.open_unix_connection(path)
+    for i in range(count):
+        sent = time.perf_counter()
+        writer.write(COMMANDS[i % len(COMMANDS)])
+        reply = await reader.readline()
+        round_trips.append(time.perf_counter() - sent)
+        if not reply.startswith(b"ok"):
+            raise RuntimeError(f"Unexpected reply {reply!r}")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def subscriber(path, hz, stop, events):
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(f"subscribe {hz}\n".encode())
+    await reader.readline()
+    while not stop.is_set():
+        try:
+            line = await asyncio.wait_for(reader.readline(), 0.2)
+        except TimeoutError:
+            continue
+        if line.startswith(b"event"):
+            events[0] += 1
+    writer.close()
+
+
+async def lone_client(path, count):
+    round_trips = []
+    await client(path, count, round_trips)
+    return sorted(round_trips)
+
+
+async def load(path, clients, commands, subscribers, hz):
+    round_trips = []
+    events = [0]
+    stop = asyncio.Event()
+    streams = [asyncio.ensure_future(subscriber(path, hz, stop, events)) for _ in range(subscribers)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client(path, commands // clients, round_trips) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*streams)
+    return round_trips, elapsed, events[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--subscribers", type=int, default=10)
+    parser.add_argument("--hz", type=float, default=20)
+    parser.add_argument("--cpm", type=int, default=3000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "control.sock")
+    clicker = ClickerThread(backend=NullBackend())
+    clicker.set_speed(args.cpm)
+    clicker.start()
+    server = ControlServer(clicker, path)
+    server.start()
+
+    started = time.perf_counter()
+    for i in range(args.commands):
+        server.execute("speed", "3000" if i & 1 else "2400")
+    apply_us = (time.perf_counter() - started) / args.commands * 1e6
+    clicker.set_speed(args.cpm)
+    lone = asyncio.run(lone_client(path, 2000))
+
+    clicker.set_active(True)
+    time.sleep(2.0)
+    quiet = clicker.timing.stats(clicker.timing.total_ticks)
+    ticks_before = clicker.timing.total_ticks
+    round_trips, elapsed, events = asyncio.run(load(path, args.clients, args.commands, args.subscribers, args.hz))
+    loaded = clicker.timing.stats(clicker.timing.total_ticks - ticks_before)
+    server.stop()
+    clicker.stop()
+    clicker.join()
+
+    round_trips.sort()
+    print(f"lone client round trip: p50 {percentile(lone, 50) * 1e3:.3f} ms, p99 {percentile(lone, 99) * 1e3:.3f} ms")
+    print(f"{len(round_trips)} commands from {args.clients} clients, {args.subscribers} subscribers at {args.hz:g} Hz")
+    print(f"  throughput: {len(round_trips) / elapsed:,.0f} commands/s ({events} stats events streamed)")
+    print(f"  round trip: p50 {percentile(round_trips, 50) * 1e3:.3f} ms, "
+          f"p99 {percentile(round_trips, 99) * 1e3:.3f} ms, max {round_trips[-1] * 1e3:.3f} ms")
+    print(f"  applying one command on the server: {apply_us:.1f} us")
+    print(f"  click interval error p99: {quiet.p99_error_ms:.3f} ms idle, {loaded.p99_error_ms:.3f} ms under load")
+
+
+if __name__ == "__main__":
+    main()
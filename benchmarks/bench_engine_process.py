@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Click interval jitter with the engine in-process vs in a child process.
+
+While the clicker runs, the main thread keeps the GIL busy with pure-Python
+work, standing in for stylesheet application and layout passes in the GUI.
+Clicks go to the recording backend, so no display is needed:
+
+    python benchmarks/bench_engine_process.py --cpm 3000 --duration 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import ClickerThread
+from engine_process import ProcessClicker
+
+
+def busy_gui(seconds, busy):
+    """Holds the GIL in bursts of Python work, like a busy Qt event loop."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        if busy:
+            sum(i * i for i in range(20000))
+        else:
+            time.sleep(0.01)
+
+
+def run(mode, busy, args):
+    clicker = ClickerThread(backend=RecordingBackend()) if mode == "thread" else ProcessClicker("recording")
+    clicker.start()
+    time.sleep(0.5)  # Let a child process finish importing
+    clicker.set_speed(args.cpm)
+    clicker.set_active(True)
+    busy_gui(args.duration, busy)
+    stats = clicker.timing.stats()
+    clicker.stop()
+    clicker.join()
+    print(f"{mode:>8} {'busy' if busy else 'idle':>5}  {stats.achieved_cpm:>8.1f} CPM  "
+          f"p50 {stats.p50_error_ms:7.3f} ms  p99 {stats.p99_error_ms:7.3f} ms  "
+          f"max {stats.max_error_ms:7.3f} ms  ({stats.samples} intervals)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cpm", type=int, default=3000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    for mode in ("thread", "process"):
+        for busy in (False, True):
+            run(mode, busy, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Cost of GUI state updates: expand/collapse toggles and signal-driven updates.
+
+Builds the real MilkyClickerApp on a recording backend (offscreen Qt
+platform unless QT_QPA_PLATFORM is set) and measures:
+
+- one expand/collapse toggle including its render and the Qt event
+  processing it causes, with the precomputed window sizes and text cache,
+  and with both cleared before every toggle (what every toggle used to pay)
+- a burst of status/speed/notification signals: how many render passes
+  it costs and the time per signal
+- a slider drag across the whole range while clicking: time per step and
+  how often the clicker was actually retuned
+
+    python benchmarks/bench_gui.py --toggles 200 --updates 3000 --drag-seconds 2
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import engine
+import main
+from backends import RecordingBackend
+
+
+def settle(app, window):
+    """Runs a pending render now instead of waiting for the frame timer."""
+    if window.render_timer.isActive():
+        window.render_timer.stop()
+        window._render()
+    app.processEvents()
+
+
+def time_toggles(app, window, toggles, cold):
+    timings = []
+    for _ in range(toggles):
+        if cold:
+            window._window_sizes.clear()
+            window._label_texts.clear()
+        started = time.perf_counter()
+        window.toggle_expand()
+        settle(app, window)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--toggles", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=3000)
+    parser.add_argument("--drag-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    with mock.patch.object(engine, "PynputBackend", RecordingBackend):  # Never touch the real mouse
+        window = main.MilkyClickerApp()
+    window.show()
+    window.stats_timer.timeout.disconnect()  # Keep live stats out of the figures
+    settle(app, window)
+
+    warm_us = time_toggles(app, window, args.toggles, cold=False)
+    cold_us = time_toggles(app, window, args.toggles, cold=True)
+    print(f"toggle: {warm_us:8.1f} us median with cached sizes and texts, {cold_us:8.1f} us with caches cleared")
+
+    renders = 0
+    original_render = window._render
+
+    def counting_render():
+        nonlocal renders
+        renders += 1
+        original_render()
+
+    window.render_timer.timeout.disconnect()
+    window.render_timer.timeout.connect(counting_render)
+    main.log.disabled = True  # Notifications are logged; keep console output out of the timing
+    started = time.perf_counter()
+    for i in range(args.updates):
+        window.update_status_signal.emit(i % 2 == 0)
+        window.update_speed_display_signal.emit(main.MIN_CPM + i % 3000)
+        window.show_notification_signal.emit(f"update {i}")
+        if i % 100 == 99:
+            app.processEvents()  # Event loop turns interleaved with the burst
+    while window.render_timer.isActive():
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+    main.log.disabled = False
+    signals = 3 * args.updates
+    print(f"updates: {signals} signals -> {renders} render passes, {elapsed / signals * 1e6:.2f} us per signal")
+
+    # Drag: one valueChanged per step, the event loop turning every few steps like a real drag
+    retunes = 0
+    clicker_set_speed = window.clicker_thread.set_speed
+
+    def counting_set_speed(cpm):
+        nonlocal retunes
+        retunes += 1
+        clicker_set_speed(cpm)
+
+    window.clicker_thread.set_speed = counting_set_speed
+    if not window._is_expanded:
+        window.toggle_expand()
+    window.activate_clicker()
+    steps = main.MAX_CPM - main.MIN_CPM
+    step_time = args.drag_seconds / steps
+    started = time.perf_counter()
+    for step in range(steps + 1):
+        window.speed_slider.setValue(main.MIN_CPM + step)
+        while time.perf_counter() - started < step * step_time:
+            app.processEvents()
+    handler_us = 0.0
+    for step in range(1000):  # Handler cost alone, without the paced event processing
+        t = time.perf_counter()
+        window.speed_slider.setValue(main.MAX_CPM - step)
+        handler_us += time.perf_counter() - t
+    settle(app, window)
+    print(f"drag: {steps} steps over {args.drag_seconds:g}s -> {retunes} clicker retunes, "
+          f"{handler_us / 1000 * 1e6:.2f} us per step in the slider handler")
+
+    window.close_app()
+
+
+if __name__ == "__main__":
+    benchmark()
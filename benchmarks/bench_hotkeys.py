@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Hotkey pipeline cost and press-to-state-change latency.
+
+Feeds KeyboardListener's press/release handlers directly (no keyboard hook,
+no display needed) with a user holding ``]`` under OS auto-repeat, bouncing
+keys and alternating ``]``/``[`` toggles. Reports the handler cost per
+event, how many events reached the callbacks, and the latency from press to
+the callback applying the state change. Finally presses a hold-to-click
+binding in front of a ClickerThread on the recording backend, with and
+without a busy main thread, and checks press-to-first-click latency against
+engine.ACTIVATION_LATENCY_BOUND:
+
+    python benchmarks/bench_hotkeys.py --repeats 100000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import ACTIVATION_LATENCY_BOUND, ClickerThread
+from hotkeys import ACTION_HOLD, KeyboardListener
+
+ACTIVATE_KEY = SimpleNamespace(char="]")
+DEACTIVATE_KEY = SimpleNamespace(char="[")
+SIDE_BUTTON = SimpleNamespace(name="x1")
+
+
+def press_to_first_click(presses, busy):
+    """Hold-to-click through the whole pipeline; returns latencies in ms."""
+    clicker = ClickerThread(backend=RecordingBackend())
+    listener = KeyboardListener(lambda pressed_at: clicker.set_active(True, pressed_at),
+                                lambda pressed_at: clicker.set_active(False, pressed_at),
+                                bindings={"mouse:x1": ACTION_HOLD}, debounce=0.0)
+    clicker.start()
+    clicker.set_speed(600)
+    drain = threading.Thread(target=listener._drain_events, daemon=True)
+    drain.start()
+    latencies = []
+    for _ in range(presses):
+        clicker.last_activation_latency = None
+        listener._on_click(0, 0, SIDE_BUTTON, True)
+        deadline = time.perf_counter() + 0.5
+        while clicker.last_activation_latency is None and time.perf_counter() < deadline:
+            if busy:
+                sum(i * i for i in range(20000))  # Holds the GIL like a busy GUI
+            else:
+                time.sleep(0.001)
+        listener._on_click(0, 0, SIDE_BUTTON, False)
+        latencies.append(clicker.last_activation_latency * 1000.0)
+        time.sleep(0.02)
+    listener._queue.put(None)
+    clicker.stop()
+    clicker.join()
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=100_000, help="auto-repeat presses while ']' is held")
+    parser.add_argument("--toggles", type=int, default=200, help="separate ']' / '[' presses")
+    parser.add_argument("--holds", type=int, default=50, help="hold-to-click presses to time")
+    args = parser.parse_args()
+
+    changes = []
+
+    def on_change(active):
+        def apply(pressed_at):
+            changes.append(active)
+            listener.record_latency(pressed_at)
+        return apply
+
+    listener = KeyboardListener(on_change(True), on_change(False))
+    drain = threading.Thread(target=listener._drain_events, daemon=True)
+    drain.start()
+
+    started = time.perf_counter()
+    for _ in range(args.repeats):
+        listener._on_press(ACTIVATE_KEY)  # First is the real press, the rest auto-repeat
+    elapsed = time.perf_counter() - started
+    listener._on_release(ACTIVATE_KEY)
+    print(f"held ']' for {args.repeats} presses: {elapsed / args.repeats * 1e9:.0f} ns/press, "
+          f"{listener.coalesced} coalesced")
+
+    for i in range(args.toggles):
+        key = DEACTIVATE_KEY if i % 2 == 0 else ACTIVATE_KEY
+        listener._on_press(key)
+        listener._on_press(key)  # Auto-repeat
+        listener._on_release(key)
+        listener._on_press(key)  # Contact bounce right after release
+        listener._on_release(key)
+        time.sleep(listener.debounce)  # The next deliberate press comes later
+
+    listener._queue.put(None)
+    drain.join()
+    presses = args.repeats + 3 * args.toggles
+    samples, p50, p99, worst = listener.latency_stats()
+    print(f"{presses} presses -> {len(changes)} state changes "
+          f"({listener.coalesced} coalesced, {listener.debounced} debounced, {listener.unchanged} no-op, "
+          f"{listener.dropped} dropped)")
+    print(f"press-to-state-change latency: p50 {p50:.3f} ms  p99 {p99:.3f} ms  max {worst:.3f} ms "
+          f"({samples} samples)")
+
+    bound_ms = ACTIVATION_LATENCY_BOUND * 1000.0
+    for busy in (False, True):
+        latencies = press_to_first_click(args.holds, busy)
+        within = sum(latency <= bound_ms for latency in latencies)
+        print(f"hold-to-click press-to-first-click ({'busy' if busy else 'idle'} main thread): "
+              f"p50 {latencies[len(latencies) // 2]:.3f} ms  max {latencies[-1]:.3f} ms  "
+              f"{within}/{len(latencies)} within the {bound_ms:.0f} ms bound")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Jitter table cost, distribution shape and rate accuracy.
+
+For each distribution: time to generate one block, cost of ``next()`` within
+a block (what the click loop pays) next to a per-click ``random.gauss``
+call, the cost amortized over background refills (on a single core these
+share the CPU with the reader), the mean and spread of the factors,
+whether two tables with the same seed agree, and the CPM ClickerThread
+achieves with the jitter on (recording backend, no display needed):
+
+    python benchmarks/bench_jitter.py --cpm 3000 --spread 0.2 --duration 3
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import ClickerThread
+from jitter import DISTRIBUTIONS, JitterTable
+
+READS = 200_000
+
+
+def per_call_ns(function, reads=READS):
+    started = time.perf_counter()
+    for _ in range(reads):
+        function()
+    return (time.perf_counter() - started) / reads * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cpm", type=int, default=3000)
+    parser.add_argument("--spread", type=float, default=0.2)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"random.gauss per call: {per_call_ns(lambda: rng.gauss(1.0, args.spread)):.0f} ns")
+    for distribution in DISTRIBUTIONS:
+        table = JitterTable(distribution, args.spread, seed=args.seed)
+        started = time.perf_counter()
+        table._generate()
+        block_ms = (time.perf_counter() - started) * 1000.0
+        read_ns = per_call_ns(table.next, table.block_size - 1)
+        amortized_ns = per_call_ns(table.next)
+        samples = [table.next() for _ in range(READS)]
+        mean = math.fsum(samples) / len(samples)
+        stdev = math.sqrt(math.fsum((s - mean) ** 2 for s in samples) / len(samples))
+        twin_a = JitterTable(distribution, args.spread, seed=args.seed)
+        twin_b = JitterTable(distribution, args.spread, seed=args.seed)
+        reproducible = all(twin_a.next() == twin_b.next() for _ in range(3 * twin_a.block_size))
+        for closing in (table, twin_a, twin_b):
+            closing.close()
+
+        clicker = ClickerThread(backend=RecordingBackend())
+        clicker.start()
+        clicker.set_speed(args.cpm)
+        clicker.set_jitter(JitterTable(distribution, args.spread, seed=args.seed))
+        clicker.set_active(True)
+        time.sleep(args.duration)
+        clicker.stop()
+        clicker.join()
+        stats = clicker.timing.stats()
+        print(f"{distribution:>9}  block {block_ms:6.2f} ms  next() {read_ns:4.0f} ns ({amortized_ns:4.0f} amortized)  "
+              f"mean {mean:.4f}  stdev {stdev:.4f}  min {min(samples):.3f}  max {max(samples):.3f}  "
+              f"seeded twins agree: {reproducible}  "
+              f"{stats.achieved_cpm:8.1f} CPM (target {args.cpm}), p99 error {stats.p99_error_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Cost of a log call on the calling thread, direct vs through logpipe.
+
+Times ``log.error`` on the caller with the RichHandler attached directly
+(formatting and console output inline, as before) and with the queued
+pipeline (the caller only enqueues). Also shows the dedup stage collapsing
+a burst of identical click errors into one line plus one summary. Output
+goes to /dev/null so only the logging work is measured:
+
+    python benchmarks/bench_logging.py --calls 5000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from logpipe import LogPipeline
+
+
+def rich_handler(stream):
+    from rich.console import Console
+    from rich.logging import RichHandler
+    handler = RichHandler(console=Console(file=stream, width=120), show_path=False)
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    return handler
+
+
+def time_calls(log, calls, distinct):
+    """Mean caller-side microseconds per call."""
+    started = time.perf_counter()
+    for i in range(calls):
+        # Distinct messages, so the dedup stage does not hide the output cost
+        log.error(f"Clicking error: backend unavailable ({i if distinct else 0})")
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    log = logging.getLogger("rich")
+    with open(os.devnull, "w") as devnull:
+        root.addHandler(rich_handler(devnull))
+        direct_us = time_calls(log, args.calls, distinct=True)
+        root.handlers.clear()
+
+        pipeline = LogPipeline(rich_handler(devnull)).install()
+        queued_us = time_calls(log, args.calls, distinct=True)
+        started = time.perf_counter()
+        pipeline.stop()
+        drain_ms = (time.perf_counter() - started) * 1000.0
+        root.handlers.clear()
+
+        print(f"{args.calls} distinct error records")
+        print(f"  direct RichHandler: {direct_us:8.1f} us/call on the caller")
+        print(f"  logpipe queue:      {queued_us:8.1f} us/call on the caller "
+              f"(background drain finished {drain_ms:.0f} ms after the last call)")
+
+        pipeline = LogPipeline(rich_handler(devnull)).install()
+        time_calls(log, args.calls, distinct=False)
+        pipeline.stop()
+        root.handlers.clear()
+    _, lines = pipeline.ring.since(0)
+    print(f"{args.calls} identical error records -> {len(lines)} lines:")
+    for line in lines:
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Cost of leaving metrics on at MAX_CPM.
+
+Runs ClickerThread at MAX_CPM on the null backend twice, without and with
+a MetricsExporter (HTTP, scraped every --scrape seconds), and compares the
+achieved CPM and interval error. Also times one fold of a second's worth
+of ticks and one render:
+
+    python benchmarks/bench_metrics.py --duration 5 --scrape 0.1
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import NullBackend
+from engine import MAX_CPM, ClickerThread
+from metrics import MetricsCollector, MetricsExporter
+
+
+def run(duration, scrape):
+    clicker = ClickerThread(backend=NullBackend())
+    clicker.set_speed(MAX_CPM)
+    clicker.start()
+    exporter = None
+    scrapes = 0
+    if scrape:
+        exporter = MetricsExporter(MetricsCollector(clicker), port=0)
+        exporter.start()
+    clicker.set_active(True)
+    ends = time.perf_counter() + duration
+    while time.perf_counter() < ends:
+        if exporter is not None:
+            urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics").read()
+            scrapes += 1
+        time.sleep(scrape or duration)
+    stats = clicker.timing.stats()
+    clicker.stop()
+    clicker.join()
+    if exporter is not None:
+        exporter.stop()
+    return stats, scrapes, exporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--scrape", type=float, default=0.1, help="seconds between HTTP scrapes")
+    args = parser.parse_args()
+
+    for label, scrape in (("metrics off", 0.0), ("metrics on ", args.scrape)):
+        stats, scrapes, exporter = run(args.duration, scrape)
+        extra = f", {scrapes} scrapes" if exporter is not None else ""
+        print(f"{label}: {stats.achieved_cpm:8.1f} CPM (target {MAX_CPM}), interval error "
+              f"p50 {stats.p50_error_ms:.3f} ms / p99 {stats.p99_error_ms:.3f} ms{extra}")
+
+    # Fold and render cost for one export interval of ticks at MAX_CPM
+    clicker = ClickerThread(backend=NullBackend())
+    collector = MetricsCollector(clicker)
+    ticks_per_second = MAX_CPM // 60
+    now = time.perf_counter()
+    for i in range(ticks_per_second):
+        clicker.timing.record(now + i * 0.005, 1, 0.005)
+    started = time.perf_counter()
+    collector.fold()
+    fold_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    collector.render()
+    render_ms = (time.perf_counter() - started) * 1000.0
+    print(f"fold of {ticks_per_second} ticks: {fold_ms:.3f} ms, render: {render_ms:.3f} ms "
+          f"(fold once per second, render per scrape; both off the click loop)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Timing accuracy of many click jobs: one MultiClicker vs one ClickerThread per job.
+
+Every job gets a seeded random rate between ``--min-cpm`` and ``--max-cpm``.
+For each job count the MultiClicker run reports how late ticks fired
+(p50/p99/max) and the delivered clicks as a share of the expected ones;
+the thread-per-job run reports the same share and the worst per-thread
+p99 interval error. Clicks go to NullBackends, so no display is needed:
+
+    python benchmarks/bench_multiclick.py --jobs 1 10 100 300 500 --duration 3
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import NullBackend
+from engine import ClickerThread
+from multiclick import MultiClicker
+
+
+def expected_clicks(cpms, duration):
+    # Every job fires at t=0 and then once per interval
+    return sum(math.floor(duration * cpm / 60.0) + 1 for cpm in cpms)
+
+
+def rates(count, args):
+    rng = random.Random(args.seed)
+    return [rng.randint(args.min_cpm, args.max_cpm) for _ in range(count)]
+
+
+def run_multiclicker(cpms, duration):
+    backend = NullBackend()
+    clicker = MultiClicker(backend=backend)
+    for cpm in cpms:
+        clicker.add_job(cpm)
+    clicker.start()
+    clicker.set_active(True)
+    time.sleep(duration)
+    clicker.stop()
+    clicker.join()
+    _, p50, p99, worst = clicker.lateness_stats()
+    expected = expected_clicks(cpms, duration)
+    return (f"late p50 {p50:7.3f} ms  p99 {p99:7.3f} ms  max {worst:7.3f} ms  "
+            f"delivered {backend.clicks / expected * 100:6.1f} %")
+
+
+def run_threads(cpms, duration):
+    clickers = [ClickerThread(backend=NullBackend()) for _ in cpms]
+    for clicker, cpm in zip(clickers, cpms):
+        clicker.set_speed(cpm)
+        clicker.start()
+    for clicker in clickers:
+        clicker.set_active(True)
+    time.sleep(duration)
+    for clicker in clickers:
+        clicker.stop()
+    for clicker in clickers:
+        clicker.join()
+    expected = expected_clicks(cpms, duration)
+    delivered = sum(clicker.backend.clicks for clicker in clickers)
+    worst_p99 = max(clicker.timing.stats().p99_error_ms for clicker in clickers)
+    return f"worst p99 interval error {worst_p99:7.3f} ms  delivered {delivered / expected * 100:6.1f} %"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 10, 100, 300, 500])
+    parser.add_argument("--min-cpm", type=int, default=30)
+    parser.add_argument("--max-cpm", type=int, default=240)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-threads", action="store_true", help="skip the thread-per-job comparison")
+    args = parser.parse_args()
+    for count in args.jobs:
+        cpms = rates(count, args)
+        print(f"{count:>4} jobs ({sum(cpms) / 60.0:7.1f} clicks/s)")
+        print(f"     multiclicker  {run_multiclicker(cpms, args.duration)}")
+        if not args.no_threads:
+            print(f"     threads       {run_threads(cpms, args.duration)}")
+
+
+if __name__ == "__main__":
+    main()
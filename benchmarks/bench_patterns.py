@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Pattern generation cost and pattern-mode click throughput.
+
+Generates grid, circle and random patterns of ``--targets`` points and
+times a bare move-then-click pass over every target on the recording
+backend (the per-target cost the click loop pays, i.e. its headroom above
+MAX_CPM). Then runs ClickerThread in pattern mode and checks that every tick
+moved to the next target in order and that the achieved rate matches:
+
+    python benchmarks/bench_patterns.py --targets 5000 --cpm 12000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import ClickerThread
+from patterns import circle, grid, random_in_rect
+
+
+def timed(label, build):
+    started = time.perf_counter()
+    pattern = build()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>7}  {len(pattern):>8} targets in {elapsed * 1000:8.2f} ms "
+          f"({elapsed / len(pattern) * 1e9:6.0f} ns/target)")
+    return pattern
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", type=int, default=5000)
+    parser.add_argument("--cpm", type=int, default=12000)
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    side = max(1, int(args.targets ** 0.5))
+    timed("grid", lambda: grid(0, 0, side, side, 4, 4))
+    timed("circle", lambda: circle(960, 540, 400, args.targets))
+    pattern = timed("random", lambda: random_in_rect(0, 0, 1920, 1080, args.targets, seed=1))
+
+    backend = RecordingBackend()
+    xs, ys, move_to, click = pattern.xs, pattern.ys, backend.move_to, backend.click
+    started = time.perf_counter()
+    for i in range(len(pattern)):
+        move_to(xs[i], ys[i])
+        click("left", 1)
+    elapsed = time.perf_counter() - started
+    print(f"move+click pass: {elapsed / len(pattern) * 1e9:.0f} ns/target "
+          f"(~{len(pattern) * 60 / elapsed:,.0f} CPM ceiling)")
+
+    backend.reset()
+    clicker = ClickerThread(backend=backend)
+    clicker.start()
+    clicker.set_speed(args.cpm)
+    clicker.set_burst(args.burst)
+    clicker.set_pattern(pattern)
+    clicker.set_active(True)
+    time.sleep(args.duration)
+    clicker.stop()
+    clicker.join()
+
+    stats = clicker.timing.stats()
+    ticks = clicker.timing.total_ticks
+    last = (ticks - 1) % len(pattern)
+    in_order = backend.moves == ticks and backend.position == (pattern.xs[last], pattern.ys[last])
+    print(f"pattern mode: {ticks} ticks over {len(pattern)} targets, {backend.count} clicks, "
+          f"{stats.achieved_cpm:.1f} CPM (target {args.cpm}), p99 error {stats.p99_error_ms:.3f} ms, "
+          f"targets visited in order: {in_order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Cost of compiling and running click programs.
+
+Times parse + compile of generated scripts with --steps steps (one block
+of clicks, double clicks and a move, repeated), then runs a program whose
+steps are all due at once on the null backend, so the click loop goes
+through it as fast as it can: reports the time per step and how many
+memory blocks the run left allocated (the loop itself allocates nothing
+that outlives a step):
+
+    python benchmarks/bench_program.py --steps 100000 1000000 --run-steps 200000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import NullBackend
+from engine import ClickerThread
+from program import ACTION_CLICK, ClickProgram, parse_program
+
+BLOCK = """\
+    speed 12000
+    click 50
+    pause 0.01
+    double 49
+    move 100 200
+"""
+BLOCK_STEPS = 100
+
+
+def script(steps):
+    return f"# {steps} steps\nrepeat {max(1, steps // BLOCK_STEPS)}\n{BLOCK}end\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--run-steps", type=int, default=200000)
+    args = parser.parse_args()
+
+    for steps in args.steps:
+        text = script(steps)
+        started = time.perf_counter()
+        program = parse_program(text)
+        elapsed = time.perf_counter() - started
+        print(f"compile {len(program):>9} steps: {elapsed * 1e3:8.2f} ms")
+
+    count = args.run_steps
+    program = ClickProgram(array("d", bytes(8 * count)), array("B", [ACTION_CLICK]) * count,
+                           array("B", bytes(count)), array("i", bytes(4 * count)), array("i", bytes(4 * count)), 0.0)
+    backend = NullBackend()
+    clicker = ClickerThread(backend=backend)
+    finished = threading.Event()
+    clicker.on_finished = lambda reason: finished.set()
+    clicker.set_program(program)
+    clicker.start()
+    time.sleep(0.1)
+    blocks = sys.getallocatedblocks()
+    started = time.perf_counter()
+    clicker.set_active(True)
+    finished.wait()
+    elapsed = time.perf_counter() - started
+    grown = sys.getallocatedblocks() - blocks
+    clicker.stop()
+    clicker.join()
+    print(f"run {count} steps: {elapsed / count * 1e6:.2f} us per step, {backend.clicks} clicks, "
+          f"{grown} memory blocks still allocated afterwards")
+
+
+if __name__ == "__main__":
+    main()
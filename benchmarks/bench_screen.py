@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Cost of screen-region triggers.
+
+For square regions of each --sizes edge length, reports the CPU time per
+sample (grab + test) of the colour, template and change conditions, and
+the sample-to-click latency: a RegionTrigger at --hz watches frames that
+flip between matching and not matching while a ClickerThread clicks on a
+recording backend, and every opening is timed from the start of the
+sample that saw it to the first click after it.
+
+Grabs come from the X server when $DISPLAY is set (run it under Xvfb for
+a repeatable screen) and from in-memory frames otherwise, in which case
+the figures cover the tests alone:
+
+    xvfb-run -s "-screen 0 1280x1024x24" python benchmarks/bench_screen.py
+    python benchmarks/bench_screen.py --sizes 16 64 256 --samples 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from backends import RecordingBackend
+from engine import MAX_CPM, ClickerThread
+from screen import (
+    ChangeCondition,
+    ColorCondition,
+    RegionTrigger,
+    ReplaySampler,
+    TemplateCondition,
+    XlibSampler,
+    solid_frame,
+)
+
+MATCH = (255, 0, 0)
+OTHER = (0, 0, 255)
+
+
+def make_sampler(size, frames):
+    if os.environ.get("DISPLAY"):
+        return XlibSampler(0, 0, size, size)
+    return ReplaySampler(size, size, frames)
+
+
+def cpu_per_sample(sampler, condition, samples):
+    started = time.thread_time()
+    for _ in range(samples):
+        condition(sampler.grab())
+    return (time.thread_time() - started) / samples
+
+
+def sample_to_click(size, hz, openings):
+    """Median and max seconds from the opening sample to the click."""
+    frames = [solid_frame(size, size, OTHER), solid_frame(size, size, MATCH)]
+    backend = RecordingBackend()
+    clicker = ClickerThread(backend=backend)
+    clicker.set_speed(MAX_CPM)
+    trigger = RegionTrigger(ReplaySampler(size, size, frames), ColorCondition(MATCH), rate=hz)
+    opened = threading.Semaphore(0)
+    latencies = []
+
+    def on_change(is_open, sampled_at):
+        clicker.gate_changed(sampled_at if is_open else None)
+        if is_open:
+            opened.release()
+
+    clicker.set_gate(trigger.is_open)
+    trigger.on_change = on_change
+    clicker.start()
+    clicker.set_active(True)
+    trigger.start()
+    for _ in range(openings):
+        opened.acquire()
+        while clicker.last_gate_latency is None:
+            time.sleep(0.0005)
+        latencies.append(clicker.last_gate_latency)
+        clicker.last_gate_latency = None
+    trigger.stop()
+    clicker.stop()
+    clicker.join()
+    return statistics.median(latencies), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 128, 256, 512])
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--hz", type=float, default=60)
+    parser.add_argument("--openings", type=int, default=20)
+    args = parser.parse_args()
+
+    source = f"X display {os.environ['DISPLAY']}" if os.environ.get("DISPLAY") else "in-memory frames"
+    print(f"CPU per sample ({source}), us:")
+    print(f"{'region':>9} {'grab':>9} {'color':>9} {'template':>9} {'change':>9}")
+    for size in args.sizes:
+        match = solid_frame(size, size, MATCH)
+        other = solid_frame(size, size, OTHER)
+        sampler = make_sampler(size, [match, other])
+        grab = cpu_per_sample(sampler, len, args.samples)
+        color = cpu_per_sample(sampler, ColorCondition(MATCH, tolerance=8), args.samples)
+        template = cpu_per_sample(sampler, TemplateCondition(match, tolerance=8), args.samples)
+        change = cpu_per_sample(sampler, ChangeCondition(), args.samples)
+        sampler.close()
+        print(f"{size:>4}x{size:<4} {grab * 1e6:9.1f} {color * 1e6:9.1f} {template * 1e6:9.1f} {change * 1e6:9.1f}")
+
+    print(f"sample-to-click latency at {args.hz:g} Hz sampling (colour condition, in-memory frames):")
+    for size in args.sizes:
+        median, worst = sample_to_click(size, args.hz, args.openings)
+        print(f"{size:>4}x{size:<4} p50 {median * 1e3:7.3f} ms, max {worst * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
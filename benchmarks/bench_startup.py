@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Time to first frame and peak RSS of the GUI, with the headless runner for comparison.
+
+Each run spawns a fresh interpreter. The GUI is started with the hidden
+``--startup-probe`` flag: it prints its figures once the first frame is
+painted and quits. The headless runner is timed until it exits after a
+zero-length run on the recording backend. Use ``--platform offscreen`` on
+machines without a display:
+
+    python benchmarks/bench_startup.py --runs 5 --platform offscreen
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def run_once(command, env):
+    started = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - started
+    report = next((json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")), {})
+    return elapsed, report
+
+
+def measure(label, command, env, runs):
+    timings, reports = [], []
+    for _ in range(runs):
+        elapsed, report = run_once(command, env)
+        timings.append(elapsed * 1000.0)
+        reports.append(report)
+    line = f"{label:>9}  median {statistics.median(timings):7.1f} ms  best {min(timings):7.1f} ms"
+    if reports[-1]:
+        line += (f"  peak RSS {reports[-1]['rss_mib']:6.1f} MiB  {reports[-1]['modules']} modules"
+                 f"  rich loaded before first frame: {reports[-1]['rich_loaded']}")
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--platform", default=None, help="QT_QPA_PLATFORM for the GUI (e.g. offscreen)")
+    args = parser.parse_args()
+    env = dict(os.environ)
+    if args.platform:
+        env["QT_QPA_PLATFORM"] = args.platform
+    measure("gui", [sys.executable, os.path.join(SRC, "main.py"), "--startup-probe"], env, args.runs)
+    measure("headless", [sys.executable, os.path.join(SRC, "headless.py"), "--backend", "recording",
+                         "--duration", "0", "--quiet"], env, args.runs)
+
+
+if __name__ == "__main__":
+    main()
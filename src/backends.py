@@ -0,0 +1,229 @@
+"""Click backends used by ClickerThread.
+
+A backend is anything with ``click(button, count)``, ``move_to(x, y)`` and
+``close()``. Keeping the OS input stack behind this interface lets the
+scheduler be measured on its own (NullBackend / RecordingBackend) on machines
+without a display or Accessibility permissions.
+"""
+import ctypes
+import ctypes.util
+import random
+import time
+from array import array
+from typing import Protocol
+
+BUTTON_LEFT = "left"
+BUTTON_RIGHT = "right"
+BUTTON_MIDDLE = "middle"
+BUTTONS = (BUTTON_LEFT, BUTTON_RIGHT, BUTTON_MIDDLE)
+
+DEFAULT_RECORDING_CAPACITY = 1 << 20  # ~87 min at 12000 CPM, 8 MiB
+
+_X11_BUTTON_CODES = {BUTTON_LEFT: 1, BUTTON_MIDDLE: 2, BUTTON_RIGHT: 3}  # X11 core button numbers
+
+
+class ClickBackend(Protocol):
+    """Interface ClickerThread drives. Implementations need not be thread-safe:
+    only the click loop calls ``click``."""
+
+    name: str
+
+    def click(self, button: str = BUTTON_LEFT, count: int = 1) -> None:
+        """Clicks ``button`` ``count`` times at the current cursor position."""
+        ...
+
+    def move_to(self, x: int, y: int) -> None:
+        """Moves the cursor to absolute screen coordinates (pattern mode)."""
+        ...
+
+    def close(self) -> None:
+        """Releases any OS resources held by the backend."""
+        ...
+
+
+class NullBackend:
+    """Discards every click. Measures the bare cost of the scheduler."""
+
+    name = "null"
+
+    def __init__(self) -> None:
+        self.clicks = 0
+        self.moves = 0
+
+    def click(self, button: str = BUTTON_LEFT, count: int = 1) -> None:
+        self.clicks += count
+
+    def move_to(self, x: int, y: int) -> None:
+        self.moves += 1
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingBackend:
+    """Timestamps every click into a preallocated ``array('d')``.
+
+    No allocation happens per click; once ``capacity`` clicks are stored,
+    further clicks are only counted in ``dropped``. ``latency`` (plus up to
+    ``latency_jitter``, uniformly distributed) is slept inside every call to
+    imitate the cost of a real OS input stack.
+    """
+
+    name = "recording"
+
+    def __init__(self, capacity: int = DEFAULT_RECORDING_CAPACITY,
+                 latency: float = 0.0, latency_jitter: float = 0.0, seed: int | None = None) -> None:
+        self.capacity = capacity
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self._rng = random.Random(seed)
+        self.timestamps = array("d", bytes(8 * capacity))  # perf_counter() values
+        self.count = 0
+        self.dropped = 0
+        self.moves = 0
+        self.position = (0, 0) # Last move_to() target
+
+    def click(self, button: str = BUTTON_LEFT, count: int = 1) -> None:
+        now = time.perf_counter()
+        for _ in range(count):
+            if self.count < self.capacity:
+                self.timestamps[self.count] = now
+                self.count += 1
+            else:
+                self.dropped += 1
+        if self.latency or self.latency_jitter:
+            time.sleep(self.latency + self.latency_jitter * self._rng.random())
+
+    def move_to(self, x: int, y: int) -> None:
+        self.moves += 1
+        self.position = (x, y)
+
+    def recorded(self) -> memoryview:
+        """Returns a zero-copy view of the timestamps recorded so far."""
+        return memoryview(self.timestamps)[:self.count]
+
+    def reset(self) -> None:
+        self.count = 0
+        self.dropped = 0
+        self.moves = 0
+
+    def close(self) -> None:
+        pass
+
+
+class PynputBackend:
+    """Clicks through ``pynput.mouse.Controller`` (the default backend)."""
+
+    name = "pynput"
+
+    def __init__(self) -> None:
+        # Imported here so the other backends work without a display server
+        from pynput import mouse
+
+        self._controller = mouse.Controller()
+        self._buttons = {name: getattr(mouse.Button, name) for name in BUTTONS}
+
+    def click(self, button: str = BUTTON_LEFT, count: int = 1) -> None:
+        self._controller.click(self._buttons[button], count)
+
+    def move_to(self, x: int, y: int) -> None:
+        self._controller.position = (x, y)
+
+    def close(self) -> None:
+        pass
+
+
+class XTestBackend:
+    """Clicks through the X11 XTest extension via ctypes (Linux/X11 only).
+
+    Skips pynput's generic python-xlib layer: one long-lived display
+    connection, two native calls per click and a single ``XFlush`` per
+    ``click()`` call, so a burst of ``count`` clicks costs one round trip.
+    ``flush_every`` batches flushes across calls for pure throughput runs,
+    at the cost of delaying clicks until the batch is sent.
+    """
+
+    name = "xtest"
+
+    def __init__(self, display_name: str | None = None, flush_every: int = 1) -> None:
+        x11_path = ctypes.util.find_library("X11")
+        xtst_path = ctypes.util.find_library("Xtst")
+        if not x11_path or not xtst_path:
+            raise OSError("XTest backend requires libX11 and libXtst")
+        self._x11 = ctypes.CDLL(x11_path)
+        self._xtst = ctypes.CDLL(xtst_path)
+
+        self._x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._x11.XOpenDisplay.restype = ctypes.c_void_p
+        self._x11.XFlush.argtypes = [ctypes.c_void_p]
+        self._x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self._xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        self._xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        self._xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                                    ctypes.c_ulong]
+
+        self._display = self._x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display_name or '(from $DISPLAY)'}")
+        ignored = [ctypes.c_int() for _ in range(4)]
+        if not self._xtst.XTestQueryExtension(self._display, *(ctypes.byref(v) for v in ignored)):
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+            raise OSError("X server does not support the XTest extension")
+
+        # Bound once so the click path does no attribute lookups on the CDLLs
+        self._fake_button = self._xtst.XTestFakeButtonEvent
+        self._fake_motion = self._xtst.XTestFakeMotionEvent
+        self._flush = self._x11.XFlush
+        self.flush_every = max(1, flush_every)
+        self._unflushed = 0
+
+    def click(self, button: str = BUTTON_LEFT, count: int = 1) -> None:
+        code = _X11_BUTTON_CODES[button]
+        display = self._display
+        for _ in range(count):
+            self._fake_button(display, code, 1, 0)  # press, CurrentTime
+            self._fake_button(display, code, 0, 0)  # release
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self._flush(display)
+            self._unflushed = 0
+
+    def move_to(self, x: int, y: int) -> None:
+        # Not flushed on its own: the click that follows flushes both events
+        self._fake_motion(self._display, -1, x, y, 0)  # Screen of the pointer, CurrentTime
+
+    def flush(self) -> None:
+        """Sends any batched events to the X server now."""
+        if self._display:
+            self._flush(self._display)
+            self._unflushed = 0
+
+    def close(self) -> None:
+        if self._display:
+            self.flush()
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+BACKENDS = {
+    NullBackend.name: NullBackend,
+    RecordingBackend.name: RecordingBackend,
+    PynputBackend.name: PynputBackend,
+    XTestBackend.name: XTestBackend,
+}
+
+
+def create_backend(name: str) -> ClickBackend:
+    """Instantiates a backend by its registry name.
+
+    Raises:
+        ValueError: If ``name`` is not a known backend.
+        OSError: If the backend is not usable on this machine (e.g. xtest
+            without an X server).
+    """
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown click backend '{name}'. Choose from: {', '.join(BACKENDS)}") from None
+    return backend_cls()
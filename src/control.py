@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Local control API: drive the clicker from other programs over a Unix socket.
+
+An asyncio server runs on its own thread, so any number of clients cost
+the GUI's event loop nothing. Commands are applied straight to the click
+engine (a lock and a condition notify), not routed through Qt.
+
+Protocol: one ASCII command per line, one reply line per command, in order.
+
+    activate | on           -> ok
+    deactivate | off        -> ok
+    speed <cpm>             -> ok <cpm applied (clamped)>
+    burst <n>               -> ok <n applied (clamped)>
+    stats                   -> ok active=1 cpm=600 burst=1 clicks=1234 achieved=599.8 p50_ms=0.004 p99_ms=0.210
+    subscribe [hz]          -> ok; then "event <same fields as stats>" lines at hz (default 10)
+    unsubscribe             -> ok
+    ping                    -> ok pong
+
+Anything else gets ``err <reason>`` and the connection stays open. As a
+client (``socat - UNIX-CONNECT:<path>`` works too):
+
+    python src/control.py activate
+    python src/control.py speed 1200 stats
+    python src/control.py subscribe 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+from engine import MAX_BURST, MAX_CPM, MIN_BURST, MIN_CPM
+
+log = logging.getLogger("rich")
+
+DEFAULT_SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp",
+                                   f"milkyclicks-{os.getuid()}.sock")
+MAX_LINE_BYTES = 256
+DEFAULT_SUBSCRIBE_HZ = 10
+MAX_SUBSCRIBE_HZ = 100
+STATS_TICKS = 256  # Ticks the timing figures are computed over
+STATS_MAX_AGE = 0.05  # Seconds a computed stats line is reused across clients
+SUBSCRIBER_BUFFER_LIMIT = 64 * 1024  # Events are skipped while a slow client has this much unread
+
+
+class ControlServer(threading.Thread):
+    """Serves the control protocol for a ClickerThread (or ProcessClicker)."""
+
+    def __init__(self, clicker, path=DEFAULT_SOCKET_PATH, on_change=None):
+        """
+        Args:
+            clicker: Engine to control; needs set_active/set_speed/set_burst,
+                settings() and a ``timing`` ring.
+            path: Socket path. A stale socket file is replaced; a live one
+                (another instance) makes start-up fail.
+            on_change: Optional ``callback(name, value)`` run on the server
+                thread after a change was applied: ``("active", 0 or 1)``,
+                ``("speed", cpm)`` or ``("burst", n)``.
+        """
+        super().__init__(name="ControlServerThread", daemon=True)
+        self.clicker = clicker
+        self.path = path
+        self.on_change = on_change
+        self.commands = 0  # Handled so far, for the logs and benchmarks
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._error = None
+        self._clients = set()
+        self._stats_line = ""
+        self._stats_at = 0.0
+
+    def start(self):
+        """Starts serving; returns once the socket accepts connections.
+
+        Raises:
+            OSError: If the socket cannot be created (e.g. already served).
+        """
+        super().start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            _remove_stale_socket(self.path)
+            server = await asyncio.start_unix_server(self._handle_client, self.path, limit=MAX_LINE_BYTES)
+            os.chmod(self.path, 0o600)  # Only this user may drive the mouse
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        log.info(f"Control socket listening on {self.path}")
+        self._ready.set()
+        async with server:
+            await self._stopped.wait()
+        for task in list(self._clients):
+            task.cancel()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        log.info(f"Control server finished ({self.commands} commands).")
+
+    def stop(self):
+        if not self.is_alive():
+            return
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        self.join(timeout=2.0)
+
+    async def _handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        subscription = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Line longer than MAX_LINE_BYTES
+                    writer.write(b"err line too long\n")
+                    break
+                if not line:
+                    break
+                command, _, argument = line.decode("ascii", "replace").strip().partition(" ")
+                command = command.lower()
+                if command == "subscribe":
+                    reply, hz = self._parse_hz(argument)
+                    if hz is not None:
+                        if subscription is not None:
+                            subscription.cancel()
+                        subscription = asyncio.ensure_future(self._publish_stats(writer, 1.0 / hz))
+                elif command == "unsubscribe":
+                    if subscription is not None:
+                        subscription.cancel()
+                        subscription = None
+                    reply = "ok"
+                else:
+                    reply = self.execute(command, argument)
+                writer.write(reply.encode("ascii") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if subscription is not None:
+                subscription.cancel()
+            self._clients.discard(task)
+            writer.close()
+
+    @staticmethod
+    def _parse_hz(argument):
+        try:
+            hz = float(argument) if argument else DEFAULT_SUBSCRIBE_HZ
+        except ValueError:
+            return f"err bad rate '{argument}'", None
+        if not 0 < hz <= MAX_SUBSCRIBE_HZ:
+            return f"err rate must be in (0, {MAX_SUBSCRIBE_HZ}]", None
+        return "ok", hz
+
+    async def _publish_stats(self, writer, period):
+        transport = writer.transport
+        while not transport.is_closing():
+            if transport.get_write_buffer_size() < SUBSCRIBER_BUFFER_LIMIT:
+                writer.write(f"event {self.stats_line()}\n".encode("ascii"))
+            await asyncio.sleep(period)
+
+    def execute(self, command, argument=""):
+        """Applies one command and returns its reply line (without newline)."""
+        self.commands += 1
+        clicker = self.clicker
+        if command in ("activate", "on"):
+            clicker.set_active(True)
+            self._changed("active", 1)
+            return "ok"
+        if command in ("deactivate", "off"):
+            clicker.set_active(False)
+            self._changed("active", 0)
+            return "ok"
+        if command in ("speed", "burst"):
+            try:
+                value = int(argument)
+            except ValueError:
+                return f"err {command} needs an integer, got '{argument}'"
+            if command == "speed":
+                value = max(MIN_CPM, min(value, MAX_CPM))
+                clicker.set_speed(value)
+            else:
+                value = max(MIN_BURST, min(value, MAX_BURST))
+                clicker.set_burst(value)
+            self._changed(command, value)
+            return f"ok {value}"
+        if command == "stats":
+            return f"ok {self.stats_line()}"
+        if command == "ping":
+            return "ok pong"
+        return f"err unknown command '{command}'"
+
+    def _changed(self, name, value):
+        self._stats_at = 0.0  # Next stats reflect the change
+        if self.on_change is not None:
+            self.on_change(name, value)
+
+    def stats_line(self):
+        """``key=value`` stats, recomputed at most every STATS_MAX_AGE seconds."""
+        now = time.monotonic()
+        if now - self._stats_at >= STATS_MAX_AGE:
+            active, cpm, burst = self.clicker.settings()
+            timing = self.clicker.timing
+            stats = timing.stats(STATS_TICKS)
+            self._stats_line = (f"active={int(active)} cpm={cpm} burst={burst} clicks={timing.total_clicks} "
+                                f"achieved={stats.achieved_cpm:.1f} p50_ms={stats.p50_error_ms:.3f} "
+                                f"p99_ms={stats.p99_error_ms:.3f}")
+            self._stats_at = now
+        return self._stats_line
+
+
+def _remove_stale_socket(path):
+    """Unlinks a socket file nobody listens on.
+
+    Raises:
+        OSError: If another process is serving on ``path``, or it is not a socket.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)  # Left behind by a crashed instance
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Another instance is already serving {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send commands to a running MILKyclicks control socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("command", nargs="+",
+                        help="e.g. 'activate', 'speed 1200', 'stats'; a number following a command is its argument")
+    args = parser.parse_args(argv)
+
+    # "speed 1200 stats" -> ["speed 1200", "stats"]
+    commands = []
+    for word in args.command:
+        if commands and word.replace(".", "", 1).isdigit():
+            commands[-1] += f" {word}"
+        else:
+            commands.append(word)
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(args.socket)
+    except OSError as e:
+        print(f"Cannot connect to {args.socket}: {e}", file=sys.stderr)
+        return 1
+    with connection, connection.makefile("rwb") as stream:
+        failed = False
+        for command in commands:
+            stream.write(command.encode("ascii") + b"\n")
+            stream.flush()
+            reply = stream.readline().decode("ascii").rstrip("\n")
+            print(reply)
+            failed |= reply.startswith("err")
+            if command.startswith("subscribe") and not failed:
+                try:
+                    for line in stream:
+                        print(line.decode("ascii").rstrip("\n"), flush=True)
+                except KeyboardInterrupt:
+                    pass
+                break
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,520 @@
+"""The click engine: a plain thread that clicks on a deadline schedule.
+
+Kept free of Qt so it can run in the GUI process, in a child process
+(engine_process) or without any GUI at all.
+"""
+import logging
+import threading
+import time
+from functools import partial
+
+from backends import BUTTON_LEFT, BUTTONS, PynputBackend
+from scheduler import (
+    ADAPT_TOLERANCE,
+    DEFAULT_CATCH_UP_POLICY,
+    DeadlineScheduler,
+    RateController,
+    RateStatus,
+    sleep_until,
+)
+from timing import ClickTimingRing
+
+MIN_CPM = 1
+MAX_CPM = 12000 # Clicks Per Minute (deadline scheduler keeps this accurate)
+DEFAULT_CPM = 600
+
+MIN_BURST = 1 # Clicks sent per scheduler wakeup
+MAX_BURST = 10
+
+# Upper bound on hotkey-press-to-first-click latency. The first click of a run
+# fires as soon as the loop wakes; between the key hook and the click are two
+# thread hand-offs (hotkey drain thread, click loop), each of which can wait
+# at most one GIL switch interval (5 ms by default) behind a busy thread.
+ACTIVATION_LATENCY_BOUND = 0.010
+
+# A click due within this many seconds of a run's time limit counts as due at
+# the limit and is not sent (deadlines accumulate float rounding on the grid)
+BUDGET_EPSILON = 1e-6
+
+log = logging.getLogger("rich")
+
+
+class ClickerThread(threading.Thread):
+    def __init__(self, backend=None, catch_up_policy=DEFAULT_CATCH_UP_POLICY, timing=None):
+        # Daemon so an unclean GUI exit can't keep the interpreter (and clicking) alive
+        super().__init__(name="ClickerThread", daemon=True)
+        # Any backends.ClickBackend; pynput drives the real mouse by default
+        self.backend = backend if backend is not None else PynputBackend()
+        self._is_active = False
+        self._lock = threading.Lock()
+        # Setters notify this condition, so the loop blocks instead of polling
+        self._state_changed = threading.Condition(self._lock)
+        self._generation = 0 # Bumped on every state change (guards lost wakeups)
+        self._stop_requested = False
+        self._interval = 1.0 # Default: 1 click per second (60 CPM)
+        self._burst = MIN_BURST # Clicks per tick; ticks are spaced burst * interval apart
+        self._catch_up_policy = catch_up_policy
+        self._adaptive = False # Closed-loop correction of the interval (see set_adaptive)
+        self._pattern = None # patterns.ClickPattern to cycle through; None clicks at the cursor
+        self._jitter = None # jitter.JitterTable of interval factors; None keeps intervals exact
+        self._gate = None # Callable; while it returns False no clicks fire (see set_gate)
+        self._gate_opened_at = None # perf_counter() of the sample that last opened the gate
+        self.last_gate_latency = None # Seconds from that sample to the first click after it
+        self._program = None # program.ClickProgram run on activation instead of the fixed rate
+        # Called from the click loop with "program", "clicks" or "duration" when a run ends by itself
+        self.on_finished = None
+        self._budget = (None, None) # (clicks, seconds) per run; None is unlimited (see set_budget)
+        self._runs = 0 # Bumped by every activation: each one starts a new run
+        # Progress of the current (or last) run. Written only by the click loop, read without the lock
+        self.run_clicks_sent = 0 # Including clicks whose backend call failed
+        self.run_started_at = None # perf_counter() of the run's first click
+        self.rate_controller = RateController()
+        self._reported_rate_status = None
+        self._activated_at = None # perf_counter() of the last set_active(True)
+        self.last_activation_latency = None # Seconds from activation (or key press) to first click
+        self.activation_bound_misses = 0 # Activations slower than ACTIVATION_LATENCY_BOUND
+        self.achieved_cpm = 0.0 # Measured rate of the last completed run
+        self.failed_clicks = 0 # Clicks whose backend call raised (written by the loop only)
+        self._active_since = None # perf_counter() of the last activation while active
+        self._active_total = 0.0 # Seconds active in completed runs
+        # Lock-free tick log; read it with timing.stats()/histogram() from any thread.
+        # May be backed by shared memory (see engine_process).
+        self.timing = timing if timing is not None else ClickTimingRing()
+
+    def _notify_locked(self):
+        """Wakes the click loop. Caller must hold self._lock."""
+        self._generation += 1
+        self._state_changed.notify()
+
+    def _wait_for_change(self, generation, timeout=None):
+        """Blocks until the state generation moves past `generation` or `timeout` elapses.
+        Returns True if the state changed (usable as a sleep_until interruptible wait)."""
+        with self._lock:
+            return self._state_changed.wait_for(lambda: self._generation != generation, timeout)
+
+    def run(self):
+        # Clicks are placed on absolute deadlines, so time spent inside click()
+        # and sleep overshoot never accumulate into a lower real CPM.
+        scheduler = DeadlineScheduler(self._interval, self._catch_up_policy)
+        was_active = False # Clicking on an anchored grid (or program origin) since the last break
+        run = None # self._runs value of the current run
+        run_open = False # A run is in progress: its counters and budgets apply
+        run_started = None
+        run_clicks = 0
+        run_span = [0, 0.0, 0.0] # Clicks sent by a run's first tick, when it and the latest tick fired
+        tick_target = 0.0 # Target interval recorded with the next tick; 0.0 marks a run start
+        pattern = None
+        pattern_index = 0
+        program = None
+        program_index = 0
+        program_origin = 0.0
+        last_click_offset = None
+        while True:
+            with self._lock:
+                if self._stop_requested:
+                    break
+                active = self._is_active
+                interval = self._interval * self._burst
+                burst = self._burst
+                scheduler.policy = self._catch_up_policy
+                adaptive = self._adaptive
+                generation = self._generation
+                if self._pattern is not pattern:
+                    pattern = self._pattern
+                    pattern_index = 0 # A new pattern starts from its first target
+                jitter = self._jitter
+                gate = self._gate
+                if self._program is not program:
+                    program = self._program
+                    run = None # A new program (or rate mode) starts afresh
+                runs = self._runs
+                clicks_budget, seconds_budget = self._budget
+
+            if active and runs != run:
+                # A new activation: counters, budgets and the program start over
+                run = runs
+                run_open = True
+                was_active = False
+                run_started = self.run_started_at = None
+                run_clicks = self.run_clicks_sent = 0
+                run_span = [0, 0.0, 0.0]
+                program_index = 0
+
+            if active and gate is not None and not gate():
+                # Gated: wait for gate_changed(); the next opening starts a fresh grid
+                # but continues the run. Activation latency would only measure the
+                # wait, so gate latency replaces it.
+                was_active = False
+                if self._activated_at is not None:
+                    with self._lock:
+                        self._activated_at = None
+                if seconds_budget is not None and run_started is not None:
+                    # The time limit keeps running while gated
+                    if not self._wait_for_budget_end(run_started + seconds_budget, generation):
+                        run_open = False
+                        self._end_run(run_clicks, run_span, run_started, program, "duration")
+                    continue
+                self._wait_for_change(generation)
+                continue
+
+            if not active:
+                if run_open:
+                    self._report_achieved_rate(run_clicks, run_span, program)
+                run_open = was_active = False
+                # Idle costs no wakeups: block until a setter signals a change
+                self._wait_for_change(generation)
+                continue
+
+            remaining = MAX_BURST # Clicks this tick may send; only a click budget trims it
+            if clicks_budget is not None:
+                remaining = clicks_budget - self.run_clicks_sent
+                if remaining <= 0:
+                    # The budget was lowered below what this run has sent already
+                    run_open = was_active = False
+                    self._end_run(run_clicks, run_span, run_started, program, "clicks")
+                    continue
+
+            if program is not None:
+                if not was_active:
+                    # Every activation runs the program from its first step; a gate
+                    # reopening shifts the origin so the pending step is due now
+                    was_active = True
+                    now = time.perf_counter()
+                    if run_started is None:
+                        run_started = self.run_started_at = now
+                    program_origin = now - program.offsets[program_index] if program_index else now
+                    last_click_offset = None
+                offset = program.offsets[program_index]
+                due = program_origin + offset
+                if seconds_budget is not None and due >= run_started + seconds_budget - BUDGET_EPSILON:
+                    if self._wait_for_budget_end(run_started + seconds_budget, generation):
+                        continue
+                    run_open = was_active = False
+                    self._end_run(run_clicks, run_span, run_started, program, "duration")
+                    continue
+                if time.perf_counter() < due:
+                    sleep_until(due, partial(self._wait_for_change, generation))
+                    continue
+                action = program.actions[program_index] # Click count; 0 (ACTION_MOVE) moves
+                action = min(action, remaining) # Trim a double click to the budget
+                clicked_at = time.perf_counter()
+                try:
+                    if action:
+                        self.backend.click(BUTTONS[program.buttons[program_index]], action)
+                        run_clicks += action
+                        if run_clicks == action:
+                            run_span[0], run_span[1] = action, clicked_at
+                        run_span[2] = clicked_at
+                    else:
+                        self.backend.move_to(program.xs[program_index], program.ys[program_index])
+                except Exception as e:  # noqa: BLE001 - any backend failure, the loop keeps going
+                    self.failed_clicks += action
+                    log.error(f"Clicking error: {e}", exc_info=False)
+                if action:
+                    self.run_clicks_sent += action
+                    self.timing.record(clicked_at, action,
+                                       offset - last_click_offset if last_click_offset is not None else 0.0)
+                    last_click_offset = offset
+                    if self._activated_at is not None:
+                        self._report_activation_latency(clicked_at)
+                program_index += 1
+                if clicks_budget is not None and self.run_clicks_sent >= clicks_budget:
+                    run_open = was_active = False
+                    self._end_run(run_clicks, run_span, run_started, program, "clicks")
+                elif program_index == len(program.actions):
+                    log.info(f"Program finished: {run_clicks} clicks in {time.perf_counter() - run_started:.2f}s "
+                             f"(scheduled {program.duration:.2f}s)")
+                    run_open = was_active = False
+                    self._end_run(run_clicks, run_span, run_started, program, "program")
+                continue
+
+            controller = self.rate_controller
+            nominal_interval = interval
+            if not was_active:
+                controller.reset()
+                self._reported_rate_status = None
+            if pattern is not None and pattern.has_dwell:
+                adaptive = False # Dwell pauses are intended; don't correct for them
+            if adaptive:
+                interval *= controller.factor
+
+            if not was_active:
+                # First click of a run (or after the gate opens) fires immediately and anchors the grid
+                scheduler.interval = interval
+                scheduler.reset()
+                was_active = True
+                tick_target = 0.0
+                if run_started is None:
+                    run_started = self.run_started_at = scheduler.deadline # Time limits count from the first anchor
+            else:
+                scheduler.set_interval(interval)
+
+            if seconds_budget is not None and scheduler.deadline >= run_started + seconds_budget - BUDGET_EPSILON:
+                if self._wait_for_budget_end(run_started + seconds_budget, generation):
+                    continue
+                run_open = was_active = False
+                self._end_run(run_clicks, run_span, run_started, program, "duration")
+                continue
+            if time.perf_counter() < scheduler.deadline:
+                # Condition wait for the coarse part, then spin to the exact deadline.
+                # Either way re-check state: we may have been retuned or deactivated.
+                sleep_until(scheduler.deadline, partial(self._wait_for_change, generation))
+                continue
+
+            burst = min(burst, remaining) # Last tick sends only what the budget has left
+            clicked_at = time.perf_counter()
+            try:
+                if pattern is not None:
+                    self.backend.move_to(pattern.xs[pattern_index], pattern.ys[pattern_index])
+                self.backend.click(BUTTON_LEFT, burst)
+                run_clicks += burst
+                if run_clicks == burst:
+                    run_span[0], run_span[1] = burst, clicked_at
+                run_span[2] = clicked_at
+            except Exception as e:  # noqa: BLE001 - any backend failure, the loop keeps going
+                self.failed_clicks += burst
+                log.error(f"Clicking error: {e}", exc_info=False) # Log errors concisely
+            now = time.perf_counter()
+            self.run_clicks_sent += burst
+            self.timing.record(clicked_at, burst, tick_target)
+            if clicks_budget is not None and self.run_clicks_sent >= clicks_budget:
+                run_open = was_active = False
+                self._end_run(run_clicks, run_span, run_started, program, "clicks")
+                continue
+            tick_target = nominal_interval
+            if adaptive and controller.observe(clicked_at, nominal_interval):
+                self._report_rate_status(controller, nominal_interval, burst)
+            if self._activated_at is not None:
+                self._report_activation_latency(clicked_at)
+            if self._gate_opened_at is not None:
+                self._report_gate_latency(clicked_at)
+            scheduler.advance(now)
+            if jitter is not None:
+                # Offsets average zero over each table block, so the mean rate holds
+                offset = nominal_interval * (jitter.next() - 1.0)
+                scheduler.deadline += offset
+                tick_target += offset
+            if pattern is not None:
+                if pattern.has_dwell:
+                    dwell = pattern.dwell[pattern_index]
+                    scheduler.deadline += dwell
+                    tick_target += dwell
+                pattern_index += 1
+                if pattern_index == len(pattern.xs):
+                    pattern_index = 0
+
+        if run_open:
+            self._report_achieved_rate(run_clicks, run_span, program)
+        if self._jitter is not None:
+            self._jitter.close()
+        self.backend.close()
+        log.info("Clicker thread finished.")
+
+    def _wait_for_budget_end(self, run_end, generation):
+        """Sleeps until a time budget runs out, since the next click would fall
+        past it. Returns True if woken early by a state change."""
+        if time.perf_counter() < run_end:
+            return sleep_until(run_end, partial(self._wait_for_change, generation))
+        return False
+
+    def _end_run(self, clicks, span, started, program, reason):
+        """Reports a run that ended by itself, switches off and tells on_finished.
+        The caller has already marked the run over, so a quick re-activation
+        starts a fresh one instead of finding this one's budget used up."""
+        self._report_achieved_rate(clicks, span, program)
+        if reason != "program":
+            log.info(f"Run budget reached: {self.run_clicks_sent} clicks in {time.perf_counter() - started:.3f}s")
+        with self._lock:
+            if not self._is_active:
+                return # Switched off meanwhile: nothing to finish
+            self._set_active_locked(False) # Checked and switched in one step, so a new activation survives
+        if self.on_finished is not None:
+            self.on_finished(reason)
+
+    def _report_activation_latency(self, clicked_at):
+        with self._lock:
+            activated_at, self._activated_at = self._activated_at, None
+        if activated_at is not None:
+            self.last_activation_latency = clicked_at - activated_at
+            if self.last_activation_latency > ACTIVATION_LATENCY_BOUND:
+                self.activation_bound_misses += 1
+                log.warning(f"Activation-to-first-click latency {self.last_activation_latency * 1000:.3f} ms "
+                            f"exceeded the {ACTIVATION_LATENCY_BOUND * 1000:.0f} ms bound")
+            else:
+                log.info(f"Activation-to-first-click latency: {self.last_activation_latency * 1000:.3f} ms")
+
+    def _report_gate_latency(self, clicked_at):
+        with self._lock:
+            opened_at, self._gate_opened_at = self._gate_opened_at, None
+        if opened_at is not None:
+            self.last_gate_latency = clicked_at - opened_at
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Sample-to-click latency: {self.last_gate_latency * 1000:.3f} ms")
+
+    def _report_achieved_rate(self, clicks, span, program=None):
+        """Rate over the intervals from a run's first tick to its last; the first
+        tick's clicks open that span, so they are not counted in it."""
+        first_clicks, first_at, last_at = span
+        elapsed = last_at - first_at
+        if clicks > first_clicks and elapsed > 0:
+            self.achieved_cpm = (clicks - first_clicks) * 60.0 / elapsed
+            if program is not None:
+                target_cpm = program.clicks * 60.0 / program.duration if program.duration else 0.0
+            else:
+                with self._lock:
+                    target_cpm = 60.0 / self._interval
+            stats = self.timing.stats()
+            log.info(f"Achieved {self.achieved_cpm:.1f} CPM over {clicks} clicks (target {target_cpm:.0f} CPM), "
+                     f"interval error p50 {stats.p50_error_ms:.3f} ms / p99 {stats.p99_error_ms:.3f} ms")
+
+    def _report_rate_status(self, controller, nominal_interval, burst):
+        """Logs adaptive-mode transitions (once per change, not per update)."""
+        status = controller.status
+        if status is self._reported_rate_status:
+            return
+        self._reported_rate_status = status
+        target_cpm = burst * 60.0 / nominal_interval
+        achieved_cpm = target_cpm / (1.0 + controller.error)
+        if status is RateStatus.LOCKED:
+            log.info(f"Adaptive rate locked: {achieved_cpm:.1f} CPM (target {target_cpm:.0f}, "
+                     f"interval x{controller.factor:.3f})")
+        elif status is RateStatus.UNREACHABLE:
+            log.warning(f"Target {target_cpm:.0f} CPM is unreachable on this machine/backend: "
+                        f"achieving {achieved_cpm:.1f} CPM at the maximum correction")
+
+    def set_active(self, active, requested_at=None):
+        """`requested_at`: perf_counter() of the input that asked for the change
+        (e.g. a hotkey press), so activation latency covers the whole path."""
+        with self._lock:
+            self._set_active_locked(active, requested_at)
+
+    def _set_active_locked(self, active, requested_at=None):
+        """set_active() for callers already holding self._lock."""
+        if active != self._is_active:
+            log.info(f"Clicker state changed to: {'ON' if active else 'OFF'}")
+            self._activated_at = (requested_at or time.perf_counter()) if active else None
+            if active:
+                self._active_since = time.perf_counter()
+                self._runs += 1
+            else:
+                self._active_total += time.perf_counter() - self._active_since
+                self._active_since = None
+        self._is_active = active
+        self._notify_locked()
+
+    def set_speed(self, cpm):
+        cpm = max(cpm, MIN_CPM)
+        cpm = min(cpm, MAX_CPM)
+        # Prevent division by zero if MAX_CPM could be 0 (though unlikely here)
+        interval = 60.0 / max(cpm, 1) # Ensure cpm is at least 1 for division
+        with self._lock: # Held only for the store, so the click loop never waits on logging
+            self._interval = interval
+            self._notify_locked()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"Click interval set to {interval:.4f}s ({cpm} CPM)")
+
+    def set_burst(self, burst):
+        """Sets how many clicks are sent per scheduler wakeup (same average CPM)."""
+        burst = max(MIN_BURST, min(burst, MAX_BURST))
+        with self._lock:
+            self._burst = burst
+            self._notify_locked()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"Burst size set to {burst}")
+
+    def set_adaptive(self, enabled, tolerance=ADAPT_TOLERANCE):
+        """Enables closed-loop rate control: the commanded interval is corrected
+        until the measured CPM is within `tolerance` (relative) of the target."""
+        with self._lock:
+            self._adaptive = enabled
+            self.rate_controller.tolerance = tolerance
+            self._notify_locked()
+
+    def set_pattern(self, pattern):
+        """Cycles through the targets of a patterns.ClickPattern, moving the
+        pointer to each one before clicking it; None clicks at the cursor again.
+        Adaptive rate control is suspended while the pattern has dwell times."""
+        with self._lock:
+            self._pattern = pattern
+            log.info(f"Click pattern: {len(pattern)} targets" if pattern is not None else "Click pattern cleared")
+            self._notify_locked()
+
+    def set_program(self, program):
+        """Runs a program.ClickProgram on every activation instead of clicking
+        at the set speed; None returns to the speed, burst, pattern and jitter
+        settings. Steps fire on absolute deadlines from the activation and the
+        clicker switches itself off after the last one (see on_finished)."""
+        with self._lock:
+            self._program = program
+            log.info(f"Click program: {len(program)} steps, {program.clicks} clicks, {program.duration:.2f}s"
+                     if program is not None else "Click program cleared")
+            self._notify_locked()
+
+    def set_budget(self, clicks=None, seconds=None):
+        """Limits every run (from activation to switch-off) to exactly `clicks`
+        clicks and/or `seconds` seconds from its first click; None is unlimited.
+        No click is sent past either limit: the last tick of a burst is trimmed,
+        and a click due after the time limit is not sent. The clicker then
+        switches itself off (see on_finished). A gate closing and reopening
+        (see set_gate) continues the run, and its time limit keeps running
+        while gated; lowering the click limit below what was sent ends the
+        run. Progress: run_clicks_sent and run_started_at.
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        if (clicks is not None and clicks < 1) or (seconds is not None and seconds <= 0):
+            raise ValueError(f"Run budgets must be positive, got {clicks} clicks / {seconds} s")
+        with self._lock:
+            self._budget = (clicks, seconds)
+            self._notify_locked()
+
+    def set_jitter(self, jitter):
+        """Randomizes each tick interval by a factor from a jitter.JitterTable
+        (mean 1.0, so the average CPM is unchanged); None restores exact intervals.
+        The previous table, if any, is closed."""
+        with self._lock:
+            previous, self._jitter = self._jitter, jitter
+            self._notify_locked()
+        if previous is not None and previous is not jitter:
+            previous.close()
+
+    def set_gate(self, gate):
+        """Clicks only while `gate()` returns True (e.g. screen.RegionTrigger.is_open),
+        checked before every tick; None removes the gate. Whoever drives the gate
+        must call gate_changed() when its value flips, or a closed gate is not
+        re-checked until the next state change."""
+        with self._lock:
+            self._gate = gate
+            self._gate_opened_at = None
+            self._notify_locked()
+
+    def gate_changed(self, opened_at=None):
+        """Wakes the loop to re-check the gate. `opened_at`: perf_counter() of the
+        sample that opened it, so last_gate_latency covers sampling too."""
+        with self._lock:
+            self._gate_opened_at = opened_at
+            self._notify_locked()
+
+    def active_seconds(self):
+        """Total time spent switched on, including the current run."""
+        with self._lock:
+            running = time.perf_counter() - self._active_since if self._active_since is not None else 0.0
+            return self._active_total + running
+
+    def settings(self):
+        """Returns ``(active, cpm, burst)`` as last set."""
+        with self._lock:
+            return self._is_active, round(60.0 / self._interval), self._burst
+
+    def set_catch_up_policy(self, policy):
+        """Chooses how missed deadlines are handled (see scheduler.CatchUpPolicy)."""
+        with self._lock:
+            self._catch_up_policy = policy
+
+    def stop(self):
+        log.info("Requesting clicker thread stop...")
+        self.set_active(False) # Ensure clicking stops
+        with self._lock:
+            self._stop_requested = True # Signal the loop to exit
+            self._notify_locked()
@@ -0,0 +1,271 @@
+"""Runs the click engine in a child process.
+
+The GUI shares a small control block with the child through
+``multiprocessing.shared_memory``. Setters write the block in place and
+poke a one-way pipe to wake the child; nothing waits for a reply. The
+child's ClickTimingRing and failed click count live in the same segment,
+so the GUI reads click stats directly from the child's writes. Because of this split, stylesheet
+and layout work holding the GUI's GIL can't delay a click.
+
+The child runs ``python engine_process.py --shm NAME ...`` and imports only
+the engine modules: no Qt, no rich.
+"""
+import argparse
+import logging
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+from backends import BACKENDS, PynputBackend, create_backend
+from engine import MAX_BURST, MAX_CPM, MIN_BURST, MIN_CPM, ClickerThread
+from scheduler import ADAPT_TOLERANCE, DEFAULT_CATCH_UP_POLICY, CatchUpPolicy
+from timing import DEFAULT_RING_CAPACITY, ClickTimingRing
+
+log = logging.getLogger("rich")
+
+# Control block: sequence, active, stop, adaptive, policy, burst, interval, tolerance,
+# requested_at (perf_counter() of the input that last activated; the clock is system-wide).
+# The GUI is the only writer. It makes the sequence odd while writing, so the
+# child can detect a torn read and retry (a seqlock).
+_CONTROL = struct.Struct("<QBBBBHxxddd")
+_SEQUENCE = struct.Struct("<Q")
+_FAILURES_OFFSET = 56  # uint64 failed click count after the control block; only the child writes it
+_CONTROL_BYTES = 64  # Control block padded to a cache line; the timing ring follows
+_POLICIES = list(CatchUpPolicy)
+_STOP_TIMEOUT = 1.0  # Seconds to wait for the child before killing it
+
+
+def _attach_shared_memory(name):
+    """Opens an existing segment without registering it with this process's
+    resource tracker (the GUI owns and unlinks it)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class _ChildClicker(ClickerThread):
+    """ClickerThread whose failed click count is kept in the shared segment."""
+
+    def __init__(self, failures, **kwargs):
+        self._failures = failures  # One-element 'Q' view; set before the base class zeroes it
+        super().__init__(**kwargs)
+
+    @property
+    def failed_clicks(self):
+        return self._failures[0]
+
+    @failed_clicks.setter
+    def failed_clicks(self, value):
+        self._failures[0] = value
+
+
+class ProcessClicker:
+    """Drop-in replacement for ClickerThread that clicks from a child process.
+
+    Exposes the same control API (start/stop/set_active/set_speed/set_burst/
+    set_adaptive/set_catch_up_policy/settings) and a ``timing`` ring
+    readable without locks.
+    """
+
+    def __init__(self, backend_name=PynputBackend.name, capacity=DEFAULT_RING_CAPACITY):
+        if backend_name not in BACKENDS:
+            raise ValueError(f"Unknown click backend '{backend_name}'. Choose from: {', '.join(BACKENDS)}")
+        self.backend_name = backend_name
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=_CONTROL_BYTES + ClickTimingRing.nbytes(capacity))
+        self._ring_buffer = self._shm.buf[_CONTROL_BYTES:]
+        self.timing = ClickTimingRing(capacity, buffer=self._ring_buffer)
+        self._failures = self._shm.buf[_FAILURES_OFFSET:_CONTROL_BYTES].cast("Q")
+        self._failed_clicks = 0  # Last count read, kept once the segment is released
+        self._lock = threading.Lock()  # Serialises writers in this process
+        self._sequence = 0
+        self._active = False
+        self._stop_requested = False
+        self._adaptive = False
+        self._policy = DEFAULT_CATCH_UP_POLICY
+        self._burst = MIN_BURST
+        self._interval = 1.0
+        self._tolerance = ADAPT_TOLERANCE
+        self._requested_at = 0.0
+        self._active_since = None
+        self._active_total = 0.0
+        self._process = None
+        self._publish()
+
+    def start(self):
+        log.info(f"Starting click engine process ({self.backend_name} backend)...")
+        engine_script = os.path.abspath(__file__)
+        self._process = subprocess.Popen(
+            [sys.executable, engine_script, "--shm", self._shm.name,
+             "--backend", self.backend_name, "--capacity", str(self.capacity)],
+            stdin=subprocess.PIPE, close_fds=True)
+        # Never let a slow child block the GUI: wake-ups are best effort and
+        # the child always re-reads the full control block anyway.
+        os.set_blocking(self._process.stdin.fileno(), False)
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _publish(self):
+        """Writes the control block (seqlock) and wakes the child. Caller holds no lock."""
+        with self._lock:
+            self._sequence += 1  # Odd: write in progress
+            _CONTROL.pack_into(self._shm.buf, 0, self._sequence, self._active, self._stop_requested,
+                               self._adaptive, _POLICIES.index(self._policy), self._burst,
+                               self._interval, self._tolerance, self._requested_at)
+            self._sequence += 1  # Even: consistent again
+            _SEQUENCE.pack_into(self._shm.buf, 0, self._sequence)
+        if self._process is not None and self._process.stdin is not None:
+            try:
+                os.write(self._process.stdin.fileno(), b"\x01")
+            except BlockingIOError:
+                pass  # Pipe full: the child has wake-ups pending already
+            except (BrokenPipeError, ValueError):
+                log.error("Click engine process is not running.")
+
+    def set_active(self, active, requested_at=None):
+        if active and not self._active:
+            self._requested_at = requested_at or 0.0
+            self._active_since = time.perf_counter()
+        elif self._active and not active:
+            self._active_total += time.perf_counter() - self._active_since
+            self._active_since = None
+        self._active = active
+        self._publish()
+
+    def set_speed(self, cpm):
+        cpm = max(MIN_CPM, min(cpm, MAX_CPM))
+        self._interval = 60.0 / cpm
+        self._publish()
+
+    def set_burst(self, burst):
+        self._burst = max(MIN_BURST, min(burst, MAX_BURST))
+        self._publish()
+
+    def set_adaptive(self, enabled, tolerance=ADAPT_TOLERANCE):
+        self._adaptive = enabled
+        self._tolerance = tolerance
+        self._publish()
+
+    def active_seconds(self):
+        """Total time spent switched on, including the current run."""
+        active_since = self._active_since
+        return self._active_total + (time.perf_counter() - active_since if active_since is not None else 0.0)
+
+    def settings(self):
+        """Returns ``(active, cpm, burst)`` as last set."""
+        return self._active, round(60.0 / self._interval), self._burst
+
+    @property
+    def failed_clicks(self):
+        """Clicks whose backend call failed in the child."""
+        if self._shm is not None:
+            self._failed_clicks = self._failures[0]
+        return self._failed_clicks
+
+    def set_catch_up_policy(self, policy):
+        self._policy = policy
+        self._publish()
+
+    def stop(self):
+        if self._shm is None:
+            return  # Already stopped: closing the window stops the engine a second time
+        log.info("Requesting click engine process stop...")
+        self._active = False
+        self._stop_requested = True
+        self._publish()
+        if self._process is not None:
+            self._process.stdin.close()  # EOF also stops the child
+            try:
+                self._process.wait(timeout=_STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                log.warning("Click engine process did not stop gracefully; killing it.")
+                self._process.kill()
+                self._process.wait()
+        self._release()
+
+    def join(self, timeout=None):
+        if self._process is not None:
+            self._process.wait(timeout=timeout)
+
+    def _release(self):
+        if self._shm is None:
+            return
+        self._failed_clicks = self._failures[0]
+        self.timing.release()
+        self._failures.release()
+        self._ring_buffer.release()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+def _read_control(buf):
+    """Reads a consistent copy of the control block (retries torn reads)."""
+    while True:
+        fields = _CONTROL.unpack_from(buf, 0)
+        if fields[0] % 2 == 0 and _SEQUENCE.unpack_from(buf, 0)[0] == fields[0]:
+            return fields
+
+
+def _run_child(shm_name, backend_name, capacity):
+    shm = _attach_shared_memory(shm_name)
+    ring_buffer = shm.buf[_CONTROL_BYTES:]
+    timing = ClickTimingRing(capacity, buffer=ring_buffer)
+    failures = shm.buf[_FAILURES_OFFSET:_CONTROL_BYTES].cast("Q")
+    clicker = _ChildClicker(failures, backend=create_backend(backend_name), timing=timing)
+    clicker.start()
+    wake_fd = sys.stdin.fileno()
+    applied = None
+    try:
+        while True:
+            control = _read_control(shm.buf)
+            _, active, stop, adaptive, policy, burst, interval, tolerance, requested_at = control
+            if stop:
+                break
+            if control[1:] != (applied[1:] if applied else None):
+                # Only forward what changed, so the clicker isn't retuned needlessly
+                if applied is None or (interval, burst) != (applied[6], applied[5]):
+                    clicker.set_speed(60.0 / interval)
+                    clicker.set_burst(burst)
+                if applied is None or (adaptive, tolerance) != (applied[3], applied[7]):
+                    clicker.set_adaptive(bool(adaptive), tolerance)
+                if applied is None or policy != applied[4]:
+                    clicker.set_catch_up_policy(_POLICIES[policy])
+                if applied is None or active != applied[1]:
+                    clicker.set_active(bool(active), requested_at or None)
+                applied = control
+            if not os.read(wake_fd, 4096):  # Blocks until the GUI pokes us
+                log.info("GUI process went away; stopping.")
+                break
+    finally:
+        clicker.stop()
+        clicker.join()
+        timing.release()
+        failures.release()
+        ring_buffer.release()
+        shm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MILKyclicks click engine child process")
+    parser.add_argument("--shm", required=True, help="shared memory segment created by the GUI")
+    parser.add_argument("--backend", default=PynputBackend.name, choices=list(BACKENDS))
+    parser.add_argument("--capacity", type=int, default=DEFAULT_RING_CAPACITY)
+    args = parser.parse_args()
+    logging.basicConfig(level="INFO", format="[engine] %(message)s")
+    _run_child(args.shm, args.backend, args.capacity)
+
+
+if __name__ == "__main__":
+    main()
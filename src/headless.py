@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Headless MILKyclicks: the click engine and hotkeys without the GUI.
+
+Never imports PyQt6 or rich, so it starts quickly and stays small, which
+suits kiosks and automation boxes:
+
+    python src/headless.py --cpm 1200 --duration 90
+    python src/headless.py --cpm 600 --hotkeys          # wait for ']' / '+'
+    python src/headless.py --backend xtest --burst 4 --cpm 12000
+    python src/headless.py --pattern grid:100,100,10,5,40,40 --dwell 0.5
+    python src/headless.py --cpm 300 --jitter lognormal --spread 0.2 --seed 7
+    python src/headless.py --control                    # then: python src/control.py activate
+    python src/headless.py --trigger color:500,300,20,20,ff0000,16 --sample-hz 60
+    python src/headless.py --program bursts.mlkp        # exits when the program ends
+    python src/headless.py --cpm 12000 --clicks 5000    # exactly 5000 clicks, then exit
+"""
+import argparse
+import logging
+import sys
+import threading
+
+from backends import BACKENDS, PynputBackend, create_backend
+from engine import DEFAULT_CPM, MAX_BURST, MAX_CPM, MIN_BURST, MIN_CPM, ClickerThread
+from jitter import DEFAULT_SPREAD, DISTRIBUTIONS, JitterTable
+from logpipe import LogPipeline
+from patterns import parse_pattern
+
+log = logging.getLogger("rich")
+
+
+def _bounded_int(low, high):
+    def parse(text):
+        value = int(text)
+        if not low <= value <= high:
+            raise argparse.ArgumentTypeError(f"must be between {low} and {high}")
+        return value
+    return parse
+
+
+def _positive(convert):
+    def parse(text):
+        value = convert(text)
+        if not value > 0:
+            raise argparse.ArgumentTypeError("must be positive")
+        return value
+    parse.__name__ = convert.__name__ # argparse names it in "invalid int value" errors
+    return parse
+
+
+def _binding(text):
+    # Imported here so runs without hotkeys never touch the listener module
+    from hotkeys import parse_bind_argument
+
+    try:
+        return parse_bind_argument(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the MILKyclicks click engine without a GUI.")
+    parser.add_argument("--cpm", type=_bounded_int(MIN_CPM, MAX_CPM), default=DEFAULT_CPM,
+                        help=f"clicks per minute ({MIN_CPM}-{MAX_CPM}, default {DEFAULT_CPM})")
+    parser.add_argument("--duration", type=_positive(float), default=None,
+                        help="seconds to run before exiting (default: until Ctrl-C)")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=PynputBackend.name,
+                        help="click backend (default: pynput)")
+    parser.add_argument("--burst", type=_bounded_int(MIN_BURST, MAX_BURST), default=MIN_BURST,
+                        help="clicks per scheduler tick")
+    parser.add_argument("--adaptive", action="store_true", help="enable closed-loop rate control")
+    parser.add_argument("--pattern", default=None,
+                        help="move to and click each target in turn: grid:LEFT,TOP,COLUMNS,ROWS,STEP_X,STEP_Y, "
+                             "circle:X,Y,RADIUS,COUNT or random:LEFT,TOP,WIDTH,HEIGHT,COUNT[,SEED]")
+    parser.add_argument("--dwell", type=float, default=None,
+                        help="extra seconds to stay on each pattern target after clicking it")
+    parser.add_argument("--jitter", choices=DISTRIBUTIONS, default=None,
+                        help="randomize click intervals with this distribution (mean CPM unchanged)")
+    parser.add_argument("--spread", type=float, default=DEFAULT_SPREAD,
+                        help=f"jitter spread as a fraction of the interval (default {DEFAULT_SPREAD})")
+    parser.add_argument("--seed", type=int, default=None, help="jitter seed, for reproducible runs")
+    parser.add_argument("--program", default=None, metavar="FILE",
+                        help="run a click program (see program.py) instead of clicking at --cpm; "
+                             "without --hotkeys or --control, exit when it ends")
+    parser.add_argument("--clicks", type=_positive(int), default=None, metavar="N",
+                        help="switch off after exactly N clicks per activation "
+                             "(without --hotkeys or --control, exit)")
+    parser.add_argument("--run-seconds", type=_positive(float), default=None, metavar="SECONDS",
+                        help="switch off SECONDS after the first click of each activation, without overshoot")
+    parser.add_argument("--trigger", default=None,
+                        help="click only while a screen region matches: "
+                             "color:X,Y,WIDTH,HEIGHT,RRGGBB[,TOL[,FRACTION]], change:X,Y,WIDTH,HEIGHT[,FRACTION] "
+                             "or template:X,Y,FILE.ppm[,TOL[,FRACTION]]")
+    parser.add_argument("--sample-hz", type=float, default=None, metavar="HZ",
+                        help="how often the --trigger region is sampled (default 30)")
+    parser.add_argument("--hotkeys", action="store_true",
+                        help="listen for the global hotkeys and start inactive until ']' or '+'")
+    parser.add_argument("--bind", action="append", type=_binding, metavar="SPEC=ACTION",
+                        help="hotkey binding replacing the defaults (repeatable), e.g. ctrl+f6=activate, "
+                             "f7=deactivate, mouse:x1=hold; implies --hotkeys")
+    parser.add_argument("--control", nargs="?", const="", metavar="SOCKET",
+                        help="accept commands on a Unix socket (see control.py) and start inactive; "
+                             "by default $XDG_RUNTIME_DIR/milkyclicks-<uid>.sock")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", default=None, metavar="PATH",
+                        help="rewrite Prometheus metrics to this file every second")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level="WARNING" if args.quiet else "INFO",
+                        format="%(asctime)s %(levelname)s %(message)s", datefmt="%X")
+    # Printing happens on a background thread; repeated errors are collapsed
+    pipeline = LogPipeline(logging.getLogger().handlers[0]).install()
+    try:
+        return _run(args)
+    finally:
+        pipeline.stop()
+
+
+def _run(args):
+    pattern = None
+    if args.pattern:
+        try:
+            pattern = parse_pattern(args.pattern, dwell=args.dwell)
+        except ValueError as e:
+            log.error(f"Invalid --pattern: {e}")
+            return 2
+    jitter = None
+    if args.jitter:
+        try:
+            jitter = JitterTable(args.jitter, args.spread, seed=args.seed)
+        except ValueError as e:
+            log.error(f"Invalid jitter settings: {e}")
+            return 2
+    program = None
+    if args.program:
+        from program import load_program
+        try:
+            program = load_program(args.program)
+        except (OSError, ValueError) as e:
+            log.error(f"Invalid --program: {e}")
+            return 2
+    trigger = None
+    if args.trigger:
+        # Imported only when needed: loads libX11
+        from screen import DEFAULT_SAMPLE_HZ, RegionTrigger, parse_trigger
+        try:
+            sampler, condition = parse_trigger(args.trigger)
+        except ValueError as e:
+            log.error(f"Invalid --trigger: {e}")
+            return 2
+        except OSError as e:
+            log.error(f"Cannot sample the screen: {e}")
+            return 1
+        trigger = RegionTrigger(sampler, condition, args.sample_hz or DEFAULT_SAMPLE_HZ)
+    try:
+        backend = create_backend(args.backend)
+    except Exception as e:  # noqa: BLE001 - backends fail in platform-specific ways
+        log.error(f"Cannot use the '{args.backend}' backend: {e}")
+        if trigger is not None:
+            trigger.sampler.close()
+        return 1
+
+    clicker = ClickerThread(backend=backend)
+    clicker.set_speed(args.cpm)
+    clicker.set_burst(args.burst)
+    clicker.set_adaptive(args.adaptive)
+    clicker.set_pattern(pattern)
+    clicker.set_jitter(jitter)
+    if program is not None:
+        clicker.set_program(program)
+    clicker.set_budget(args.clicks, args.run_seconds)
+    if trigger is not None:
+        clicker.set_gate(trigger.is_open)
+        trigger.on_change = lambda is_open, sampled_at: clicker.gate_changed(sampled_at if is_open else None)
+        trigger.start()
+    clicker.start()
+
+    listener = None
+    if args.hotkeys or args.bind:
+        # Imported only when needed: starts pynput's keyboard hook
+        from hotkeys import KeyboardListener, describe_bindings
+
+        def hotkey_callback(active):
+            def apply(pressed_at):
+                clicker.set_active(active, pressed_at)
+                listener.record_latency(pressed_at)
+            return apply
+
+        listener = KeyboardListener(activate_callback=hotkey_callback(True),
+                                    deactivate_callback=hotkey_callback(False),
+                                    bindings=dict(args.bind) if args.bind else None)
+        listener.start()
+        log.info(f"Hotkeys: {describe_bindings(listener.bindings)}")
+
+    server = None
+    if args.control is not None:
+        from control import DEFAULT_SOCKET_PATH, ControlServer
+
+        def control_changed(name, value):
+            if name == "active" and listener is not None:
+                listener.note_state(bool(value)) # Keep the hotkey pipeline's view in sync
+
+        server = ControlServer(clicker, args.control or DEFAULT_SOCKET_PATH, on_change=control_changed)
+        try:
+            server.start()
+        except OSError as e:
+            log.error(f"Cannot serve the control socket: {e}")
+            if listener is not None:
+                listener.stop()
+            if trigger is not None:
+                trigger.stop()
+            clicker.stop()
+            return 1
+    exporter = None
+    if args.metrics_port is not None or args.metrics_file is not None:
+        from metrics import MetricsCollector, MetricsExporter
+        try:
+            exporter = MetricsExporter(MetricsCollector(clicker, listener), port=args.metrics_port,
+                                       path=args.metrics_file)
+        except OSError as e:
+            log.error(f"Cannot serve metrics on port {args.metrics_port}: {e}")
+        else:
+            exporter.start()
+    finished = threading.Event()
+
+    def run_finished(reason):
+        if listener is not None:
+            listener.note_state(False) # The next activation hotkey must not look like a repeat
+        if listener is None and server is None:
+            finished.set() # Nothing could start another run
+
+    clicker.on_finished = run_finished
+    if listener is None and server is None:
+        clicker.set_active(True)
+
+    try:
+        if not finished.wait(args.duration):
+            log.info(f"Duration of {args.duration:g}s reached.")
+    except KeyboardInterrupt:
+        log.info("Interrupted.")
+    finally:
+        if listener is not None:
+            listener.stop()
+        if server is not None:
+            server.stop()
+        if trigger is not None:
+            trigger.stop()
+        clicker.stop()
+        clicker.join()
+        if exporter is not None:
+            exporter.stop()
+
+    stats = clicker.timing.stats()
+    target_cpm = clicker.settings()[1]
+    if program is not None and program.duration:
+        target_cpm = round(program.clicks * 60.0 / program.duration)
+    log.info(f"Clicks: {clicker.timing.total_clicks}, achieved {clicker.achieved_cpm:.1f} CPM "
+             f"(target {target_cpm}), interval error p50 {stats.p50_error_ms:.3f} ms / "
+             f"p99 {stats.p99_error_ms:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Global hotkeys: a pynput keyboard listener that reports activation keys.
+
+Free of Qt; the GUI wraps the callbacks in signals, the headless runner
+calls the clicker directly.
+
+Bindings map a key spec to an action. A spec is a key (a character, a
+pynput Key name such as ``f6``, or ``mouse:<button>`` for a mouse button
+such as ``mouse:x1``/``mouse:button8``), optionally preceded by modifiers:
+``ctrl+shift+a``, ``alt+f6``, ``ctrl+mouse:middle``. Characters are matched
+as typed, so with shift held ``]`` arrives as ``}`` on a US layout. The
+``hold`` action clicks only while its key or button is down.
+
+pynput calls ``_on_press`` on its own thread for every press, OS auto-repeat
+included. Bindings are compiled into a dict keyed by (modifier mask, key),
+so that callback does one lookup and a few comparisons: auto-repeats of a
+held key are coalesced, presses of the same key inside the debounce window
+are dropped, and so are actions that would not change the state. What is
+left goes into a bounded queue that the listener's own thread drains into
+the callbacks. Holding ``]`` therefore produces one state change, not a
+stream of signals.
+"""
+import logging
+import queue
+import threading
+import time
+from array import array
+
+from timing import percentile
+
+log = logging.getLogger("rich")
+
+ACTION_ACTIVATE = "activate"
+ACTION_DEACTIVATE = "deactivate"
+ACTION_HOLD = "hold"  # Active while the key/button is down
+ACTIONS = (ACTION_ACTIVATE, ACTION_DEACTIVATE, ACTION_HOLD)
+MOUSE_PREFIX = "mouse:"
+
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+MOD_CMD = 8
+MODIFIERS = {"shift": MOD_SHIFT, "ctrl": MOD_CTRL, "alt": MOD_ALT, "cmd": MOD_CMD}
+# pynput Key names -> modifier bit
+_MODIFIER_KEYS = {"shift": MOD_SHIFT, "shift_l": MOD_SHIFT, "shift_r": MOD_SHIFT,
+                  "ctrl": MOD_CTRL, "ctrl_l": MOD_CTRL, "ctrl_r": MOD_CTRL,
+                  "alt": MOD_ALT, "alt_l": MOD_ALT, "alt_r": MOD_ALT, "alt_gr": MOD_ALT,
+                  "cmd": MOD_CMD, "cmd_l": MOD_CMD, "cmd_r": MOD_CMD}
+
+# Key spec -> action
+DEFAULT_BINDINGS = {
+    "]": ACTION_ACTIVATE,
+    "+": ACTION_ACTIVATE,
+    "[": ACTION_DEACTIVATE,
+    "-": ACTION_DEACTIVATE,
+}
+DEFAULT_DEBOUNCE = 0.05  # Seconds; a second press of the same key inside this is bounce
+EVENT_QUEUE_SIZE = 16  # Only state changes are queued, so this is plenty
+LATENCY_SAMPLES = 256  # Press-to-state-change latencies kept for latency_stats()
+
+
+def _key_id(key):
+    """Binding-table key for a pynput key: its character, else its name."""
+    char = getattr(key, 'char', None)
+    if char is None:
+        return getattr(key, 'name', None)
+    if len(char) == 1 and ord(char) < 32:
+        return chr(ord(char) + 96) # With ctrl held some platforms report control codes
+    return char.lower()
+
+
+def parse_binding(spec):
+    """Splits a key spec into ``(modifier mask, key id)``.
+
+    Raises:
+        ValueError: On an unknown modifier or an empty key.
+    """
+    if spec.endswith("+"): # The '+' key itself, bare or as 'ctrl++'
+        modifiers, key = spec[:-1].rstrip("+"), "+"
+    else:
+        modifiers, _, key = spec.rpartition("+")
+    if not key:
+        raise ValueError(f"Hotkey '{spec}' has no key")
+    mask = 0
+    for name in filter(None, modifiers.split("+")):
+        try:
+            mask |= MODIFIERS[name.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown modifier '{name}' in hotkey '{spec}'. "
+                             f"Choose from: {', '.join(MODIFIERS)}") from None
+    return mask, key.lower() if len(key) == 1 else key
+
+
+def compile_bindings(bindings):
+    """Compiles ``{spec: action}`` into the ``{(modifier mask, key id): action}``
+    table the listener callbacks look up.
+
+    Raises:
+        ValueError: On a malformed spec, an unknown action or two specs for one chord.
+    """
+    table = {}
+    for spec, action in bindings.items():
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown hotkey action '{action}'. Choose from: {', '.join(ACTIONS)}")
+        chord = parse_binding(spec)
+        if chord[1] == MOUSE_PREFIX + "left":
+            raise ValueError("The left mouse button can't be a hotkey: the clicker's own clicks would trigger it")
+        if chord in table:
+            raise ValueError(f"Hotkey '{spec}' is bound twice")
+        table[chord] = action
+    return table
+
+
+def parse_bind_argument(text):
+    """Parses a ``SPEC=ACTION`` command-line binding, e.g. ``ctrl+f6=hold``.
+
+    Raises:
+        ValueError: If the text is malformed.
+    """
+    spec, sep, action = text.rpartition("=")
+    if not sep or not spec:
+        raise ValueError(f"Expected SPEC=ACTION, got '{text}'")
+    parse_binding(spec)
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown hotkey action '{action}'. Choose from: {', '.join(ACTIONS)}")
+    return spec, action
+
+
+def describe_bindings(bindings):
+    """One-line summary for logs, e.g. "activate: ']' '+', deactivate: '[' '-'"."""
+    by_action = {}
+    for spec, action in bindings.items():
+        by_action.setdefault(action, []).append(f"'{spec}'")
+    return ", ".join(f"{action}: {' '.join(specs)}" for action, specs in by_action.items())
+
+
+# --- Keyboard Listener (Corrected Approach) ---
+# This class now runs the listener in a thread and uses callbacks
+# to trigger actions in the main GUI thread safely.
+class KeyboardListener:
+    # No pyqtSignals here!
+
+    def __init__(self, activate_callback, deactivate_callback, bindings=None, debounce=DEFAULT_DEBOUNCE):
+        """
+        Initializes the listener.
+        :param activate_callback: Called with the press time (perf_counter) when a key turns clicking on.
+        :param deactivate_callback: Called with the press time when a key turns clicking off.
+        :param bindings: Key spec -> action table (defaults to DEFAULT_BINDINGS).
+        :param debounce: Seconds within which a repeated press of the same key is ignored.
+        Callers report when the state actually changed with record_latency(pressed_at).
+        """
+        self.listener = None
+        self._thread = None
+        self._callbacks = {ACTION_ACTIVATE: activate_callback, ACTION_DEACTIVATE: deactivate_callback}
+        self.bindings = dict(DEFAULT_BINDINGS if bindings is None else bindings)
+        self._table = compile_bindings(self.bindings)
+        self._uses_mouse = any(key.startswith(MOUSE_PREFIX) for _, key in self._table)
+        self.debounce = debounce
+        self._queue = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._modifiers = 0 # Mask of modifier keys down right now
+        self._held = set() # Keys down right now; a press of one of these is auto-repeat
+        self._holding = set() # Hold-bound keys/buttons keeping the clicker on
+        self.mouse_listener = None
+        self._last_press = {} # Key -> perf_counter() of its last accepted press
+        self._active = False # State as last handed off (or reported through note_state)
+        # Counters of presses that never reached the callbacks
+        self.coalesced = 0
+        self.debounced = 0
+        self.unchanged = 0
+        self.dropped = 0
+        self._latencies = array("d", bytes(8 * LATENCY_SAMPLES))
+        self._latency_count = 0
+
+    def _on_press(self, key):
+        try:
+            key_id = _key_id(key)
+            modifier = _MODIFIER_KEYS.get(key_id)
+            if modifier:
+                self._modifiers |= modifier
+            else:
+                self._press(key_id, time.perf_counter())
+        except Exception as e:  # noqa: BLE001 - must not kill the listener thread
+            # Log errors happening within the listener thread
+            log.error(f"Error in key press handler: {e}", exc_info=False)
+
+    def _on_release(self, key):
+        try:
+            key_id = _key_id(key)
+            modifier = _MODIFIER_KEYS.get(key_id)
+            if modifier:
+                self._modifiers &= ~modifier
+            else:
+                self._release(key_id, time.perf_counter())
+        except Exception as e:  # noqa: BLE001 - must not kill the listener thread
+            log.error(f"Error in key release handler: {e}", exc_info=False)
+
+    def _on_click(self, x, y, button, pressed):
+        try:
+            key_id = MOUSE_PREFIX + button.name
+            if pressed:
+                self._press(key_id, time.perf_counter())
+            else:
+                self._release(key_id, time.perf_counter())
+        except Exception as e:  # noqa: BLE001 - must not kill the listener thread
+            log.error(f"Error in mouse button handler: {e}", exc_info=False)
+
+    def _press(self, key_id, pressed_at):
+        modifiers = self._modifiers
+        action = self._table.get((modifiers, key_id))
+        if action is None and modifiers & MOD_SHIFT and len(key_id) == 1:
+            # Shift is part of typing characters like '+' or '}' on most layouts
+            action = self._table.get((modifiers & ~MOD_SHIFT, key_id))
+        if action is None:
+            return
+        if key_id in self._held:
+            self.coalesced += 1 # OS auto-repeat of a key that is still down
+            return
+        self._held.add(key_id)
+        last = self._last_press.get(key_id)
+        self._last_press[key_id] = pressed_at
+        if last is not None and pressed_at - last < self.debounce:
+            self.debounced += 1
+            return
+        if action == ACTION_HOLD:
+            self._holding.add(key_id)
+        self._hand_off(action != ACTION_DEACTIVATE, pressed_at)
+
+    def _release(self, key_id, released_at):
+        self._held.discard(key_id)
+        if key_id in self._holding:
+            self._holding.discard(key_id)
+            if not self._holding: # Another held hold-key keeps clicking
+                self._hand_off(False, released_at)
+
+    def _hand_off(self, active, at):
+        if active == self._active:
+            self.unchanged += 1
+            return
+        self._active = active
+        try:
+            self._queue.put_nowait((ACTION_ACTIVATE if active else ACTION_DEACTIVATE, at))
+        except queue.Full:
+            self.dropped += 1
+            log.warning("Hotkey queue full; dropping a state change.")
+
+    def note_state(self, active):
+        """Tells the pipeline about state changes made elsewhere (GUI, budgets),
+        so the next hotkey that flips the state is not taken for a no-op."""
+        self._active = active
+
+    def record_latency(self, pressed_at):
+        """Records the time from a key press to the state change it caused."""
+        self._latencies[self._latency_count % LATENCY_SAMPLES] = time.perf_counter() - pressed_at
+        self._latency_count += 1
+
+    def latencies_since(self, count):
+        """Returns ``(latest count, latencies in seconds recorded after count)``;
+        at most LATENCY_SAMPLES, older ones are gone."""
+        latest = self._latency_count
+        start = max(count, latest - LATENCY_SAMPLES)
+        return latest, [self._latencies[i % LATENCY_SAMPLES] for i in range(start, latest)]
+
+    def latency_stats(self):
+        """Returns ``(samples, p50_ms, p99_ms, max_ms)`` of press-to-state-change latency."""
+        values = sorted(self._latencies[:min(self._latency_count, LATENCY_SAMPLES)])
+        if not values:
+            return 0, 0.0, 0.0, 0.0
+        return len(values), percentile(values, 50) * 1000.0, percentile(values, 99) * 1000.0, values[-1] * 1000.0
+
+    def _run_listener(self):
+        """Target function for the listener thread."""
+        try:
+            self._keyboard_listener()
+        except Exception:
+            # Log errors specific to listener setup or runtime
+            log.exception("Keyboard listener failed")
+            log.error("Check Accessibility permissions (System Settings > Privacy & Security > Accessibility).")
+        finally:
+            self.listener = None # Clean up listener instance
+            log.info("Keyboard listener thread finished.")
+
+    def _keyboard_listener(self):
+        # Imported here: pynput needs a display server, and callers that never
+        # start the listener (e.g. headless runs without hotkeys) shouldn't pay for it
+        from pynput import keyboard
+
+        # Create and run the listener within this thread's context
+        self.listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+        self.listener.start() # Start the listener
+        if self._uses_mouse:
+            from pynput import mouse
+
+            self.mouse_listener = mouse.Listener(on_click=self._on_click)
+            self.mouse_listener.start()
+        log.info("Keyboard listener started successfully.")
+        try:
+            self._drain_events() # Runs until stop() queues the sentinel
+        finally:
+            log.info("Keyboard listener stopping...")
+            for listener in (self.listener, self.mouse_listener):
+                if listener is not None:
+                    listener.stop() # Stop the pynput listener
+                    listener.join() # Wait for pynput listener to exit fully
+            self.mouse_listener = None
+
+    def _drain_events(self):
+        """Hands queued state changes to the callbacks, off pynput's thread."""
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            action, pressed_at = event
+            callback = self._callbacks[action]
+            if callback:
+                try:
+                    callback(pressed_at)
+                except Exception as e:  # noqa: BLE001 - must not kill the listener thread
+                    log.error(f"Error in hotkey callback: {e}", exc_info=False)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            log.info("Starting keyboard listener thread...")
+            # Run listener in a daemon thread so it exits with the main app if forced
+            self._thread = threading.Thread(target=self._run_listener, daemon=True, name="KeyboardListenerThread")
+            self._thread.start()
+
+    def stop(self):
+        if self._thread and self._thread.is_alive():
+            log.info("Requesting keyboard listener thread stop...")
+            try:
+                self._queue.put(None, timeout=1.0) # Sentinel: ends _drain_events
+            except queue.Full:
+                pass # Drain thread is stuck in a callback; the join below times out
+            self._thread.join(timeout=1.0) # Wait for the thread to exit
+            if self._thread.is_alive():
+                log.warning("Keyboard listener thread did not stop gracefully.")
+        self._thread = None
+        samples, p50, p99, worst = self.latency_stats()
+        if samples:
+            log.info(f"Hotkey latency over {samples} state changes: p50 {p50:.3f} ms / p99 {p99:.3f} ms / "
+                     f"max {worst:.3f} ms ({self.coalesced} repeats coalesced, {self.debounced} debounced)")
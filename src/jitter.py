@@ -0,0 +1,132 @@
+"""Humanized click timing: random interval factors with a mean of exactly 1.
+
+The click loop multiplies each tick interval by a factor read from a
+JitterTable. Factors are generated a block at a time with ``map`` pipelines
+over ``math``/``operator`` functions (the per-sample work runs in C), and
+each block is scaled to a mean of exactly 1.0, so the requested CPM is kept
+over every block. Two blocks are double-buffered: while the loop reads one,
+a background thread refills the other. A read is an index and a compare,
+with no RNG call on the click path.
+
+Blocks are generated strictly in order from one seeded ``random.Random``,
+so a given seed always produces the same sequence of factors.
+"""
+import logging
+import math
+import operator
+import random
+import threading
+from array import array
+from itertools import repeat
+
+log = logging.getLogger("rich")
+
+DISTRIBUTIONS = ("uniform", "normal", "lognormal", "bounded")
+DEFAULT_DISTRIBUTION = "normal"
+DEFAULT_SPREAD = 0.1  # Relative: 0.1 == intervals vary by about 10 %
+DEFAULT_BLOCK_SIZE = 4096
+MIN_FACTOR = 0.05  # Keeps normal samples from producing zero or negative intervals
+
+_TWO_PI = 2.0 * math.pi
+
+
+class JitterTable:
+    """Double-buffered supply of interval factors.
+
+    Distributions, with ``spread`` as a fraction of the mean interval:
+
+    - ``uniform``: evenly distributed within +/- ``spread``
+    - ``normal``: standard deviation ``spread`` (floored at MIN_FACTOR)
+    - ``lognormal``: log-normal with a standard deviation of about ``spread``;
+      right-skewed like human reaction times
+    - ``bounded``: normal with standard deviation ``spread / 2``, clipped to
+      +/- ``spread``
+
+    Only one thread (the click loop) may call :meth:`next`.
+    """
+
+    def __init__(self, distribution=DEFAULT_DISTRIBUTION, spread=DEFAULT_SPREAD,
+                 block_size=DEFAULT_BLOCK_SIZE, seed=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution '{distribution}'. Choose from: {', '.join(DISTRIBUTIONS)}")
+        if not 0.0 <= spread < 1.0:
+            raise ValueError(f"Jitter spread must be in [0, 1), got {spread}")
+        self.distribution = distribution
+        self.spread = spread
+        self.block_size = block_size
+        self.underruns = 0  # Times next() had to wait for the refill thread
+        self._rng = random.Random(seed)
+        self._block = self._generate()
+        self._spare = self._generate()
+        self._index = 0
+        self._spare_ready = threading.Event()
+        self._spare_ready.set()
+        self._refill_wanted = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._refill_loop, name="JitterRefillThread", daemon=True)
+        self._thread.start()
+
+    def next(self):
+        """Returns the next interval factor."""
+        index = self._index
+        if index == self.block_size:
+            self._swap()
+            index = 0
+        self._index = index + 1
+        return self._block[index]
+
+    def _swap(self):
+        if not self._spare_ready.is_set():
+            self.underruns += 1
+            self._spare_ready.wait()  # Waiting keeps seeded runs reproducible
+        self._spare_ready.clear()
+        self._block, self._spare = self._spare, self._block
+        self._refill_wanted.set()
+
+    def _refill_loop(self):
+        while True:
+            self._refill_wanted.wait()
+            self._refill_wanted.clear()
+            if self._closed:
+                return
+            self._spare[:] = self._generate()
+            self._spare_ready.set()
+
+    def close(self):
+        """Stops the refill thread."""
+        self._closed = True
+        self._refill_wanted.set()
+
+    def _uniforms(self, open_low=False):
+        """Block of uniform samples in [0, 1), or (0, 1] with ``open_low``."""
+        raw = array("I")
+        raw.frombytes(self._rng.randbytes(raw.itemsize * self.block_size))
+        scale = 1.0 / (1 << (8 * raw.itemsize))
+        if open_low:
+            return map(operator.mul, map(operator.add, raw, repeat(1)), repeat(scale))
+        return map(operator.mul, raw, repeat(scale))
+
+    def _normals(self):
+        """Block of standard normal samples (Box-Muller, cosine branch)."""
+        radii = map(math.sqrt, map(operator.mul, repeat(-2.0), map(math.log, self._uniforms(open_low=True))))
+        angles = map(math.cos, map(operator.mul, repeat(_TWO_PI), self._uniforms()))
+        return map(operator.mul, radii, angles)
+
+    def _generate(self):
+        spread = self.spread
+        if self.distribution == "uniform":
+            # 1 - spread + 2 * spread * u
+            samples = map(operator.add, repeat(1.0 - spread), map(operator.mul, repeat(2.0 * spread), self._uniforms()))
+        elif self.distribution == "lognormal":
+            sigma = math.sqrt(math.log1p(spread * spread))
+            samples = map(math.exp, map(operator.mul, repeat(sigma), self._normals()))
+        elif self.distribution == "bounded":
+            samples = map(operator.add, repeat(1.0), map(operator.mul, repeat(spread / 2.0), self._normals()))
+            samples = map(min, repeat(1.0 + spread), map(max, repeat(1.0 - spread), samples))
+        else:
+            samples = map(operator.add, repeat(1.0), map(operator.mul, repeat(spread), self._normals()))
+            samples = map(max, repeat(MIN_FACTOR), samples)
+        block = array("d", samples)
+        # Rescale to an exact mean of 1.0 so the block keeps the requested CPM
+        mean = math.fsum(block) / len(block)
+        return array("d", map(operator.mul, block, repeat(1.0 / mean)))
@@ -0,0 +1,63 @@
+"""Log window for the [ℕ] button: shows the lines kept by logpipe.LogRing.
+
+Imported on first use, like the expanded panel. The view polls the ring
+only while it is visible and appends just the lines it has not shown yet.
+"""
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget
+
+from logpipe import DEFAULT_RING_CAPACITY
+
+LOG_REFRESH_MS = 250
+
+
+class LogViewer(QWidget):
+    """Read-only, bounded view of a LogRing."""
+
+    def __init__(self, ring, font, parent=None, capacity=DEFAULT_RING_CAPACITY):
+        super().__init__(parent)
+        self.setWindowTitle("MILKy Clicks - Log")
+        # The main window is a Tool window, so this would count as the last window
+        self.setAttribute(Qt.WidgetAttribute.WA_QuitOnClose, False)
+        self.ring = ring
+        self._sequence = 0 # Last ring line appended to the view
+
+        self.text = QPlainTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setFont(font)
+        self.text.setMaximumBlockCount(capacity) # Old lines drop off like the ring's
+        self.text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text.setStyleSheet("QPlainTextEdit { background-color: rgb(30, 30, 30); color: white; }")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.text)
+        self.resize(720, 320)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(LOG_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        latest, lines = self.ring.since(self._sequence)
+        self._sequence = latest
+        if not lines:
+            return
+        scrollbar = self.text.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum() # Only auto-scroll when already at the end
+        cursor = QTextCursor(self.text.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not self.text.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(lines))
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
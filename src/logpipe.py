@@ -0,0 +1,184 @@
+"""Logging off the hot path.
+
+Loggers only put records on a queue (``logging.handlers.QueueHandler``); a
+``QueueListener`` thread does the formatting and output. Before records reach
+the output handlers they pass a dedup stage: repeats of the same warning or
+error within a window are counted instead of printed, and one summary line
+("Clicking error: ... (x1432 in 10s)") replaces them when the window ends,
+whether or not another record arrives. A bounded in-memory ring keeps recent
+lines for the GUI's log viewer.
+"""
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import deque
+
+DEFAULT_DEDUP_WINDOW = 10.0  # Seconds a repeated warning/error stays collapsed
+DEFAULT_RING_CAPACITY = 2000  # Lines kept for the log viewer
+DEDUP_LEVEL = logging.WARNING  # Lower levels are never collapsed
+
+
+class LogRing(logging.Handler):
+    """Keeps the last ``capacity`` formatted lines, numbered, for viewers to poll."""
+
+    def __init__(self, capacity=DEFAULT_RING_CAPACITY):
+        super().__init__()
+        self._lines = deque(maxlen=capacity)
+        self._sequence = 0
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)-8s %(message)s", datefmt="%X"))
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:  # noqa: BLE001 - logging.Handler contract: report, never raise
+            self.handleError(record)
+            return
+        with self.lock:
+            self._sequence += 1
+            self._lines.append((self._sequence, line))
+
+    def since(self, sequence):
+        """Returns ``(latest sequence, lines newer than sequence)``."""
+        with self.lock:
+            latest = self._sequence
+            if latest == sequence:
+                return latest, []
+            return latest, [line for number, line in self._lines if number > sequence]
+
+
+class DedupHandler(logging.Handler):
+    """Forwards records to ``targets``, collapsing repeated warnings/errors.
+
+    The first occurrence of a (logger, level, message) passes straight
+    through. Further occurrences within ``window`` seconds are only counted;
+    once the window has passed, :meth:`expire` (called by the listener when
+    the window ends), the next record seen or :meth:`flush` emits one
+    summary line for them.
+    """
+
+    def __init__(self, targets, window=DEFAULT_DEDUP_WINDOW):
+        super().__init__()
+        self.targets = list(targets)
+        self.window = window
+        self._pending = {}  # key -> [first record, window start, suppressed count]
+
+    def emit(self, record):
+        now = time.monotonic()
+        if self._pending:
+            self._expire(now)
+        if record.levelno >= DEDUP_LEVEL:
+            key = (record.name, record.levelno, record.getMessage())
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[2] += 1
+                return
+            self._pending[key] = [record, now, 0]
+        self._forward(record)
+
+    def expire(self):
+        """Emits summaries whose window has passed. Returns the seconds until the
+        next window ends, or None if nothing is collapsed."""
+        with self.lock:
+            now = time.monotonic()
+            if self._pending:
+                self._expire(now)
+            if not self._pending:
+                return None
+            return max(0.0, min(started for _, started, _ in self._pending.values()) + self.window - now)
+
+    def _expire(self, now):
+        for key, (record, started, suppressed) in list(self._pending.items()):
+            if now - started >= self.window:
+                del self._pending[key]
+                if suppressed:
+                    self._forward(self._summary(record, suppressed, now - started))
+
+    def _summary(self, record, suppressed, elapsed):
+        summary = logging.makeLogRecord(record.__dict__)
+        summary.msg = f"{record.getMessage()} (x{suppressed} more in {elapsed:.0f}s)"
+        summary.args = None
+        summary.exc_info = summary.exc_text = None
+        summary.created = time.time()
+        return summary
+
+    def _forward(self, record):
+        for target in self.targets:
+            if record.levelno >= target.level:
+                target.handle(record)
+
+    def flush(self):
+        """Emits summaries for everything still collapsed."""
+        now = time.monotonic()
+        for record, started, suppressed in self._pending.values():
+            if suppressed:
+                self._forward(self._summary(record, suppressed, now - started))
+        self._pending.clear()
+        for target in self.targets:
+            target.flush()
+
+
+class _DedupQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose blocking get times out when a dedup window ends, so
+    a burst of repeats that simply stops still gets its summary line. Nothing
+    collapsed means no timeout: an idle pipeline never wakes up."""
+
+    def __init__(self, log_queue, dedup):
+        super().__init__(log_queue, dedup)
+        self.dedup = dedup
+
+    def dequeue(self, block):
+        if not block:
+            return self.queue.get(False)
+        timeout = self.dedup.expire()
+        while True:
+            try:
+                return self.queue.get(True, timeout)
+            except queue.Empty:
+                timeout = self.dedup.expire()
+
+
+class LogPipeline:
+    """Routes the root logger through a queue to a background formatter thread."""
+
+    def __init__(self, output, ring_capacity=DEFAULT_RING_CAPACITY, dedup_window=DEFAULT_DEDUP_WINDOW):
+        """
+        Args:
+            output: Handler that prints (e.g. a RichHandler or StreamHandler);
+                it only ever runs on the listener thread.
+        """
+        self.output = output
+        self.ring = LogRing(ring_capacity)
+        self.dedup = DedupHandler([output, self.ring], dedup_window)
+        self.queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = _DedupQueueListener(self.queue, self.dedup)
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def install(self):
+        """Replaces the root logger's handlers with the queue and starts the listener."""
+        with self._lock:
+            if self._installed:
+                return self
+            root = logging.getLogger()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+            self.listener.start()
+            self._installed = True
+        return self
+
+    def stop(self):
+        """Drains the queue, prints pending dedup summaries and stops the thread.
+        Later records go straight to the output handler."""
+        with self._lock:
+            if not self._installed:
+                return
+            root = logging.getLogger()
+            root.removeHandler(self.handler)
+            root.addHandler(self.output)
+            self.listener.stop()
+            self.dedup.flush()
+            self._installed = False
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""Macro recording and replay.
+
+A recording is a set of typed columns, one entry per input event:
+
+    times  'd'  seconds since recording started
+    xs     'i'  pointer x (scroll: dx)
+    ys     'i'  pointer y (scroll: dy)
+    codes  'i'  button index into backends.BUTTONS, or key code (see below)
+    kinds  'B'  one of the EVENT_* constants
+
+Key codes are the Unicode code point for character keys; special keys
+(shift, f1, ...) are negative, ``-(index + 1)`` into a name table stored
+with the recording. On disk the columns follow a fixed header and the name
+table, so a recording is memory-mapped and cast in place on load: no
+parsing, however long it is.
+
+Replay runs on the same absolute-deadline sleep as the click loop. Keys and
+buttons are resolved once up front, so the replay loop only indexes the
+columns and calls the output.
+
+    python src/macro.py record clicks.mlkm --duration 30
+    python src/macro.py play clicks.mlkm --speed 2 --loops 0
+"""
+import argparse
+import logging
+import mmap
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Protocol
+
+from backends import BUTTONS
+from scheduler import sleep_until
+
+log = logging.getLogger("rich")
+
+EVENT_MOVE = 0
+EVENT_BUTTON_DOWN = 1
+EVENT_BUTTON_UP = 2
+EVENT_SCROLL = 3
+EVENT_KEY_DOWN = 4
+EVENT_KEY_UP = 5
+
+# magic, version, reserved, event count, duration, name table bytes
+_HEADER = struct.Struct("<4sHHQdI4x")
+_MAGIC = b"MLKM"
+_VERSION = 1
+_COLUMNS = (("times", "d"), ("xs", "i"), ("ys", "i"), ("codes", "i"), ("kinds", "B"))
+_VK_PREFIX = "<vk:"  # Name-table entry for keys pynput only knows by virtual key code
+
+
+class Macro:
+    """An immutable recording: typed columns plus the special-key name table.
+
+    Columns are ``array`` objects for fresh recordings and read-only
+    ``memoryview`` casts of a memory-mapped file for loaded ones. Call
+    :meth:`close` when done with a loaded macro.
+    """
+
+    def __init__(self, times, xs, ys, codes, kinds, key_names=(), duration=None, _mapping=None):
+        if not len(times) == len(xs) == len(ys) == len(codes) == len(kinds):
+            raise ValueError("Macro columns must all have the same length")
+        self.times = times
+        self.xs = xs
+        self.ys = ys
+        self.codes = codes
+        self.kinds = kinds
+        self.key_names = list(key_names)
+        self.duration = duration if duration is not None else (times[-1] if len(times) else 0.0)
+        self._mapping = _mapping
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def save(self, path):
+        names = "\n".join(self.key_names).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(self), self.duration, len(names)))
+            f.write(names + bytes(-len(names) % 8))  # Keep the float column 8-byte aligned
+            for attr, typecode in _COLUMNS:
+                column = getattr(self, attr)
+                if not isinstance(column, (array, memoryview)):
+                    column = array(typecode, column)
+                f.write(column.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a recording; the columns are views into the file.
+
+        Raises:
+            ValueError: If the file is not a macro recording or is truncated.
+        """
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            view = memoryview(mapping)
+            if len(view) < _HEADER.size:
+                raise ValueError(f"{path} is not a macro recording")
+            magic, version, _, count, duration, names_bytes = _HEADER.unpack_from(view)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a version {_VERSION} macro recording")
+            offset = _HEADER.size
+            names = bytes(view[offset:offset + names_bytes]).decode("utf-8")
+            offset += names_bytes + (-names_bytes % 8)
+            # Checked before any cast: a cast exports the mapping, which then can't be closed
+            if offset + sum(struct.calcsize(typecode) for _, typecode in _COLUMNS) * count > len(view):
+                raise ValueError(f"{path} is truncated")
+            columns = {}
+            for attr, typecode in _COLUMNS:
+                size = struct.calcsize(typecode) * count
+                columns[attr] = view[offset:offset + size].cast(typecode)
+                offset += size
+        except Exception:
+            view.release()
+            mapping.close()
+            raise
+        return cls(key_names=names.split("\n") if names else (), duration=duration,
+                   _mapping=(mapping, view), **columns)
+
+    def close(self):
+        """Releases the file mapping of a loaded macro (no-op otherwise)."""
+        if self._mapping is None:
+            return
+        for attr, _ in _COLUMNS:
+            column = getattr(self, attr)
+            if isinstance(column, memoryview):
+                column.release()
+        mapping, view = self._mapping
+        view.release()
+        mapping.close()
+        self._mapping = None
+
+
+class MacroRecorder:
+    """Records pointer and keyboard events through pynput listeners.
+
+    Events arrive on the two listener threads and are appended to growing
+    ``array`` columns under a lock; :meth:`to_macro` hands them over as a
+    :class:`Macro` without copying.
+    """
+
+    def __init__(self, record_moves=True, record_keys=True):
+        self.record_moves = record_moves
+        self.record_keys = record_keys
+        self._lock = threading.Lock()
+        self._columns = {attr: array(typecode) for attr, typecode in _COLUMNS}
+        self._key_names = {}
+        self._started_at = None
+        self._stopped_at = None
+        self._listeners = []
+
+    def start(self):
+        # Imported here: pynput needs a display server
+        from pynput import keyboard, mouse
+
+        self._buttons = {getattr(mouse.Button, name): index for index, name in enumerate(BUTTONS)}
+        self._started_at = time.perf_counter()
+        self._listeners = [mouse.Listener(on_move=self._on_move if self.record_moves else None,
+                                          on_click=self._on_click, on_scroll=self._on_scroll)]
+        if self.record_keys:
+            self._listeners.append(keyboard.Listener(on_press=self._on_press, on_release=self._on_release))
+        for listener in self._listeners:
+            listener.start()
+        log.info("Macro recording started.")
+
+    def stop(self):
+        self._stopped_at = time.perf_counter()
+        for listener in self._listeners:
+            listener.stop()
+        for listener in self._listeners:
+            listener.join()
+        self._listeners = []
+        log.info(f"Macro recording stopped: {len(self._columns['kinds'])} events.")
+
+    def _append(self, kind, x, y, code):
+        now = time.perf_counter()
+        columns = self._columns
+        with self._lock:
+            columns["times"].append(now - self._started_at)
+            columns["xs"].append(x)
+            columns["ys"].append(y)
+            columns["codes"].append(code)
+            columns["kinds"].append(kind)
+
+    def _on_move(self, x, y):
+        self._append(EVENT_MOVE, int(x), int(y), 0)
+
+    def _on_click(self, x, y, button, pressed):
+        index = self._buttons.get(button)
+        if index is not None:  # Side buttons etc. have no backend equivalent
+            self._append(EVENT_BUTTON_DOWN if pressed else EVENT_BUTTON_UP, int(x), int(y), index)
+
+    def _on_scroll(self, x, y, dx, dy):
+        if not self.record_moves:
+            self._append(EVENT_MOVE, int(x), int(y), 0)  # Scroll where the pointer was
+        self._append(EVENT_SCROLL, int(dx), int(dy), 0)
+
+    def _key_code(self, key):
+        char = getattr(key, "char", None)
+        if char is not None and len(char) == 1:
+            return ord(char)
+        name = getattr(key, "name", None) or f"{_VK_PREFIX}{key.vk}>"
+        with self._lock:
+            index = self._key_names.setdefault(name, len(self._key_names))
+        return -(index + 1)
+
+    def _on_press(self, key):
+        self._append(EVENT_KEY_DOWN, 0, 0, self._key_code(key))
+
+    def _on_release(self, key):
+        self._append(EVENT_KEY_UP, 0, 0, self._key_code(key))
+
+    def to_macro(self):
+        with self._lock:
+            end = self._stopped_at or time.perf_counter()
+            return Macro(key_names=list(self._key_names),  # Insertion order is index order
+                         duration=end - self._started_at, **self._columns)
+
+
+class MacroOutput(Protocol):
+    """Where MacroPlayer sends events. ``resolve_*`` are called once per
+    distinct button/key before replay starts, never from the replay loop."""
+
+    def resolve_button(self, index: int) -> object: ...
+    def resolve_key(self, code: int, key_names: list[str]) -> object: ...
+    def move(self, x: int, y: int) -> None: ...
+    def button(self, button: object, pressed: bool) -> None: ...
+    def scroll(self, dx: int, dy: int) -> None: ...
+    def key(self, key: object, pressed: bool) -> None: ...
+
+
+class NullMacroOutput:
+    """Counts events and discards them. Measures the bare cost of replay."""
+
+    def __init__(self):
+        self.events = 0
+
+    def resolve_button(self, index):
+        return index
+
+    def resolve_key(self, code, key_names):
+        return code
+
+    def move(self, x, y):
+        self.events += 1
+
+    def button(self, button, pressed):
+        self.events += 1
+
+    def scroll(self, dx, dy):
+        self.events += 1
+
+    def key(self, key, pressed):
+        self.events += 1
+
+
+class PynputMacroOutput:
+    """Replays through ``pynput`` mouse and keyboard controllers."""
+
+    def __init__(self):
+        # Imported here so recordings can be inspected without a display server
+        from pynput import keyboard, mouse
+
+        self._keyboard_module = keyboard
+        self._mouse = mouse.Controller()
+        self._keyboard = keyboard.Controller()
+        self._button_types = mouse.Button
+
+    def resolve_button(self, index):
+        return getattr(self._button_types, BUTTONS[index])
+
+    def resolve_key(self, code, key_names):
+        keyboard = self._keyboard_module
+        if code >= 0:
+            return keyboard.KeyCode.from_char(chr(code))
+        name = key_names[-code - 1]
+        if name.startswith(_VK_PREFIX):
+            return keyboard.KeyCode.from_vk(int(name[len(_VK_PREFIX):-1]))
+        return keyboard.Key[name]
+
+    def move(self, x, y):
+        self._mouse.position = (x, y)
+
+    def button(self, button, pressed):
+        (self._mouse.press if pressed else self._mouse.release)(button)
+
+    def scroll(self, dx, dy):
+        self._mouse.scroll(dx, dy)
+
+    def key(self, key, pressed):
+        (self._keyboard.press if pressed else self._keyboard.release)(key)
+
+
+class MacroPlayer(threading.Thread):
+    """Replays a Macro against absolute deadlines.
+
+    Event ``i`` of loop ``n`` is due at ``origin + (n * duration + times[i]) / speed``,
+    so late events never push the rest of the recording back. ``loops=0``
+    repeats until :meth:`stop`. Changing the speed mid-replay keeps the
+    current position in the recording.
+    """
+
+    def __init__(self, macro, output, speed=1.0, loops=1):
+        super().__init__(daemon=True, name="MacroPlayerThread")
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.macro = macro
+        self.output = output
+        self.loops = loops
+        self._speed = speed
+        self._wake = threading.Event()  # Set by stop() and set_speed()
+        self._stop_requested = False
+        self.loops_completed = 0
+
+    def set_speed(self, speed):
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self._speed = speed
+        self._wake.set()
+
+    def stop(self):
+        self._stop_requested = True
+        self._wake.set()
+
+    def _resolve(self):
+        """Maps every button and key used by the macro to output objects, once."""
+        macro, output = self.macro, self.output
+        targets = {}
+        for kind, code in set(zip(macro.kinds, macro.codes)):
+            if kind in (EVENT_BUTTON_DOWN, EVENT_BUTTON_UP):
+                targets[(kind, code)] = output.resolve_button(code)
+            elif kind in (EVENT_KEY_DOWN, EVENT_KEY_UP):
+                targets[(kind, code)] = output.resolve_key(code, macro.key_names)
+        # Indexed by event so the loop does a single list lookup
+        return [targets.get((kind, code)) for kind, code in zip(macro.kinds, macro.codes)]
+
+    def run(self):
+        macro, output = self.macro, self.output
+        times, xs, ys, kinds = macro.times, macro.xs, macro.ys, macro.kinds
+        targets = self._resolve()
+        count = len(macro)
+        log.info(f"Replaying macro: {count} events, {macro.duration:.2f}s at x{self._speed:g}.")
+        speed = self._speed
+        origin = time.perf_counter()
+        while count and not self._stop_requested and (self.loops == 0 or self.loops_completed < self.loops):
+            i = 0
+            while i < count:
+                if sleep_until(origin + times[i] / speed, self._wake.wait):
+                    if self._stop_requested:
+                        return
+                    self._wake.clear()
+                    if self._speed != speed:
+                        # Keep the current position in the recording
+                        now = time.perf_counter()
+                        origin = now - (now - origin) * speed / self._speed
+                        speed = self._speed
+                    continue
+                kind = kinds[i]
+                if kind == EVENT_MOVE:
+                    output.move(xs[i], ys[i])
+                elif kind == EVENT_BUTTON_DOWN or kind == EVENT_BUTTON_UP:
+                    output.move(xs[i], ys[i])
+                    output.button(targets[i], kind == EVENT_BUTTON_DOWN)
+                elif kind == EVENT_SCROLL:
+                    output.scroll(xs[i], ys[i])
+                else:
+                    output.key(targets[i], kind == EVENT_KEY_DOWN)
+                i += 1
+            origin += macro.duration / speed  # Next loop stays on the same time grid
+            self.loops_completed += 1
+        log.info(f"Macro replay finished after {self.loops_completed} loop(s).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay MILKyclicks macros.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record pointer and key events to a file")
+    record.add_argument("path")
+    record.add_argument("--duration", type=float, default=None, help="seconds to record (default: until Ctrl-C)")
+    record.add_argument("--no-moves", action="store_true", help="only record clicks, scrolls and keys")
+    record.add_argument("--no-keys", action="store_true", help="do not record keyboard events")
+    play = commands.add_parser("play", help="replay a recorded file")
+    play.add_argument("path")
+    play.add_argument("--speed", type=float, default=1.0, help="replay speed factor (default 1.0)")
+    play.add_argument("--loops", type=int, default=1, help="times to replay; 0 repeats until Ctrl-C")
+    info = commands.add_parser("info", help="describe a recorded file")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(message)s", datefmt="%X")
+
+    if args.command == "record":
+        recorder = MacroRecorder(record_moves=not args.no_moves, record_keys=not args.no_keys)
+        recorder.start()
+        try:
+            threading.Event().wait(args.duration)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            recorder.stop()
+        recorder.to_macro().save(args.path)
+        log.info(f"Saved {args.path}")
+        return 0
+
+    try:
+        macro = Macro.load(args.path)
+    except (OSError, ValueError) as e:
+        log.error(f"Cannot load macro: {e}")
+        return 1
+    try:
+        if args.command == "info":
+            log.info(f"{args.path}: {len(macro)} events over {macro.duration:.2f}s, "
+                     f"{len(macro.key_names)} special keys")
+            return 0
+        player = MacroPlayer(macro, PynputMacroOutput(), speed=args.speed, loops=args.loops)
+        player.start()
+        try:
+            while player.is_alive():
+                player.join(0.2)
+        except KeyboardInterrupt:
+            player.stop()
+            player.join()
+        return 0
+    finally:
+        macro.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,25 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
+import json
 import logging
+import logging.handlers
+import os
 import platform  # To check OS
 import sys
-import threading
+import time
+from collections import deque
+from functools import cache
 
-from pynput import keyboard, mouse
-from PyQt6.QtCore import QPoint, Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtCore import QPoint, Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QFontDatabase  # QIcon if needed later
-from PyQt6.QtWidgets import (QApplication, QHBoxLayout, QLabel, QPushButton,
-                             QSlider, QVBoxLayout, QWidget)
-from rich.console import Console
-from rich.logging import RichHandler
+from PyQt6.QtWidgets import (QApplication, QFileDialog, QHBoxLayout, QLabel,
+                             QPushButton, QSlider, QVBoxLayout, QWidget)
+
+from engine import (DEFAULT_CPM, MAX_BURST, MAX_CPM, MIN_BURST, MIN_CPM,
+                    ClickerThread)
+from hotkeys import KeyboardListener, describe_bindings, parse_bind_argument
+from logpipe import LogPipeline
 
 # --- Constants ---
 APP_NAME = "MILKy Clicks"
@@ -32,7 +41,7 @@ BTN_EXPAND = "[▼]"
 BTN_COLLAPSE = "[◀]"
 BTN_EXIT = "[x]"
 BTN_LOG = "[ℕ]" # Unicode 'DOUBLE-STRUCK CAPITAL N'
-BTN_SETTINGS = "[settings]" # Placeholder
+BTN_SETTINGS = "[settings]" # Loads/unloads a click program
 
 STATUS_OFF_ICON = "○"
 STATUS_ON_ICON = "●"
@@ -43,155 +52,113 @@ STATUS_TEXT_ON = f"{{ON:[{STATUS_ON_ICON}]}}"
 DEFAULT_FONT = "Monaco" if platform.system() == "Darwin" else "Consolas" # Basic OS check
 FALLBACK_FONT = "Monospace" # Generic fallback
 FONT_SIZE = 12
-
-MIN_CPM = 1
-MAX_CPM = 3000 # Clicks Per Minute
-DEFAULT_CPM = 600
+# Resolved family is cached on disk: enumerating QFontDatabase.families() is slow
+FONT_CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                               "milkyclicks", "font_cache.json")
+# Installing or removing fonts touches one of these, which invalidates the cache
+FONT_DIRS = {
+    "Darwin": ["/System/Library/Fonts", "/Library/Fonts", "~/Library/Fonts"],
+    "Windows": [os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts")],
+}.get(platform.system(), ["/usr/share/fonts", "/usr/local/share/fonts", "~/.local/share/fonts", "~/.fonts"])
 
 NOTIFICATION_DURATION_MS = 2000 # 2 seconds
 
+ENGINE_THREAD = "thread" # Click engine runs as a thread of the GUI process
+ENGINE_PROCESS = "process" # Click engine runs in a child process (see engine_process)
+
+# Live stats in the expanded panel (sampled from the clicker, never pushed per click)
+STATS_REFRESH_HZ = 10
+RATE_WINDOW_FRAMES = STATS_REFRESH_HZ # Measured CPM is averaged over ~1 second
+SPARKLINE_WIDTH = 19 # Matches the original [  ▂▂▂▃▃▃▄▄▄▄▅▅▅▅▆▆▆] graph
+SPARKLINE_BLOCKS = " ▁▂▃▄▅▆▇█"
+
+# UI changes are batched: at most one render pass per frame
+FRAME_MS = 16
+# Slider drags retune the clicker at most once per click tick (capped to this)
+RETUNE_MAX_MS = 100
+
+SPEED_TRACK_WIDTH = 15 # Width of the bar part in the ASCII '[0 █░▒░███]'
+SPEED_HANDLE = "░▒░"
+
+LAG_PROBE_MS = 100 # Period of the event-loop lag probe (only with metrics enabled)
+
 # --- Rich Logger Setup ---
-# Ensure logs go somewhere useful, stderr is common for console apps
-log_console = Console(stderr=True)
+# Importing rich costs more than building the window, so records are buffered
+# until the first frame is up and then replayed through the RichHandler.
+# From then on records go through a queue (logpipe), so formatting and
+# printing run on a background thread instead of the caller's.
+_startup_log_buffer = logging.handlers.MemoryHandler(capacity=10000, flushLevel=logging.CRITICAL + 1)
 logging.basicConfig(
     level="INFO",
     format="%(message)s",
     datefmt="[%X]",
-    handlers=[RichHandler(console=log_console, rich_tracebacks=True, show_path=False)] # Cleaner output
+    handlers=[_startup_log_buffer]
 )
 log = logging.getLogger("rich")
+log_pipeline = None # logpipe.LogPipeline, set up by install_rich_logging
+
+def install_rich_logging():
+    """Swaps the startup buffer for the queued RichHandler (stderr) and replays what was buffered."""
+    global _startup_log_buffer, log_pipeline
+    if _startup_log_buffer is None:
+        return
+    from rich.console import Console
+    from rich.logging import RichHandler
+
+    handler = RichHandler(console=Console(stderr=True), rich_tracebacks=True, show_path=False) # Cleaner output
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    log_pipeline = LogPipeline(handler).install()
+    _startup_log_buffer.setTarget(log_pipeline.handler)
+    _startup_log_buffer.close() # Flushes the buffered records to the target
+    _startup_log_buffer = None
+
+def _font_cache_key():
+    """Identifies the platform and installed font set without enumerating fonts."""
+    dir_stamps = []
+    for path in FONT_DIRS:
+        try:
+            dir_stamps.append(f"{path}:{os.stat(os.path.expanduser(path)).st_mtime_ns}")
+        except OSError:
+            continue
+    raw = "|".join([platform.system(), platform.release(), DEFAULT_FONT, FALLBACK_FONT, *dir_stamps])
+    return hashlib.sha1(raw.encode()).hexdigest()
 
-# --- Auto Clicker Thread (Unchanged) ---
-class ClickerThread(QThread):
-    click_signal = pyqtSignal() # To potentially signal each click if needed
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.mouse_controller = mouse.Controller()
-        self._is_active = False
-        self._lock = threading.Lock()
-        self._interval = 1.0 # Default: 1 click per second (60 CPM)
-        self._stop_event = threading.Event() # Using Event for clearer stopping
-
-    def run(self):
-        while not self._stop_event.is_set():
-            with self._lock:
-                active = self._is_active
-                interval = self._interval
-
-            if active:
-                try:
-                    self.mouse_controller.click(mouse.Button.left, 1)
-                except Exception as e:
-                    log.error(f"Clicking error: {e}", exc_info=False) # Log errors concisely
-                # Use event wait for interruptible sleep
-                self._stop_event.wait(interval)
-            else:
-                # Sleep longer when inactive using event wait
-                self._stop_event.wait(0.1)
-
-        log.info("Clicker thread finished.")
+def _load_cached_font_family(key):
+    try:
+        with open(FONT_CACHE_PATH, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cache.get("family") if cache.get("key") == key else None
 
+def _save_cached_font_family(key, family):
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "family": family}, f)
+    except OSError as e:
+        log.debug(f"Could not write font cache: {e}") # Cache is an optimisation only
 
-    def set_active(self, active):
-        with self._lock:
-            if active != self._is_active:
-                log.info(f"Clicker state changed to: {'ON' if active else 'OFF'}")
-            self._is_active = active
+def render_sparkline(values, ceiling):
+    """Maps values onto block characters, scaled so `ceiling` is a full block."""
+    top = len(SPARKLINE_BLOCKS) - 1
+    if ceiling <= 0:
+        return SPARKLINE_BLOCKS[0] * len(values)
+    return "".join(SPARKLINE_BLOCKS[min(top, round(v / ceiling * top))] for v in values)
 
-    def set_speed(self, cpm):
-        with self._lock:
-            cpm = max(cpm, MIN_CPM)
-            cpm = min(cpm, MAX_CPM)
-            # Prevent division by zero if MAX_CPM could be 0 (though unlikely here)
-            self._interval = 60.0 / max(cpm, 1) # Ensure cpm is at least 1 for division
-            log.debug(f"Click interval set to {self._interval:.4f}s ({cpm} CPM)")
 
-    def stop(self):
-        log.info("Requesting clicker thread stop...")
-        self.set_active(False) # Ensure clicking stops
-        self._stop_event.set() # Signal the loop to exit
+@cache
+def speed_tracks(width=SPEED_TRACK_WIDTH):
+    """All ASCII slider strings for a bar `width` wide, indexed by handle position."""
+    track_len = max(0, width - len(SPEED_HANDLE)) # Space for the actual track chars
+    return tuple(f"[0 {('█' * left + SPEED_HANDLE + '█' * (track_len - left)).ljust(width)[:width]}]"
+                 for left in range(track_len + 1))
 
 
-# --- Keyboard Listener (Corrected Approach) ---
-# This class now runs the listener in a thread and uses callbacks
-# to trigger actions in the main GUI thread safely.
-class KeyboardListener:
-    # No pyqtSignals here!
-
-    def __init__(self, activate_callback, deactivate_callback):
-        """
-        Initializes the listener.
-        :param activate_callback: Function to call (thread-safely) on activation key press.
-        :param deactivate_callback: Function to call (thread-safely) on deactivation key press.
-        """
-        self.listener = None
-        self._thread = None
-        self._activate_callback = activate_callback
-        self._deactivate_callback = deactivate_callback
-        self._stop_event = threading.Event() # To signal thread stop
-
-    def _on_press(self, key):
-        try:
-            # Use key.char for simple characters, works for '+', '-', '[', ']'
-            char = getattr(key, 'char', None)
-
-            # Handle activation keys
-            if char in (']', '+'):
-                 if self._activate_callback:
-                     # Call the provided callback function
-                     self._activate_callback()
-
-            # Handle deactivation keys
-            elif char in ('[', '-'):
-                if self._deactivate_callback:
-                    # Call the provided callback function
-                    self._deactivate_callback()
-
-        except Exception as e:
-            # Log errors happening within the listener thread
-            log.error(f"Error in key press handler: {e}", exc_info=False)
-
-    def _run_listener(self):
-        """Target function for the listener thread."""
-        try:
-            self._keyboard_listener()
-        except Exception as e:
-            # Log errors specific to listener setup or runtime
-            log.error(f"Keyboard listener failed: {e}", exc_info=True)
-            log.error("Check Accessibility permissions (System Settings > Privacy & Security > Accessibility).")
-        finally:
-            self.listener = None # Clean up listener instance
-            log.info("Keyboard listener thread finished.")
-
-    def _keyboard_listener(self):
-        # Create and run the listener within this thread's context
-        self.listener = keyboard.Listener(on_press=self._on_press)
-        self.listener.start() # Start the listener
-        log.info("Keyboard listener started successfully.")
-        self._stop_event.wait() # Keep thread alive until stop is called
-        log.info("Keyboard listener stopping...")
-        self.listener.stop() # Stop the pynput listener
-        self.listener.join() # Wait for pynput listener to exit fully
-
-
-    def start(self):
-        if self._thread is None or not self._thread.is_alive():
-            log.info("Starting keyboard listener thread...")
-            self._stop_event.clear() # Reset stop event
-            # Run listener in a daemon thread so it exits with the main app if forced
-            self._thread = threading.Thread(target=self._run_listener, daemon=True, name="KeyboardListenerThread")
-            self._thread.start()
-
-    def stop(self):
-        if self._thread and self._thread.is_alive():
-            log.info("Requesting keyboard listener thread stop...")
-            self._stop_event.set() # Signal the thread's main loop to exit
-            # No need to call self.listener.stop() here, it's handled in _run_listener exit
-            self._thread.join(timeout=1.0) # Wait for the thread to exit
-            if self._thread.is_alive():
-                log.warning("Keyboard listener thread did not stop gracefully.")
-        self._thread = None
+def render_speed_track(cpm, width=SPEED_TRACK_WIDTH):
+    """ASCII slider for `cpm`: a table lookup, nothing is built per call."""
+    tracks = speed_tracks(width)
+    return tracks[(cpm - MIN_CPM) * (len(tracks) - 1) // max(1, MAX_CPM - MIN_CPM)]
 
 
 # --- Main Application Window (Inherits QWidget, uses QObject features) ---
@@ -202,26 +169,47 @@ class MilkyClickerApp(QWidget):
     update_speed_display_signal = pyqtSignal(int)
     show_notification_signal = pyqtSignal(str)
 
-    # Signals triggered by keyboard listener callbacks
-    keyboard_activate_signal = pyqtSignal()
-    keyboard_deactivate_signal = pyqtSignal()
-
-    def __init__(self):
+    # Signals triggered by keyboard listener callbacks (carry the key press time)
+    keyboard_activate_signal = pyqtSignal(float)
+    keyboard_deactivate_signal = pyqtSignal(float)
+    control_change_signal = pyqtSignal(str, int) # Applied by the control server; sync the UI
+    run_finished_signal = pyqtSignal(str) # The clicker switched itself off: "program", "clicks" or "duration"
+
+    def __init__(self, engine=ENGINE_THREAD, bindings=None, control_path=None, metrics_port=None, metrics_file=None,
+                 run_clicks=None, run_seconds=None):
+        """`control_path`: serve control.py's socket protocol there ("" for the default path).
+        `metrics_port`/`metrics_file`: export metrics.py's Prometheus text over HTTP and/or to a file.
+        `run_clicks`/`run_seconds`: end every activation after exactly that many clicks / seconds."""
         super().__init__()
         self._is_active = False
         self._is_expanded = False
         self._current_cpm = DEFAULT_CPM
+        self._burst = MIN_BURST
+        self._cpm_history = deque([0.0] * SPARKLINE_WIDTH, maxlen=SPARKLINE_WIDTH)
+        self._rate_samples = deque(maxlen=RATE_WINDOW_FRAMES + 1) # (time, total clicks)
         self._drag_pos = QPoint() # For moving frameless window
+        self.expandable_widget = None # Built lazily by _create_expanded_panel
+        self.log_viewer = None # Built on first use by show_log_info
+        self._program_name = None # File name of the loaded click program, if any
 
         # --- Initialize Core Components ---
-        self.clicker_thread = ClickerThread()
+        # A child-process engine keeps GUI work (and its GIL) away from click timing
+        if engine == ENGINE_PROCESS:
+            # Only pulled in when asked for
+            from engine_process import ProcessClicker
+            self.clicker_thread = ProcessClicker()
+        else:
+            self.clicker_thread = ClickerThread()
+        self.clicker_thread.on_finished = lambda reason: self.run_finished_signal.emit(reason)
 
         # Instantiate KeyboardListener, passing thread-safe trigger methods
         # NOTE: Using lambda ensures `self` is captured correctly at call time
         # Pass self as the parent object instead of trying to invoke the signal directly
+        # The listener only hands over state changes (repeats coalesced, bounces dropped)
         self.keyboard_listener = KeyboardListener(
-            activate_callback=lambda: self.keyboard_activate_signal.emit(),
-            deactivate_callback=lambda: self.keyboard_deactivate_signal.emit()
+            activate_callback=lambda pressed_at: self.keyboard_activate_signal.emit(pressed_at),
+            deactivate_callback=lambda pressed_at: self.keyboard_deactivate_signal.emit(pressed_at),
+            bindings=bindings
         )
 
         # --- Connect Signals/Slots ---
@@ -229,10 +217,24 @@ class MilkyClickerApp(QWidget):
         self.keyboard_activate_signal.connect(self.activate_clicker)
         self.keyboard_deactivate_signal.connect(self.deactivate_clicker)
 
-        # Connect internal signals for safe GUI updates
-        self.update_status_signal.connect(self._update_status_label)
-        self.update_speed_display_signal.connect(self._update_speed_display)
-        self.show_notification_signal.connect(self._display_notification)
+        # Connect internal signals for safe GUI updates. They only record what
+        # changed; _render applies it all in one pass per frame.
+        self._pending_render = {} # Part -> latest value (last one wins)
+        self._label_texts = {} # Widget -> text last set through _set_text
+        self._window_sizes = {} # _is_expanded -> fixed window size, computed once each
+        self._last_render = 0.0
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self._render)
+        self._pending_speed = None # Slider value not yet handed to the clicker
+        self.retune_timer = QTimer(self)
+        self.retune_timer.setSingleShot(True)
+        self.retune_timer.timeout.connect(self._apply_pending_speed)
+        self.update_status_signal.connect(lambda is_active: self._request_render("status", is_active))
+        self.update_speed_display_signal.connect(lambda cpm: self._request_render("speed", cpm))
+        self.show_notification_signal.connect(self._queue_notification)
+        self.control_change_signal.connect(self._apply_control_change)
+        self.run_finished_signal.connect(self._apply_run_finished)
 
         # --- Setup Window ---
         self.setWindowTitle(APP_NAME)
@@ -251,29 +253,82 @@ class MilkyClickerApp(QWidget):
         self._apply_styling() # Apply custom styles
 
         # --- Set Initial State ---
+        self._update_border_widths() # Border lengths never change
+        self._collapsed_border_widgets = [self.bottom_border_layout_collapsed.itemAt(i).widget()
+                                          for i in range(self.bottom_border_layout_collapsed.count())
+                                          if self.bottom_border_layout_collapsed.itemAt(i).widget()]
         self.update_ui_state()
+        self._update_status_label(self._is_active)
         self.clicker_thread.set_speed(self._current_cpm) # Set initial speed
+        if run_clicks is not None or run_seconds is not None:
+            if hasattr(self.clicker_thread, "set_budget"):
+                self.clicker_thread.set_budget(run_clicks, run_seconds)
+            else:
+                log.warning("Run budgets need --engine thread; ignoring them.")
         self.update_speed_display_signal.emit(self._current_cpm)
 
         # --- Start Threads ---
         self.clicker_thread.start()
         self.keyboard_listener.start() # Start listener after GUI setup
+        self.control_server = None
+        if control_path is not None:
+            # Only pulled in when asked for
+            from control import DEFAULT_SOCKET_PATH, ControlServer
+            self.control_server = ControlServer(
+                self.clicker_thread, control_path or DEFAULT_SOCKET_PATH,
+                on_change=lambda name, value: self.control_change_signal.emit(name, value))
+            try:
+                self.control_server.start()
+            except OSError as e:
+                log.error(f"Cannot serve the control socket: {e}")
+                self.control_server = None
+        self.metrics_exporter = None
+        if metrics_port is not None or metrics_file is not None:
+            # Only pulled in when asked for
+            from metrics import MetricsCollector, MetricsExporter
+            collector = MetricsCollector(self.clicker_thread, self.keyboard_listener)
+            try:
+                self.metrics_exporter = MetricsExporter(collector, port=metrics_port, path=metrics_file)
+            except OSError as e:
+                log.error(f"Cannot serve metrics on port {metrics_port}: {e}")
+            else:
+                self.metrics_exporter.start()
+                # Fires on the GUI thread, so its lateness is the event loop's lag
+                self.lag_probe = collector.lag_probe(LAG_PROBE_MS / 1000.0)
+                self.lag_probe_timer = QTimer(self)
+                self.lag_probe_timer.setTimerType(Qt.TimerType.PreciseTimer)
+                self.lag_probe_timer.timeout.connect(self.lag_probe.tick)
+                self.lag_probe_timer.start(LAG_PROBE_MS)
 
         # --- Notification Timer ---
         self.notification_timer = QTimer(self)
         self.notification_timer.setSingleShot(True)
         self.notification_timer.timeout.connect(self.notification_label.hide)
 
+        # --- Live Stats Timer (only runs while the panel is expanded) ---
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000 // STATS_REFRESH_HZ)
+        self.stats_timer.timeout.connect(self._refresh_live_stats)
+
         log.info(f"{APP_NAME} v{VERSION} initialized. Waiting for activation...")
-        log.info("Activate: ']' or '+', Deactivate: '[' or '-'")
+        log.info(f"Hotkeys: {describe_bindings(self.keyboard_listener.bindings)}")
         log.info(f"Using Font: {self.monospace_font.family()} {self.monospace_font.pointSize()}pt")
 
 
     def _get_monospace_font(self):
-        """Attempts to load the preferred monospace font, falling back if needed."""
+        """Attempts to load the preferred monospace font, falling back if needed.
+        The resolved family is cached on disk per platform and installed font set."""
+        cache_key = _font_cache_key()
+        cached_family = _load_cached_font_family(cache_key)
+        if cached_family:
+            log.debug(f"Using cached font resolution: {cached_family}")
+            font = QFont(cached_family, FONT_SIZE)
+            font.setStyleHint(QFont.StyleHint.Monospace)
+            return font
+
         # In PyQt6, we need to use the static methods of QFontDatabase
         available_families = QFontDatabase.families()
-        
+
         if DEFAULT_FONT in available_families:
             log.debug(f"Using preferred font: {DEFAULT_FONT}")
             font = QFont(DEFAULT_FONT, FONT_SIZE)
@@ -286,6 +341,7 @@ class MilkyClickerApp(QWidget):
             font.setPointSize(FONT_SIZE) # Ensure correct size
 
         font.setStyleHint(QFont.StyleHint.Monospace)
+        _save_cached_font_family(cache_key, font.family())
         return font
 
     def _create_widgets(self):
@@ -300,30 +356,6 @@ class MilkyClickerApp(QWidget):
         self.expand_collapse_button = QPushButton() # Text set in update_ui_state
         self.exit_button = QPushButton(BTN_EXIT)
 
-        # --- Expandable Area Widgets ---
-        self.expandable_widget = QWidget() # Container
-
-        # Line 1: CPM Display
-        self.line1_prefix = QLabel("1╠─")
-        self.cpm_label_static = QLabel("[cpm]")
-        self.cpm_value_label = QLabel(f"{self._current_cpm: <4}") # Updated via signal
-        self.cpm_status_placeholder = QLabel("[status]") # Placeholder
-        self.cpm_graph_label = QLabel("[  ▂▂▂▃▃▃▄▄▄▄▅▅▅▅▆▆▆]") # Static visual
-
-        # Line 2: Spacer
-        self.line2_prefix = QLabel("2╠─")
-        self.line2_spacer = QLabel(" " * 60) # Adjust as needed
-
-        # Line 3: Click Speed Slider Representation
-        self.line3_prefix = QLabel("3╠─")
-        self.click_speed_label_static = QLabel("[click_speed]")
-        self.click_speed_status_placeholder = QLabel("[status]") # Placeholder
-
-        # ASCII Slider Visualisation & Controls
-        self.speed_decrease_button = QPushButton("<")
-        self.speed_ascii_label = QLabel() # Updated via signal
-        self.speed_increase_button = QPushButton(">")
-
         # Hidden Real Slider for Control Logic
         self.speed_slider = QSlider(Qt.Orientation.Horizontal)
         self.speed_slider.setRange(MIN_CPM, MAX_CPM)
@@ -356,9 +388,97 @@ class MilkyClickerApp(QWidget):
         self.log_button.clicked.connect(self.show_log_info)
         self.settings_button.clicked.connect(self.show_settings_info)
         self.speed_slider.valueChanged.connect(self.update_speed) # Connect hidden slider
+
+
+    def _create_expanded_panel(self):
+        """Builds the expandable area on first expand; the window starts collapsed,
+        so startup doesn't pay for widgets nobody has looked at yet."""
+        # --- Expandable Area Widgets ---
+        self.expandable_widget = QWidget() # Container
+
+        # Line 1: CPM Display
+        self.line1_prefix = QLabel("1╠─")
+        self.cpm_label_static = QLabel("[cpm]")
+        self.cpm_value_label = QLabel(f"{self._current_cpm: <4}") # Updated via signal
+        self.cpm_status_placeholder = QLabel("[    0]") # Measured CPM
+        self.cpm_graph_label = QLabel(f"[{render_sparkline(self._cpm_history, 1)}]") # Live sparkline
+
+        # Line 2: Burst size (clicks per scheduler tick), next to the speed row
+        self.line2_prefix = QLabel("2╠─")
+        self.burst_label_static = QLabel("[burst]")
+        self.burst_decrease_button = QPushButton("<")
+        self.burst_value_label = QLabel(f"x{self._burst}")
+        self.burst_increase_button = QPushButton(">")
+
+        # Line 3: Click Speed Slider Representation
+        self.line3_prefix = QLabel("3╠─")
+        self.click_speed_label_static = QLabel("[click_speed]")
+        self.click_speed_status_placeholder = QLabel("[  --%]") # Measured / target CPM
+
+        # ASCII Slider Visualisation & Controls
+        self.speed_decrease_button = QPushButton("<")
+        self.speed_ascii_label = QLabel() # Updated via signal
+        self.speed_increase_button = QPushButton(">")
+
+        # --- Connect Panel Signals ---
         self.speed_decrease_button.clicked.connect(lambda: self.speed_slider.setValue(self.speed_slider.value() - self.calculate_step(self.speed_slider.value())))
         self.speed_increase_button.clicked.connect(lambda: self.speed_slider.setValue(self.speed_slider.value() + self.calculate_step(self.speed_slider.value())))
+        self.burst_decrease_button.clicked.connect(lambda: self.update_burst(self._burst - 1))
+        self.burst_increase_button.clicked.connect(lambda: self.update_burst(self._burst + 1))
 
+        # --- Expandable Area Layout ---
+        expandable_layout = QVBoxLayout(self.expandable_widget)
+        expandable_layout.setContentsMargins(4, 2, 4, 2)
+        expandable_layout.setSpacing(1)
+        # Line 1
+        line1_layout = QHBoxLayout()
+        line1_layout.addWidget(self.line1_prefix)
+        line1_layout.addWidget(self.cpm_label_static)
+        line1_layout.addWidget(self.cpm_value_label)
+        line1_layout.addSpacing(10)
+        line1_layout.addWidget(self.cpm_status_placeholder)
+        line1_layout.addSpacing(10)
+        line1_layout.addWidget(self.cpm_graph_label)
+        line1_layout.addStretch(1)
+        expandable_layout.addLayout(line1_layout)
+        # Line 2
+        line2_layout = QHBoxLayout()
+        line2_layout.addWidget(self.line2_prefix)
+        line2_layout.addWidget(self.burst_label_static)
+        line2_layout.addSpacing(10)
+        line2_layout.addWidget(self.burst_decrease_button)
+        line2_layout.addWidget(self.burst_value_label)
+        line2_layout.addWidget(self.burst_increase_button)
+        line2_layout.addStretch(1)
+        expandable_layout.addLayout(line2_layout)
+        # Line 3
+        line3_layout = QHBoxLayout()
+        line3_layout.addWidget(self.line3_prefix)
+        line3_layout.addWidget(self.click_speed_label_static)
+        line3_layout.addSpacing(10)
+        line3_layout.addWidget(self.click_speed_status_placeholder)
+        line3_layout.addSpacing(10)
+        line3_layout.addWidget(self.speed_decrease_button)
+        line3_layout.addWidget(self.speed_ascii_label)
+        line3_layout.addWidget(self.speed_increase_button)
+        line3_layout.addStretch(1)
+        expandable_layout.addLayout(line3_layout)
+        # Slot the panel in between the mid separator and the bottom border
+        self.main_layout.insertWidget(self._expandable_index, self.expandable_widget)
+
+        # --- Panel Styling ---
+        self.speed_decrease_button.setToolTip("Decrease Click Speed")
+        self.speed_increase_button.setToolTip("Increase Click Speed")
+        self.burst_decrease_button.setToolTip("Fewer Clicks Per Tick")
+        self.burst_increase_button.setToolTip("More Clicks Per Tick (same average CPM)")
+        fm = self.fontMetrics()
+        self.speed_decrease_button.setFixedWidth(fm.horizontalAdvance("< "))
+        self.speed_increase_button.setFixedWidth(fm.horizontalAdvance("> "))
+        self.burst_decrease_button.setFixedWidth(fm.horizontalAdvance("< "))
+        self.burst_increase_button.setFixedWidth(fm.horizontalAdvance("> "))
+        self.burst_value_label.setFixedWidth(fm.horizontalAdvance(f"x{MAX_BURST}"))
+
+        self._update_speed_display(self._current_cpm)
 
     def calculate_step(self, current_value):
         """ Calculate dynamic step for +/- buttons """
@@ -405,41 +525,8 @@ class MilkyClickerApp(QWidget):
         mid_separator_layout.addWidget(self.mid_separator_right, 1) # Allow stretch
         self.main_layout.addLayout(mid_separator_layout)
 
-        # --- Expandable Area Layout ---
-        expandable_layout = QVBoxLayout(self.expandable_widget)
-        expandable_layout.setContentsMargins(4, 2, 4, 2)
-        expandable_layout.setSpacing(1)
-        # Line 1
-        line1_layout = QHBoxLayout()
-        line1_layout.addWidget(self.line1_prefix)
-        line1_layout.addWidget(self.cpm_label_static)
-        line1_layout.addWidget(self.cpm_value_label)
-        line1_layout.addSpacing(10)
-        line1_layout.addWidget(self.cpm_status_placeholder)
-        line1_layout.addSpacing(10)
-        line1_layout.addWidget(self.cpm_graph_label)
-        line1_layout.addStretch(1)
-        expandable_layout.addLayout(line1_layout)
-        # Line 2
-        line2_layout = QHBoxLayout()
-        line2_layout.addWidget(self.line2_prefix)
-        line2_layout.addWidget(self.line2_spacer)
-        line2_layout.addStretch(1)
-        expandable_layout.addLayout(line2_layout)
-        # Line 3
-        line3_layout = QHBoxLayout()
-        line3_layout.addWidget(self.line3_prefix)
-        line3_layout.addWidget(self.click_speed_label_static)
-        line3_layout.addSpacing(10)
-        line3_layout.addWidget(self.click_speed_status_placeholder)
-        line3_layout.addSpacing(10)
-        line3_layout.addWidget(self.speed_decrease_button)
-        line3_layout.addWidget(self.speed_ascii_label)
-        line3_layout.addWidget(self.speed_increase_button)
-        line3_layout.addStretch(1)
-        expandable_layout.addLayout(line3_layout)
-        # Add expandable widget to main layout
-        self.main_layout.addWidget(self.expandable_widget)
+        # --- Expandable Area (built on first expand, see _create_expanded_panel) ---
+        self._expandable_index = self.main_layout.count()
 
         # --- Bottom Border ---
         # Collapsed border layout
@@ -453,7 +540,6 @@ class MilkyClickerApp(QWidget):
         self.main_layout.addWidget(self.bottom_border_expanded)
 
         self.setLayout(self.main_layout)
-        self.expandable_widget.setVisible(False) # Start hidden
         self.bottom_border_expanded.setVisible(False) # Start hidden
 
 
@@ -500,10 +586,11 @@ class MilkyClickerApp(QWidget):
         self.exit_button.setStyleSheet(f"{base_button_style} color: red;")
         self.exit_button.setToolTip("Exit Application")
         self.expand_collapse_button.setToolTip("Expand/Collapse Details")
-        self.log_button.setToolTip("Show Log Info (in console)")
-        self.settings_button.setToolTip("Settings (Not Implemented)")
-        self.speed_decrease_button.setToolTip("Decrease Click Speed")
-        self.speed_increase_button.setToolTip("Increase Click Speed")
+        self.log_button.setToolTip("Show/Hide Log")
+        self.settings_button.setToolTip("Load Click Program")
+        if not hasattr(self.clicker_thread, "set_program"):
+            self.settings_button.setEnabled(False) # The process engine can't run programs
+            self.settings_button.setToolTip("Click programs need --engine thread")
 
 
         # Fixed widths based on text for critical alignment buttons
@@ -511,8 +598,6 @@ class MilkyClickerApp(QWidget):
         self.expand_collapse_button.setFixedWidth(fm.horizontalAdvance(BTN_COLLAPSE + " ")) # Use widest text
         self.exit_button.setFixedWidth(fm.horizontalAdvance(BTN_EXIT + " "))
         self.log_button.setFixedWidth(fm.horizontalAdvance(BTN_LOG + " "))
-        self.speed_decrease_button.setFixedWidth(fm.horizontalAdvance("< "))
-        self.speed_increase_button.setFixedWidth(fm.horizontalAdvance("> "))
 
         # Notification Label Styling
         self.notification_label.setStyleSheet(f"""
@@ -547,96 +632,174 @@ class MilkyClickerApp(QWidget):
 
 
     def update_ui_state(self):
-        """Updates the UI based on the current state (_is_expanded, _is_active)."""
-        # Update Expand/Collapse Button and Visibility
-        self.expand_collapse_button.setText(BTN_COLLAPSE if self._is_expanded else BTN_EXPAND)
-        self.expandable_widget.setVisible(self._is_expanded)
-
-        # Update Top Bar Text
-        self.milky_label.setText(f"{V_LINE} MILKy {V_LINE}" if self._is_expanded else f"{V_LINE}  MILK {V_LINE}")
-
-        # Update Borders visibility
-        for i in range(self.bottom_border_layout_collapsed.count()):
-             widget = self.bottom_border_layout_collapsed.itemAt(i).widget()
-             if widget:
-                 widget.setVisible(not self._is_expanded)
-        self.bottom_border_expanded.setVisible(self._is_expanded)
-
-        # Ensure status label is correct
-        self._update_status_label(self._is_active)
-
-        # Update border text content (lengths)
-        self._update_border_widths()
-
-        # Adjust window size smoothly
-        # self.adjustSize() # This can be jerky with show/hide
-        # Fixed size might be better if layout is stable
-        self.setFixedSize(self.main_layout.sizeHint()) # Try fixing size based on hint
+        """Switches the window between its collapsed and expanded look (_is_expanded)."""
+        expanded = self._is_expanded
+        self._set_text(self.expand_collapse_button, BTN_COLLAPSE if expanded else BTN_EXPAND)
+        if self.expandable_widget is not None:
+            self.expandable_widget.setVisible(expanded)
+        self._set_text(self.milky_label, f"{V_LINE} MILKy {V_LINE}" if expanded else f"{V_LINE}  MILK {V_LINE}")
+        for widget in self._collapsed_border_widgets:
+            widget.setVisible(not expanded)
+        self.bottom_border_expanded.setVisible(expanded)
+
+        # Both layouts are fixed, so each size is measured once instead of per toggle
+        size = self._window_sizes.get(expanded)
+        if size is None:
+            size = self._window_sizes[expanded] = self.main_layout.sizeHint()
+        self.setFixedSize(size)
+
+    def _set_text(self, widget, text):
+        """setText, skipped when `widget` already shows `text` (no relayout or repaint)."""
+        if self._label_texts.get(widget) != text:
+            self._label_texts[widget] = text
+            widget.setText(text)
+
+    def _request_render(self, part, value=None):
+        """Records a UI change; _render applies it within a frame."""
+        self._pending_render[part] = value
+        if not self.render_timer.isActive():
+            since_last_ms = (time.perf_counter() - self._last_render) * 1000.0
+            self.render_timer.start(max(0, int(FRAME_MS - since_last_ms)))
+
+    def _render(self):
+        """Applies every UI change requested since the last frame in one pass."""
+        pending, self._pending_render = self._pending_render, {}
+        self._last_render = time.perf_counter()
+        if "layout" in pending:
+            self.update_ui_state()
+        if "status" in pending:
+            self._update_status_label(pending["status"])
+        if "speed" in pending:
+            self._update_speed_display(pending["speed"])
+        if "notification" in pending:
+            self._display_notification(pending["notification"])
 
 
     def toggle_expand(self):
         self._is_expanded = not self._is_expanded
         log.debug(f"Window {'expanded' if self._is_expanded else 'collapsed'}")
-        # Update state *before* showing/hiding for smoother size calculation
-        self.update_ui_state()
+        if self._is_expanded and self.expandable_widget is None:
+            self._create_expanded_panel()
+        self._request_render("layout")
+        # Live stats are only worth sampling while someone can see them
+        if self._is_expanded:
+            self._rate_samples.clear()
+            self._refresh_live_stats()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+
+    def _refresh_live_stats(self):
+        """Samples the clicker's click counter and redraws the live stats. O(1) per frame."""
+        self._rate_samples.append((time.perf_counter(), self.clicker_thread.timing.total_clicks))
+        (then, clicks_then), (now, clicks_now) = self._rate_samples[0], self._rate_samples[-1]
+        measured_cpm = (clicks_now - clicks_then) * 60.0 / (now - then) if now > then else 0.0
+        self._cpm_history.append(measured_cpm)
+
+        ceiling = max(self._current_cpm, max(self._cpm_history))
+        self._set_text(self.cpm_graph_label, f"[{render_sparkline(self._cpm_history, ceiling)}]")
+        self._set_text(self.cpm_status_placeholder, f"[{measured_cpm:5.0f}]")
+        if self._is_active:
+            accuracy = min(999, measured_cpm * 100.0 / self._current_cpm)
+            self._set_text(self.click_speed_status_placeholder, f"[{accuracy:4.0f}%]")
+        else:
+            self._set_text(self.click_speed_status_placeholder, "[  --%]")
 
 
     def update_speed(self, value):
+        """Slider/button handler. Drags fire this for every step, so the display
+        goes through the per-frame render and the clicker is retuned at most once
+        per click tick, with the latest value (the first step applies at once)."""
         self._current_cpm = value
-        self.clicker_thread.set_speed(self._current_cpm)
+        self._pending_speed = value
+        if not self.retune_timer.isActive():
+            self._apply_pending_speed()
         # Emit signal to safely update GUI elements related to speed
         self.update_speed_display_signal.emit(self._current_cpm)
 
-    def _update_speed_display(self, cpm):
-        """ Updates the visual representation of the speed. Thread-safe."""
-        self.cpm_value_label.setText(f"{cpm: <4}") # Update numeric CPM
+    def _apply_pending_speed(self):
+        if self._pending_speed is None:
+            return # Nothing changed during the last window: stay idle
+        cpm, self._pending_speed = self._pending_speed, None
+        self.clicker_thread.set_speed(cpm)
+        tick_ms = self._burst * 60000.0 / cpm
+        self.retune_timer.start(int(max(FRAME_MS, min(tick_ms, RETUNE_MAX_MS))))
 
-        # --- Update ASCII Slider Visual ---
-        slider_char_width = 15 # Width of the '█' bar part in the ASCII '[0 █░▒░███]'
-        handle = "░▒░"
-        handle_len = len(handle)
-        track_len = slider_char_width - handle_len # Available space for actual track chars
+    def update_burst(self, burst):
+        self._burst = max(MIN_BURST, min(burst, MAX_BURST))
+        self.clicker_thread.set_burst(self._burst)
+        if self.expandable_widget is not None:
+            self._set_text(self.burst_value_label, f"x{self._burst}")
 
-        # Prevent division by zero or invalid range
-        range_cpm = max(1, MAX_CPM - MIN_CPM)
-        norm_val = (cpm - MIN_CPM) / range_cpm
-
-        # Calculate number of '█' before and after handle
-        left_chars = int(norm_val * track_len)
-        right_chars = track_len - left_chars
-
-        # Build the visual string
-        visual_track = ('█' * left_chars) + handle + ('█' * right_chars)
-        # Pad if needed (e.g., if handle_len makes track_len negative, though unlikely)
-        visual_track = visual_track.ljust(slider_char_width, ' ')[:slider_char_width]
-
-        final_ascii = f"[0 {visual_track}]" # Construct the final string
-        self.speed_ascii_label.setText(final_ascii)
+    def _update_speed_display(self, cpm):
+        """ Updates the visual representation of the speed. Thread-safe."""
+        if self.expandable_widget is None:
+            return # Panel not built yet; it renders the current speed when created
+        self._set_text(self.cpm_value_label, f"{cpm: <4}") # Update numeric CPM
+        self._set_text(self.speed_ascii_label, render_speed_track(cpm))
 
 
-    def activate_clicker(self):
+    def activate_clicker(self, pressed_at=None):
         if not self._is_active:
-            self._active_status_icon(True)
-            self.show_notification_signal.emit(f"Activated {STATUS_ON_ICON} ({self._current_cpm} CPM)")
+            self._active_status_icon(True, pressed_at)
+            if pressed_at is not None:
+                self.keyboard_listener.record_latency(pressed_at)
+            running = self._program_name or f"{self._current_cpm} CPM"
+            self.show_notification_signal.emit(f"Activated {STATUS_ON_ICON} ({running})")
 
-    def deactivate_clicker(self):
+    def deactivate_clicker(self, pressed_at=None):
         if self._is_active:
             self._active_status_icon(False)
+            if pressed_at is not None:
+                self.keyboard_listener.record_latency(pressed_at)
             self.show_notification_signal.emit(f"Deactivated {STATUS_OFF_ICON}")
 
-    def _active_status_icon(self, arg0):
+    def _active_status_icon(self, arg0, requested_at=None):
         self._is_active = arg0
-        self.clicker_thread.set_active(arg0)
+        self.clicker_thread.set_active(arg0, requested_at)
+        self.keyboard_listener.note_state(arg0) # Keep the hotkey pipeline's view in sync
         self.update_status_signal.emit(arg0)
 
+    def _apply_control_change(self, name, value):
+        """Mirrors a change the control server already applied to the clicker."""
+        if name == "active":
+            if bool(value) != self._is_active:
+                self._is_active = bool(value)
+                self.keyboard_listener.note_state(self._is_active)
+                self.update_status_signal.emit(self._is_active)
+        elif name == "speed":
+            self._current_cpm = value
+            # The </> buttons step from the slider; blocked so it doesn't retune the clicker again
+            self.speed_slider.blockSignals(True)
+            self.speed_slider.setValue(value)
+            self.speed_slider.blockSignals(False)
+            self.update_speed_display_signal.emit(value)
+        elif name == "burst":
+            self._burst = value
+            if self.expandable_widget is not None:
+                self._set_text(self.burst_value_label, f"x{value}")
+
+    def _apply_run_finished(self, reason):
+        """The clicker switched itself off; mirror it like a deactivation."""
+        if self._is_active:
+            self._is_active = False
+            self.keyboard_listener.note_state(False)
+            self.update_status_signal.emit(False)
+            done = {"program": "program", "clicks": f"{self.clicker_thread.run_clicks_sent} clicks",
+                    "duration": "time limit"}.get(reason, reason)
+            self.show_notification_signal.emit(f"Finished {STATUS_OFF_ICON} ({done})")
+
     def _update_status_label(self, is_active):
         """Updates the status label text and icon. Thread-safe."""
         status_text = STATUS_TEXT_ON if is_active else STATUS_TEXT_OFF
-        self.status_label.setText(f"[status] {status_text}")
+        self._set_text(self.status_label, f"[status] {status_text}")
+
+    def _queue_notification(self, message):
+        log.info(message) # Every message is logged, even if a newer one replaces it on screen
+        self._request_render("notification", message)
 
     def _display_notification(self, message):
         """Shows a temporary notification label. Thread-safe."""
-        log.info(message) # Log to console via rich
         self.notification_label.setText(message)
         self.notification_label.adjustSize() # Fit content
 
@@ -658,16 +821,61 @@ class MilkyClickerApp(QWidget):
 
 
     def show_log_info(self):
-        self.show_notification_signal.emit("[INFO] Logs are shown in the terminal/console.")
+        """Toggles the log window (recent lines; the console still gets everything)."""
+        if self.log_viewer is None:
+            install_rich_logging() # Normally done after the first frame already
+            from log_viewer import LogViewer
+            self.log_viewer = LogViewer(log_pipeline.ring, self.monospace_font)
+        self.log_viewer.setVisible(not self.log_viewer.isVisible())
 
     def show_settings_info(self):
-        self.show_notification_signal.emit("[INFO] Settings not yet implemented.")
+        """Loads a click program (see program.py) to run on activation instead of
+        the set speed, or unloads the current one."""
+        if self._program_name is not None:
+            self.load_program(None)
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Load Click Program", "",
+                                              "Click programs (*.mlkp *.txt);;All files (*)")
+        if path:
+            self.load_program(path)
+
+    def load_program(self, path):
+        """Compiles and hands a program file to the clicker; None unloads it."""
+        if not hasattr(self.clicker_thread, "set_program"):
+            self.show_notification_signal.emit("[INFO] Click programs need --engine thread.")
+            return
+        program = None
+        if path is not None:
+            # Only pulled in when asked for
+            from program import load_program
+            try:
+                program = load_program(path)
+            except (OSError, ValueError) as e:
+                self.show_notification_signal.emit(f"[ERROR] {os.path.basename(path)}: {e}")
+                return
+        self.clicker_thread.set_program(program)
+        self._program_name = os.path.basename(path) if path is not None else None
+        if program is not None:
+            self.settings_button.setToolTip(f"Unload Click Program ({self._program_name})")
+            self.show_notification_signal.emit(f"Program {self._program_name}: {program.clicks} clicks, "
+                                               f"{program.duration:.1f}s")
+        else:
+            self.settings_button.setToolTip("Load Click Program")
+            self.show_notification_signal.emit("Program unloaded")
 
     def close_app(self):
         log.info("Shutdown sequence initiated...")
         # Stop threads gracefully
+        self.stats_timer.stop()
         self.keyboard_listener.stop()
+        if self.control_server is not None:
+            self.control_server.stop()
+        if self.metrics_exporter is not None:
+            self.lag_probe_timer.stop()
+            self.metrics_exporter.stop()
         self.clicker_thread.stop()
+        if self.log_viewer is not None:
+            self.log_viewer.close()
         # Wait briefly for threads (optional, helps ensure cleanup)
         # self.clicker_thread.wait(500) # Wait up to 500ms for clicker thread
         log.info("Exiting application.")
@@ -706,6 +914,32 @@ class MilkyClickerApp(QWidget):
         event.accept() # Accept the close event
 
 
+def _binding_argument(text):
+    try:
+        return parse_bind_argument(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _positive_argument(convert):
+    def parse(text):
+        value = convert(text)
+        if not value > 0:
+            raise argparse.ArgumentTypeError("must be positive")
+        return value
+    parse.__name__ = convert.__name__ # argparse names it in "invalid int value" errors
+    return parse
+
+
+def startup_probe_report():
+    """Figures printed by --startup-probe (peak RSS in MiB and loaded modules)."""
+    import resource
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mib = peak_rss / (1024 * 1024) if platform.system() == "Darwin" else peak_rss / 1024
+    return {"rss_mib": round(peak_rss_mib, 1), "modules": len(sys.modules),
+            "rich_loaded": "rich" in sys.modules}
+
+
 # --- Main Execution ---
 if __name__ == "__main__":
     # Add basic check for Accessibility permissions on Mac
@@ -715,20 +949,56 @@ if __name__ == "__main__":
         # We rely on the listener logging an error if it fails.
         pass # No simple way to check programmatically without extra libs
 
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} v{VERSION}")
+    parser.add_argument("--engine", choices=(ENGINE_THREAD, ENGINE_PROCESS), default=ENGINE_THREAD,
+                        help="run the click engine in the GUI process or in a child process")
+    parser.add_argument("--bind", action="append", type=_binding_argument, metavar="SPEC=ACTION",
+                        help="hotkey binding replacing the defaults (repeatable), e.g. ctrl+f6=activate, "
+                             "f7=deactivate, mouse:x1=hold")
+    parser.add_argument("--control", nargs="?", const="", metavar="SOCKET",
+                        help="serve the control protocol on a Unix socket (see control.py), "
+                             "by default $XDG_RUNTIME_DIR/milkyclicks-<uid>.sock")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", default=None, metavar="PATH",
+                        help="rewrite Prometheus metrics to this file every second")
+    parser.add_argument("--program", default=None, metavar="FILE",
+                        help="load a click program (see program.py) to run on activation")
+    parser.add_argument("--clicks", type=_positive_argument(int), default=None, metavar="N",
+                        help="switch off after exactly N clicks per activation")
+    parser.add_argument("--run-seconds", type=_positive_argument(float), default=None, metavar="SECONDS",
+                        help="switch off SECONDS after the first click of each activation")
+    # Used by benchmarks/bench_startup.py: report startup figures after the first frame and quit
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    args, qt_args = parser.parse_known_args() # Leave Qt's own options to QApplication
+    if args.program and args.engine == ENGINE_PROCESS:
+        parser.error("--program needs --engine thread")
+    if (args.clicks is not None or args.run_seconds is not None) and args.engine == ENGINE_PROCESS:
+        parser.error("--clicks and --run-seconds need --engine thread")
+
+    app = QApplication(sys.argv[:1] + qt_args)
     try:
-        milky_clicker = MilkyClickerApp()
+        milky_clicker = MilkyClickerApp(engine=args.engine, bindings=dict(args.bind) if args.bind else None,
+                                        control_path=args.control, metrics_port=args.metrics_port,
+                                        metrics_file=args.metrics_file, run_clicks=args.clicks,
+                                        run_seconds=args.run_seconds)
+        if args.program:
+            milky_clicker.load_program(args.program)
         milky_clicker.show()
+        if args.startup_probe:
+            QTimer.singleShot(0, lambda: (print(json.dumps(startup_probe_report()), flush=True),
+                                          milky_clicker.close_app(), app.quit()))
+        # Runs once the event loop has painted the first frame
+        QTimer.singleShot(0, install_rich_logging)
         exit_code = app.exec()
         log.info(f"Application finished with exit code: {exit_code}")
+        if log_pipeline is not None:
+            log_pipeline.stop() # Prints whatever is still queued
         sys.exit(exit_code)
     except Exception:
+        install_rich_logging()
         # Use log.exception to include the traceback automatically
         log.exception("Critical error during application startup or execution.")
-        sys.exit(1) # Exit with error code        exit_code = app.exec()
-        log.info(f"Application finished with exit code: {exit_code}")
-        sys.exit(exit_code)
-    except Exception:
-        # Use log.exception to include the traceback automatically
-        log.exception("Critical error during application startup or execution.")
+        if log_pipeline is not None:
+            log_pipeline.stop()
         sys.exit(1) # Exit with error code
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""Metrics in the Prometheus text exposition format.
+
+Everything is read from state the components already keep: the click
+loop's timing ring and counters, the hotkey listener's latency ring, and
+a lag histogram the GUI feeds. The click loop itself does no extra work
+and takes no extra lock. A MetricsExporter thread folds new samples from
+the rings into cumulative histograms once per ``interval`` (well within
+the time the rings take to wrap at MAX_CPM) and either serves the text on
+a localhost HTTP port or rewrites a file (e.g. for node_exporter's
+textfile collector):
+
+    python src/headless.py --metrics-port 9464
+    curl -s localhost:9464/metrics
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger("rich")
+
+PREFIX = "milkyclicks_"
+DEFAULT_EXPORT_INTERVAL = 1.0  # Seconds between ring folds (and file writes)
+RATE_TICKS = 256  # Ticks the achieved CPM gauge is computed over
+INTERVAL_ERROR_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds (seconds)."""
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot: above every bound
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def observe_many(self, values):
+        indices = [bisect.bisect_left(self.buckets, value) for value in values]
+        total = sum(values)
+        with self._lock:
+            counts = self._counts
+            for index in indices:
+                counts[index] += 1
+            self._sum += total
+
+    def render(self, lines):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        lines.append(f"# HELP {self.name} {self.description}")
+        lines.append(f"# TYPE {self.name} histogram")
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total:.9f}")
+        lines.append(f"{self.name}_count {cumulative}")
+
+
+def _sample(lines, name, kind, description, value):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"{name} {value}")
+
+
+class MetricsCollector:
+    """Collects clicker (and optionally hotkey and GUI) metrics."""
+
+    def __init__(self, clicker, keyboard_listener=None):
+        """
+        Args:
+            clicker: ClickerThread or ProcessClicker.
+            keyboard_listener: Optional hotkeys.KeyboardListener for the
+                key-press-to-state-change latency histogram.
+        """
+        self.clicker = clicker
+        self.keyboard_listener = keyboard_listener
+        self.interval_error = Histogram(f"{PREFIX}interval_error_seconds",
+                                        "Absolute difference between actual and target tick interval.",
+                                        INTERVAL_ERROR_BUCKETS)
+        self.hotkey_latency = Histogram(f"{PREFIX}hotkey_latency_seconds",
+                                        "Time from a hotkey press to the clicker state change.", LATENCY_BUCKETS)
+        self.event_loop_lag = None  # Histogram, once the GUI asks for a lag_probe()
+        self.dropped_intervals = 0  # Ticks the ring overwrote before they were folded
+        self._ticks_seen = clicker.timing.total_ticks
+        self._last_timestamp = 0.0
+        self._latencies_seen = 0
+        self._lock = threading.Lock()  # One fold at a time
+
+    def fold(self):
+        """Moves samples recorded since the last fold into the histograms."""
+        with self._lock:
+            timing = self.clicker.timing
+            ticks = timing.total_ticks
+            new = ticks - self._ticks_seen
+            if new > 0:
+                if new > timing.capacity - 2:  # A snapshot holds capacity - 1 ticks
+                    self.dropped_intervals += new - (timing.capacity - 2)
+                timestamps, _, targets = timing.snapshot(new + 1)
+                last = self._last_timestamp
+                # Timestamps only grow, so this skips anything folded already
+                errors = [abs(timestamps[i] - timestamps[i - 1] - targets[i])
+                          for i in range(1, len(timestamps)) if targets[i] > 0.0 and timestamps[i] > last]
+                self.interval_error.observe_many(errors)
+                if timestamps:
+                    self._last_timestamp = timestamps[-1]
+                self._ticks_seen = ticks
+            if self.keyboard_listener is not None:
+                self._latencies_seen, latencies = self.keyboard_listener.latencies_since(self._latencies_seen)
+                self.hotkey_latency.observe_many(latencies)
+
+    def lag_probe(self, period):
+        """Returns an EventLoopLagProbe for a timer firing every ``period`` seconds."""
+        self.event_loop_lag = Histogram(f"{PREFIX}gui_event_loop_lag_seconds",
+                                        "How late the GUI's periodic lag probe timer fired.", LAG_BUCKETS)
+        return EventLoopLagProbe(self.event_loop_lag, period)
+
+    def render(self):
+        """Returns the current metrics as Prometheus text."""
+        clicker = self.clicker
+        active, cpm, burst = clicker.settings()
+        stats = clicker.timing.stats(RATE_TICKS)
+        lines = []
+        _sample(lines, f"{PREFIX}clicks_total", "counter", "Clicks sent.", clicker.timing.total_clicks)
+        _sample(lines, f"{PREFIX}failed_clicks_total", "counter", "Clicks whose backend call failed.",
+                clicker.failed_clicks)
+        _sample(lines, f"{PREFIX}ticks_total", "counter", "Scheduler ticks (bursts) fired.", clicker.timing.total_ticks)
+        _sample(lines, f"{PREFIX}active_seconds_total", "counter", "Time spent switched on.",
+                f"{clicker.active_seconds():.3f}")
+        _sample(lines, f"{PREFIX}active", "gauge", "1 while clicking is switched on.", int(active))
+        _sample(lines, f"{PREFIX}target_cpm", "gauge", "Requested clicks per minute.", cpm)
+        _sample(lines, f"{PREFIX}achieved_cpm", "gauge",
+                f"Clicks per minute delivered over the last {RATE_TICKS} ticks of the latest run.",
+                f"{stats.achieved_cpm:.3f}")
+        _sample(lines, f"{PREFIX}burst", "gauge", "Clicks per scheduler tick.", burst)
+        self.interval_error.render(lines)
+        _sample(lines, f"{PREFIX}interval_samples_dropped_total", "counter",
+                "Tick intervals overwritten before they reached the histogram.", self.dropped_intervals)
+        if self.keyboard_listener is not None:
+            self.hotkey_latency.render(lines)
+        if self.event_loop_lag is not None:
+            self.event_loop_lag.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    collector = None  # Set on the per-exporter subclass
+
+    def do_GET(self):
+        if self.path not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.collector.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would flood the log
+
+
+class MetricsExporter(threading.Thread):
+    """Folds samples periodically and serves and/or writes the metrics."""
+
+    def __init__(self, collector, port=None, path=None, interval=DEFAULT_EXPORT_INTERVAL, host="127.0.0.1"):
+        """
+        Args:
+            port: Serve ``http://host:port/metrics`` (0 picks a free port).
+            path: Rewrite this file atomically every ``interval`` seconds.
+        """
+        super().__init__(name="MetricsExporterThread", daemon=True)
+        self.collector = collector
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self.server = None
+        if port is not None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"collector": collector})
+            self.server = ThreadingHTTPServer((host, port), handler)  # Raises OSError if taken
+            self.server.daemon_threads = True
+
+    @property
+    def port(self):
+        return self.server.server_address[1] if self.server is not None else None
+
+    def run(self):
+        if self.server is not None:
+            threading.Thread(target=self.server.serve_forever, name="MetricsHttpThread", daemon=True).start()
+            log.info(f"Metrics served on http://{self.server.server_address[0]}:{self.port}/metrics")
+        if self.path is not None:
+            log.info(f"Metrics written to {self.path} every {self.interval:g}s")
+        while not self._stop_event.wait(self.interval):
+            self._export()
+        self._export()  # Final figures
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def _export(self):
+        self.collector.fold()
+        if self.path is not None:
+            temporary = f"{self.path}.tmp"
+            try:
+                with open(temporary, "w") as file:
+                    file.write(self.collector.render())
+                os.replace(temporary, self.path)  # Readers never see a half-written file
+            except OSError as e:
+                log.warning(f"Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=2.0)
+
+
+class EventLoopLagProbe:
+    """Measures how late a periodic timer fires; call :meth:`tick` from it."""
+
+    def __init__(self, histogram, period):
+        self.histogram = histogram
+        self.period = period
+        self._expected = time.perf_counter() + period
+
+    def tick(self):
+        now = time.perf_counter()
+        self.histogram.observe(max(0.0, now - self._expected))
+        self._expected = now + self.period
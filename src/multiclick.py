@@ -0,0 +1,226 @@
+"""Many independent click jobs on one thread.
+
+Each job has its own rate, button, burst and optional screen target, and
+its own DeadlineScheduler. A single thread keeps a heap of the jobs' next
+deadlines, sleeps until the earliest one and fires it through one shared
+backend, so hundreds of jobs cost one thread and one backend connection
+instead of hundreds of ClickerThreads contending for the GIL.
+
+Jobs can be added, removed and retuned while running. Heap entries are
+never searched or deleted: each carries the job's version at push time, and
+entries left behind by a retune or removal are dropped when they surface.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from array import array
+from functools import partial
+
+from backends import BUTTON_LEFT, BUTTONS, PynputBackend
+from engine import MAX_BURST, MAX_CPM, MIN_BURST, MIN_CPM
+from scheduler import DEFAULT_CATCH_UP_POLICY, DeadlineScheduler, sleep_until
+from timing import percentile
+
+log = logging.getLogger("rich")
+
+DEFAULT_LATENESS_CAPACITY = 1 << 16  # Fire-time samples kept for lateness_stats()
+
+
+class ClickJob:
+    """One job's settings and counters. Read-only outside MultiClicker."""
+
+    __slots__ = ("burst", "button", "clicks", "cpm", "job_id", "scheduler", "target", "version")
+
+    def __init__(self, job_id, cpm, button, burst, target, policy):
+        self.job_id = job_id
+        self.cpm = cpm
+        self.button = button
+        self.burst = burst
+        self.target = target  # (x, y) to move to before clicking, or None for the cursor
+        self.scheduler = DeadlineScheduler(burst * 60.0 / cpm, policy)
+        self.version = 0
+        self.clicks = 0
+
+
+class MultiClicker(threading.Thread):
+    """Fires many ClickJobs from a single thread through one backend."""
+
+    def __init__(self, backend=None, catch_up_policy=DEFAULT_CATCH_UP_POLICY,
+                 lateness_capacity=DEFAULT_LATENESS_CAPACITY):
+        super().__init__(name="MultiClickerThread", daemon=True)
+        self.backend = backend if backend is not None else PynputBackend()
+        self.catch_up_policy = catch_up_policy
+        self._lock = threading.Lock()
+        self._state_changed = threading.Condition(self._lock)
+        self._generation = 0
+        self._stop_requested = False
+        self._is_active = False
+        self._jobs = {}
+        self._heap = []  # (deadline, sequence, job, version)
+        self._firing = None  # Job popped and being clicked; the loop reschedules it afterwards
+        self._sequence = itertools.count()  # Tie-breaker: jobs are never compared
+        self._job_ids = itertools.count(1)
+        # Seconds each tick fired after its deadline; preallocated ring
+        self._lateness = array("d", bytes(8 * lateness_capacity))
+        self._lateness_count = 0
+
+    def _notify_locked(self):
+        self._generation += 1
+        self._state_changed.notify()
+
+    def _wait_for_change(self, generation, timeout=None):
+        with self._lock:
+            return self._state_changed.wait_for(lambda: self._generation != generation, timeout)
+
+    def _schedule_locked(self, job):
+        job.version += 1
+        heapq.heappush(self._heap, (job.scheduler.deadline, next(self._sequence), job, job.version))
+
+    @staticmethod
+    def _validate(cpm, button, burst):
+        if button not in BUTTONS:
+            raise ValueError(f"Unknown button '{button}'. Choose from: {', '.join(BUTTONS)}")
+        return max(MIN_CPM, min(cpm, MAX_CPM)), max(MIN_BURST, min(burst, MAX_BURST))
+
+    def add_job(self, cpm, button=BUTTON_LEFT, burst=MIN_BURST, target=None):
+        """Adds a job and returns its id. It fires first right away (when active).
+
+        Raises:
+            ValueError: If ``button`` is not one of backends.BUTTONS.
+        """
+        cpm, burst = self._validate(cpm, button, burst)
+        with self._lock:
+            job = ClickJob(next(self._job_ids), cpm, button, burst, target, self.catch_up_policy)
+            self._jobs[job.job_id] = job
+            if self._is_active:
+                self._schedule_locked(job)
+            self._notify_locked()
+        log.debug(f"Added click job {job.job_id}: {cpm} CPM, {button}, target {target}")
+        return job.job_id
+
+    def remove_job(self, job_id):
+        """Removes a job; returns False if there was no such job."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            job.version += 1  # Orphans its heap entry
+            self._notify_locked()
+        return True
+
+    def retune_job(self, job_id, cpm=None, button=None, burst=None, target=...):
+        """Changes a running job, keeping the phase of its current deadline.
+        Omitted arguments keep their value; pass ``target=None`` to click at the cursor.
+
+        Raises:
+            KeyError: If there is no such job.
+            ValueError: If ``button`` is not one of backends.BUTTONS.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            cpm, burst = self._validate(job.cpm if cpm is None else cpm, job.button if button is None else button,
+                                        job.burst if burst is None else burst)
+            job.cpm, job.burst = cpm, burst
+            if button is not None:
+                job.button = button
+            if target is not ...:
+                job.target = target
+            if job is self._firing:
+                # Its deadline is the one firing now, not the next: the loop advances
+                # it by the new interval and pushes it, so no entry here
+                job.scheduler.interval = burst * 60.0 / cpm
+            else:
+                job.scheduler.set_interval(burst * 60.0 / cpm)
+                if self._is_active:
+                    self._schedule_locked(job)  # The old entry has the old deadline
+            self._notify_locked()
+
+    def jobs(self):
+        """Returns ``{job_id: (cpm, button, burst, target, clicks)}``."""
+        with self._lock:
+            return {job.job_id: (job.cpm, job.button, job.burst, job.target, job.clicks)
+                    for job in self._jobs.values()}
+
+    def set_active(self, active):
+        with self._lock:
+            if active and not self._is_active:
+                # Every job restarts its grid now
+                self._heap.clear()
+                now = time.perf_counter()
+                for job in self._jobs.values():
+                    job.scheduler.reset(now)
+                    self._schedule_locked(job)
+            self._is_active = active
+            self._notify_locked()
+        log.info(f"Multi-clicker state changed to: {'ON' if active else 'OFF'}")
+
+    def stop(self):
+        log.info("Requesting multi-clicker thread stop...")
+        with self._lock:
+            self._is_active = False
+            self._stop_requested = True
+            self._notify_locked()
+
+    def run(self):
+        heap = self._heap
+        backend = self.backend
+        lateness = self._lateness
+        capacity = len(lateness)
+        while True:
+            with self._lock:
+                if self._stop_requested:
+                    break
+                generation = self._generation
+                # Drop entries orphaned by retune/remove before looking at the head
+                while heap and heap[0][2].version != heap[0][3]:
+                    heapq.heappop(heap)
+                if not self._is_active or not heap:
+                    deadline = None
+                else:
+                    deadline = heap[0][0]
+            if deadline is None:
+                self._wait_for_change(generation)
+                continue
+            if time.perf_counter() < deadline:
+                sleep_until(deadline, partial(self._wait_for_change, generation))
+                continue
+
+            with self._lock:
+                if not heap or heap[0][0] != deadline or heap[0][2].version != heap[0][3]:
+                    continue  # Changed while we slept
+                _, _, job, version = heapq.heappop(heap)
+                self._firing = job
+                button, burst, target = job.button, job.burst, job.target
+            fired_at = time.perf_counter()
+            try:
+                if target is not None:
+                    backend.move_to(target[0], target[1])
+                backend.click(button, burst)
+            except Exception as e:  # noqa: BLE001 - any backend failure, the loop keeps going
+                log.error(f"Clicking error (job {job.job_id}): {e}", exc_info=False)
+            now = time.perf_counter()
+            lateness[self._lateness_count % capacity] = fired_at - deadline
+            self._lateness_count += 1
+            with self._lock:
+                self._firing = None
+                job.clicks += burst
+                # Removed, paused or restarted meanwhile: no entry needed, or it has a fresh one
+                if job.version == version and self._is_active:
+                    job.scheduler.advance(now)
+                    self._schedule_locked(job)
+
+        self.backend.close()
+        log.info("Multi-clicker thread finished.")
+
+    def lateness_stats(self):
+        """Returns ``(samples, p50_ms, p99_ms, max_ms)`` of how late ticks fired."""
+        count = min(self._lateness_count, len(self._lateness))
+        values = sorted(self._lateness[:count])
+        if not values:
+            return 0, 0.0, 0.0, 0.0
+        return len(values), percentile(values, 50) * 1000.0, percentile(values, 99) * 1000.0, values[-1] * 1000.0
+
+    def reset_lateness(self):
+        self._lateness_count = 0
@@ -0,0 +1,104 @@
+"""Multi-target click patterns.
+
+A pattern is a set of preallocated typed columns (x, y, dwell) that
+ClickerThread walks through, moving the pointer to each target before
+clicking it. Generators build the columns in bulk with ``map`` over
+``math``/``operator`` functions and ``array`` repetition, so the per-point
+work runs in C rather than in a Python loop, even for very large patterns.
+"""
+import math
+import operator
+import random
+from array import array
+from itertools import repeat
+
+
+class ClickPattern:
+    """Targets the click loop cycles through.
+
+    Attributes:
+        xs, ys: Screen coordinates, ``array('i')``.
+        dwell: Extra seconds to stay on each target after clicking it,
+            ``array('d')``; all zeros unless given.
+    """
+
+    def __init__(self, xs, ys, dwell=None):
+        self.xs = xs if isinstance(xs, array) and xs.typecode == "i" else array("i", xs)
+        self.ys = ys if isinstance(ys, array) and ys.typecode == "i" else array("i", ys)
+        if len(self.xs) != len(self.ys):
+            raise ValueError("Pattern x and y columns must have the same length")
+        if not self.xs:
+            raise ValueError("A click pattern needs at least one target")
+        if dwell is None:
+            self.dwell = array("d", bytes(8 * len(self.xs)))
+        elif isinstance(dwell, (int, float)):
+            self.dwell = array("d", [float(dwell)]) * len(self.xs)
+        else:
+            self.dwell = dwell if isinstance(dwell, array) and dwell.typecode == "d" else array("d", dwell)
+        if len(self.dwell) != len(self.xs):
+            raise ValueError("Pattern dwell column must have one entry per target")
+        self.has_dwell = any(self.dwell)
+
+    def __len__(self):
+        return len(self.xs)
+
+
+def grid(left, top, columns, rows, step_x, step_y, dwell=None):
+    """Row-major grid of ``columns`` x ``rows`` targets starting at (left, top)."""
+    row_xs = array("i", range(left, left + columns * step_x, step_x)) if step_x else array("i", [left]) * columns
+    xs = row_xs * rows
+    ys = array("i")
+    for y in (range(top, top + rows * step_y, step_y) if step_y else repeat(top, rows)):
+        ys.extend(array("i", [y]) * columns)  # One array op per row, not per point
+    return ClickPattern(xs, ys, dwell)
+
+
+def circle(center_x, center_y, radius, count, dwell=None):
+    """``count`` targets evenly spaced on a circle, starting at 3 o'clock."""
+    if count <= 0:
+        raise ValueError("A click pattern needs at least one target")
+    step = 2.0 * math.pi / count
+    angles = array("d", map(operator.mul, range(count), repeat(step)))
+    xs = array("i", map(round, map(operator.add, repeat(center_x),
+                                   map(operator.mul, repeat(radius), map(math.cos, angles)))))
+    ys = array("i", map(round, map(operator.add, repeat(center_y),
+                                   map(operator.mul, repeat(radius), map(math.sin, angles)))))
+    return ClickPattern(xs, ys, dwell)
+
+
+def random_in_rect(left, top, width, height, count, seed=None, dwell=None):
+    """``count`` uniformly random targets inside a rectangle (reproducible with ``seed``)."""
+    rng = random.Random(seed)
+
+    def scaled(offset, extent):
+        # 32 random bits per point, scaled to [0, extent) with a multiply-shift
+        raw = array("I")
+        raw.frombytes(rng.randbytes(raw.itemsize * count))
+        return array("i", map(operator.add, repeat(offset),
+                              map(operator.rshift, map(operator.mul, raw, repeat(extent)),
+                                  repeat(8 * raw.itemsize))))
+
+    return ClickPattern(scaled(left, width), scaled(top, height), dwell)
+
+
+GENERATORS = {"grid": grid, "circle": circle, "random": random_in_rect}
+
+
+def parse_pattern(spec, dwell=None):
+    """Builds a pattern from a command-line spec.
+
+    ``grid:LEFT,TOP,COLUMNS,ROWS,STEP_X,STEP_Y``, ``circle:X,Y,RADIUS,COUNT``
+    or ``random:LEFT,TOP,WIDTH,HEIGHT,COUNT[,SEED]``.
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    kind, _, params = spec.partition(":")
+    generator = GENERATORS.get(kind)
+    if generator is None:
+        raise ValueError(f"Unknown pattern '{kind}'. Choose from: {', '.join(GENERATORS)}")
+    try:
+        values = [int(value) for value in params.split(",")]
+        return generator(*values, dwell=dwell)
+    except TypeError:
+        raise ValueError(f"Wrong number of parameters for a {kind} pattern: '{params}'") from None
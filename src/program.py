@@ -0,0 +1,191 @@
+"""Click programs: scripted sequences compiled to flat schedule columns.
+
+A program is a small line-based script:
+
+    # 10 clicks at 1200 CPM, pause 2 s, double-click; 50 times
+    repeat 50
+        speed 1200
+        click 10
+        pause 2
+        double
+    end
+
+Statements (one per line, ``#`` starts a comment):
+
+    speed CPM       clicks that follow are 60 / CPM seconds apart
+    button NAME     left, right or middle for clicks that follow
+    click [N]       N single clicks (default 1)
+    double [N]      N double clicks
+    move X Y        move the pointer to screen coordinates X, Y
+    pause SECONDS   wait before the next statement
+    repeat N        repeat the statements up to the matching ``end``
+
+Compiling turns the script into preallocated typed columns, one entry per
+step:
+
+    offsets  'd'  seconds from the start of the program
+    actions  'B'  clicks to send (ACTION_CLICK, ACTION_DOUBLE) or ACTION_MOVE
+    buttons  'B'  index into backends.BUTTONS
+    xs, ys   'i'  pointer target of ACTION_MOVE steps
+
+Runs of clicks and repeated blocks are built with ``array`` repetition and
+``map`` over ``operator`` functions, so compile time grows with the number
+of statements rather than steps. ClickerThread walks the columns with an
+index against absolute deadlines (see ClickerThread.set_program).
+"""
+import operator
+from array import array
+from itertools import repeat
+
+from backends import BUTTON_LEFT, BUTTONS
+from engine import DEFAULT_CPM, MAX_CPM, MIN_CPM
+
+ACTION_MOVE = 0
+ACTION_CLICK = 1
+ACTION_DOUBLE = 2  # Actions are click counts, so the loop passes them straight to click()
+
+MAX_STEPS = 10_000_000  # About 180 MB of columns; guards against runaway nested repeats
+
+
+class ClickProgram:
+    """A compiled program.
+
+    Attributes:
+        offsets, actions, buttons, xs, ys: The step columns (see module docs).
+        duration: Seconds from the start to the end of the last statement,
+            trailing clicks' intervals and pauses included.
+        clicks: Total clicks sent by one run.
+    """
+
+    def __init__(self, offsets, actions, buttons, xs, ys, duration):
+        if not len(offsets) == len(actions) == len(buttons) == len(xs) == len(ys):
+            raise ValueError("Program columns must all have the same length")
+        if not offsets:
+            raise ValueError("A click program needs at least one click or move")
+        self.offsets = offsets
+        self.actions = actions
+        self.buttons = buttons
+        self.xs = xs
+        self.ys = ys
+        self.duration = duration
+        self.clicks = sum(actions)
+
+    def __len__(self):
+        return len(self.actions)
+
+
+class _Block:
+    """Columns of one statement list while it is being compiled."""
+
+    def __init__(self):
+        self.offsets = array("d")
+        self.actions = array("B")
+        self.buttons = array("B")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.duration = 0.0
+
+    def add(self, count, action, button, interval=0.0, x=0, y=0):
+        """Appends ``count`` steps ``interval`` apart from the current end."""
+        if len(self.actions) + count > MAX_STEPS:
+            raise ValueError(f"Program exceeds {MAX_STEPS} steps")
+        self.offsets.extend(map(operator.add, repeat(self.duration), map(operator.mul, range(count),
+                                                                         repeat(interval))))
+        self.actions.extend(array("B", [action]) * count)
+        self.buttons.extend(array("B", [button]) * count)
+        self.xs.extend(array("i", [x]) * count)
+        self.ys.extend(array("i", [y]) * count)
+        self.duration += count * interval
+
+    def add_repeated(self, body, times):
+        """Appends ``body`` ``times`` times, back to back."""
+        if len(self.actions) + len(body.actions) * times > MAX_STEPS:
+            raise ValueError(f"Program exceeds {MAX_STEPS} steps")
+        for k in range(times):  # One C-level pass per repetition, not per step
+            self.offsets.extend(map(operator.add, body.offsets, repeat(self.duration + k * body.duration)))
+        self.actions.extend(body.actions * times)
+        self.buttons.extend(body.buttons * times)
+        self.xs.extend(body.xs * times)
+        self.ys.extend(body.ys * times)
+        self.duration += body.duration * times
+
+
+def _count(args, default=1):
+    if not args:
+        return default
+    value = int(args[0])
+    if value < 0:
+        raise ValueError("count must not be negative")
+    return value
+
+
+def parse_program(text):
+    """Compiles a program script.
+
+    Raises:
+        ValueError: With the offending line number, if the script is malformed.
+    """
+    stack = [_Block()]
+    repeats = []  # (times, line number) of each open repeat
+    interval = 60.0 / DEFAULT_CPM
+    button = BUTTONS.index(BUTTON_LEFT)
+    for line_number, line in enumerate(text.splitlines(), 1):
+        words = line.split("#", 1)[0].split()
+        if not words:
+            continue
+        statement, args = words[0].lower(), words[1:]
+        block = stack[-1]
+        try:
+            if statement == "click":
+                block.add(_count(args), ACTION_CLICK, button, interval)
+            elif statement == "double":
+                block.add(_count(args), ACTION_DOUBLE, button, interval)
+            elif statement == "move":
+                if len(args) != 2:
+                    raise ValueError("move needs X and Y")
+                x, y = int(args[0]), int(args[1])
+                block.add(1, ACTION_MOVE, button, x=x, y=y)
+            elif statement == "pause":
+                seconds = float(args[0])
+                if seconds < 0:
+                    raise ValueError("pause must not be negative")
+                block.duration += seconds
+            elif statement == "speed":
+                cpm = float(args[0])
+                if not MIN_CPM <= cpm <= MAX_CPM:
+                    raise ValueError(f"speed must be between {MIN_CPM} and {MAX_CPM} CPM")
+                interval = 60.0 / cpm
+            elif statement == "button":
+                if args[0].lower() not in BUTTONS:
+                    raise ValueError(f"unknown button '{args[0]}'. "
+                                     f"Choose from: {', '.join(BUTTONS)}")
+                button = BUTTONS.index(args[0].lower())
+            elif statement == "repeat":
+                repeats.append((_count(args), line_number))
+                stack.append(_Block())
+            elif statement == "end":
+                if not repeats:
+                    raise ValueError("'end' without 'repeat'")
+                body = stack.pop()
+                stack[-1].add_repeated(body, repeats.pop()[0])
+            else:
+                raise ValueError(f"unknown statement '{statement}'")
+        except (IndexError, TypeError):
+            raise ValueError(f"line {line_number}: missing parameter for '{statement}'") from None
+        except ValueError as e:
+            raise ValueError(f"line {line_number}: {e}") from None
+    if repeats:
+        raise ValueError(f"line {repeats[-1][1]}: 'repeat' without 'end'")
+    block = stack[0]
+    return ClickProgram(block.offsets, block.actions, block.buttons, block.xs, block.ys, block.duration)
+
+
+def load_program(path):
+    """Reads and compiles a program file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the script is malformed.
+    """
+    with open(path, encoding="utf-8") as f:
+        return parse_program(f.read())
@@ -0,0 +1,195 @@
+"""Deadline-based timing for the click loop.
+
+Clicks are scheduled against absolute ``time.perf_counter()`` deadlines rather
+than "sleep for one interval after each click", so the time spent inside the
+click call and the wakeup latency of the OS never accumulate into drift.
+"""
+import enum
+import math
+import time
+from collections.abc import Callable
+
+# The coarse sleep wakes up this long before the deadline; the remainder is
+# spun on the high resolution clock. OS timer slack is usually 0.05–1 ms on
+# macOS/Linux, so 1.5 ms leaves headroom without burning much CPU.
+SPIN_THRESHOLD = 0.0015
+
+# Upper bound on how many missed ticks CATCH_UP will fire back-to-back.
+MAX_CATCH_UP_TICKS = 5
+
+
+class CatchUpPolicy(enum.Enum):
+    """What to do when the loop wakes up after one or more deadlines passed."""
+
+    SKIP = "skip"          # Drop missed ticks, stay on the original time grid
+    CATCH_UP = "catch_up"  # Fire missed ticks back-to-back (bounded)
+    RESET = "reset"        # Restart the grid from the late click
+
+
+DEFAULT_CATCH_UP_POLICY = CatchUpPolicy.SKIP
+
+
+def sleep_until(deadline: float, wait: Callable[[float], bool],
+                spin_threshold: float = SPIN_THRESHOLD) -> bool:
+    """Blocks until ``deadline`` (a ``time.perf_counter()`` value).
+
+    Sleeps through ``wait`` until ``spin_threshold`` seconds before the
+    deadline, then busy-waits the rest for sub-millisecond accuracy.
+
+    Args:
+        deadline: Absolute target time on the ``perf_counter`` clock.
+        wait: Interruptible sleep, e.g. ``threading.Event.wait``. It must
+            return True when woken early by an interruption.
+        spin_threshold: Length of the final busy-wait phase in seconds.
+
+    Returns:
+        True if ``wait`` reported an interruption, False once the deadline
+        has been reached.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_threshold and wait(remaining - spin_threshold):
+        return True
+    while time.perf_counter() < deadline:
+        pass
+    return False
+
+
+class DeadlineScheduler:
+    """Produces evenly spaced absolute deadlines for a fixed interval."""
+
+    def __init__(self, interval: float,
+                 policy: CatchUpPolicy = DEFAULT_CATCH_UP_POLICY,
+                 max_catch_up: int = MAX_CATCH_UP_TICKS):
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.deadline = time.perf_counter()
+        self.missed_ticks = 0  # Ticks dropped by SKIP/RESET since reset()
+
+    def reset(self, now: float | None = None) -> None:
+        """Restarts the grid so the next deadline is ``now``."""
+        self.deadline = time.perf_counter() if now is None else now
+        self.missed_ticks = 0
+
+    def set_interval(self, interval: float) -> None:
+        """Changes the interval, keeping the phase of the current deadline."""
+        if interval != self.interval:
+            # Re-anchor from the previous tick so a slider change takes
+            # effect on the very next click instead of one old interval later.
+            self.deadline += interval - self.interval
+            self.interval = interval
+
+    def advance(self, now: float) -> float:
+        """Moves to the next deadline after a tick fired at time ``now``.
+
+        Returns:
+            The new absolute deadline.
+        """
+        interval = self.interval
+        next_deadline = self.deadline + interval
+        lag = now - next_deadline
+        if lag > 0:
+            if self.policy is CatchUpPolicy.SKIP:
+                # Jump forward a whole number of ticks to stay on the grid
+                missed = math.ceil(lag / interval)
+                next_deadline += missed * interval
+                self.missed_ticks += missed
+            elif self.policy is CatchUpPolicy.RESET:
+                self.missed_ticks += int(lag // interval) + 1
+                next_deadline = now + interval
+            else:  # CATCH_UP: fire immediately, but never owe more than the cap
+                backlog = self.max_catch_up * interval
+                if lag > backlog:
+                    self.missed_ticks += int((lag - backlog) // interval)
+                    next_deadline = now - backlog
+        self.deadline = next_deadline
+        return next_deadline
+
+
+class RateStatus(enum.Enum):
+    """Where a RateController stands relative to its target."""
+
+    SETTLING = "settling"
+    LOCKED = "locked"            # Achieved rate within tolerance of the target
+    UNREACHABLE = "unreachable"  # Correction saturated and still too slow
+
+
+# RateController tuning. Errors are relative (0.01 == 1 % slow), so the same
+# gains work from 1 CPM to MAX_CPM.
+ADAPT_PERIOD = 0.25        # Seconds of ticks averaged per controller update
+ADAPT_KP = 0.6
+ADAPT_KI = 0.3
+ADAPT_TOLERANCE = 0.01     # |error| that counts as converged
+MIN_INTERVAL_FACTOR = 0.2  # Never command less than 20 % of the nominal interval
+UNREACHABLE_UPDATES = 8    # Saturated updates in a row before giving up
+
+
+class RateController:
+    """PI controller that scales the scheduler interval to hit a target rate.
+
+    The click loop reports every tick through :meth:`observe`. Every
+    ``period`` seconds the mean measured tick interval is compared with the
+    nominal one and :attr:`factor` (commanded / nominal interval) is
+    corrected, compensating for backend cost and missed deadlines the
+    scheduler alone cannot recover.
+    """
+
+    def __init__(self, period: float = ADAPT_PERIOD, kp: float = ADAPT_KP,
+                 ki: float = ADAPT_KI, tolerance: float = ADAPT_TOLERANCE,
+                 min_factor: float = MIN_INTERVAL_FACTOR):
+        self.period = period
+        self.kp = kp
+        self.ki = ki
+        self.tolerance = tolerance
+        self.min_factor = min_factor
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all history; call at the start of every run."""
+        self.factor = 1.0
+        self.error = 0.0        # Latest relative error, positive = too slow
+        self.status = RateStatus.SETTLING
+        self._integral = 0.0
+        self._saturated_updates = 0
+        self._window_start: float | None = None
+        self._window_ticks = 0
+        self._nominal = 0.0
+
+    def observe(self, now: float, nominal_interval: float) -> bool:
+        """Records a tick at ``now``; returns True if :attr:`factor` changed."""
+        if nominal_interval != self._nominal or self._window_start is None:
+            # New target (or first tick): restart the measurement window
+            self._nominal = nominal_interval
+            self._window_start = now
+            self._window_ticks = 0
+            return False
+        self._window_ticks += 1
+        elapsed = now - self._window_start
+        if elapsed < self.period:
+            return False
+        measured = elapsed / self._window_ticks
+        self._window_start = now
+        self._window_ticks = 0
+        self._update(measured / nominal_interval - 1.0)
+        return True
+
+    def _update(self, error: float) -> None:
+        self.error = error
+        correction = self.kp * error + self.ki * (self._integral + error)
+        factor = 1.0 - correction
+        if factor < self.min_factor:
+            # Saturated: clamp and stop integrating (anti-windup)
+            self.factor = self.min_factor
+            self._saturated_updates += 1 if error > self.tolerance else 0
+        else:
+            self.factor = min(factor, 1.0 / self.min_factor)
+            self._integral += error
+            self._saturated_updates = 0
+
+        if self._saturated_updates >= UNREACHABLE_UPDATES:
+            self.status = RateStatus.UNREACHABLE
+        elif abs(error) <= self.tolerance:
+            self.status = RateStatus.LOCKED
+        elif self.status is not RateStatus.LOCKED or abs(error) > 2 * self.tolerance:
+            # Small excursions out of tolerance don't flap the LOCKED status
+            self.status = RateStatus.SETTLING
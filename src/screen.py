@@ -0,0 +1,360 @@
+"""Screen-region triggers: click only while a region shows something.
+
+A RegionTrigger samples one rectangle of the screen at a fixed rate into a
+buffer allocated once, tests it with a condition and opens or closes a gate
+that ClickerThread checks before every tick (see ClickerThread.set_gate).
+
+Frames are BGRX, 4 bytes per pixel, as X11 delivers them. Conditions work
+on whole frames at once, so no Python code runs per pixel: a colour test
+pulls each channel out with an extended slice and maps it to 0/1 bytes with
+``bytes.translate``; frame-to-frame tests (template, change) do lane-wise
+arithmetic on the frames as big integers (see _count_near).
+
+Samplers:
+
+- XlibSampler: ``XGetSubImage`` (ctypes) straight into the reused buffer;
+  works under Xvfb
+- ReplaySampler: cycles through given frames, for tests and benchmarks
+"""
+import ctypes
+import ctypes.util
+import logging
+import threading
+import time
+from functools import lru_cache
+
+log = logging.getLogger("rich")
+
+DEFAULT_SAMPLE_HZ = 30
+DEFAULT_MIN_FRACTION = 0.5  # Share of the region's pixels that must match (colour/template)
+DEFAULT_CHANGE_FRACTION = 0.01  # Share of pixels that must differ from the last sample
+BYTES_PER_PIXEL = 4
+
+_ZPIXMAP = 2
+_ALL_PLANES = 0xFFFFFFFFFFFFFFFF
+
+
+class XlibSampler:
+    """Grabs a root-window rectangle with XGetSubImage into a reused buffer."""
+
+    def __init__(self, x, y, width, height, display_name=None):
+        x11_path = ctypes.util.find_library("X11")
+        if not x11_path:
+            raise OSError("Screen sampling requires libX11")
+        x11 = self._x11 = ctypes.CDLL(x11_path)
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_int,
+                                     ctypes.c_void_p, ctypes.c_uint, ctypes.c_uint, ctypes.c_int, ctypes.c_int]
+        x11.XCreateImage.restype = ctypes.c_void_p
+        x11.XGetSubImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+                                     ctypes.c_uint, ctypes.c_ulong, ctypes.c_int, ctypes.c_void_p,
+                                     ctypes.c_int, ctypes.c_int]
+        x11.XGetSubImage.restype = ctypes.c_void_p
+        x11.XDestroyImage.argtypes = [ctypes.c_void_p]
+
+        self._display = x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display_name or '(from $DISPLAY)'}")
+        screen = x11.XDefaultScreen(self._display)
+        depth = x11.XDefaultDepth(self._display, screen)
+        if depth not in (24, 32):
+            self.close()
+            raise OSError(f"Screen sampling needs a 24 or 32 bit display, not {depth} bit")
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.buffer = bytearray(width * height * BYTES_PER_PIXEL)
+        self._data = (ctypes.c_char * len(self.buffer)).from_buffer(self.buffer)
+        self._root = x11.XDefaultRootWindow(self._display)
+        # The XImage points at our buffer, so every grab lands in the same memory
+        self._image = x11.XCreateImage(self._display, x11.XDefaultVisual(self._display, screen), depth,
+                                       _ZPIXMAP, 0, ctypes.addressof(self._data), width, height, 32,
+                                       width * BYTES_PER_PIXEL)
+        if not self._image:
+            self.close()
+            raise OSError("XCreateImage failed")
+        self._get_sub_image = x11.XGetSubImage
+
+    def grab(self):
+        """Fills and returns :attr:`buffer`.
+
+        Raises:
+            OSError: If the rectangle is not on screen.
+        """
+        if not self._get_sub_image(self._display, self._root, self.x, self.y, self.width, self.height,
+                                   _ALL_PLANES, _ZPIXMAP, self._image, 0, 0):
+            raise OSError(f"Cannot read screen region {self.width}x{self.height}+{self.x}+{self.y}")
+        return self.buffer
+
+    def close(self):
+        if getattr(self, "_image", None):
+            # XDestroyImage frees the data too; it belongs to self.buffer
+            ctypes.c_void_p.from_address(self._image + 16).value = None  # XImage.data
+            self._x11.XDestroyImage(self._image)
+            self._image = None
+        if self._display:
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+class ReplaySampler:
+    """Returns the given BGRX frames in turn (no display needed)."""
+
+    def __init__(self, width, height, frames):
+        self.width, self.height = width, height
+        self.frames = [bytes(frame) for frame in frames]
+        if any(len(frame) != width * height * BYTES_PER_PIXEL for frame in self.frames):
+            raise ValueError(f"Every frame must be {width}x{height} BGRX")
+        self._index = 0
+
+    def grab(self):
+        frame = self.frames[self._index]
+        self._index = (self._index + 1) % len(self.frames)
+        return frame
+
+    def close(self):
+        pass
+
+
+def solid_frame(width, height, color):
+    """A BGRX frame filled with ``color`` (r, g, b)."""
+    r, g, b = color
+    return bytes((b, g, r, 0)) * (width * height)
+
+
+def _count_all(planes):
+    """Pixels whose byte is 1 in every 0/1 plane."""
+    combined = int.from_bytes(planes[0], "little")
+    for plane in planes[1:]:
+        combined &= int.from_bytes(plane, "little")
+    return combined.bit_count()
+
+
+def _widen(frame):
+    """The frame as one integer with each byte in its own 16-bit lane."""
+    wide = bytearray(2 * len(frame))
+    wide[0::2] = frame
+    return int.from_bytes(wide, "little")
+
+
+@lru_cache(maxsize=8)
+def _lane_constants(size, tolerance):
+    """Lane-wise constants for _count_near on frames of ``size`` bytes."""
+    def lanes(value):
+        return int.from_bytes(value.to_bytes(2, "little") * size, "little")
+    first_lane = int.from_bytes(b"\x01" + bytes(BYTES_PER_PIXEL * 2 - 1), "little")
+    return (lanes(0x100), lanes(tolerance), lanes(255 - tolerance), lanes(1),
+            int.from_bytes(first_lane.to_bytes(BYTES_PER_PIXEL * 2, "little") * (size // BYTES_PER_PIXEL), "little"))
+
+
+def _count_near(wide_frame, wide_reference, size, tolerance):
+    """Pixels whose B, G and R are all within ``tolerance`` of the reference.
+
+    Both frames are _widen()ed, so per-byte arithmetic can't carry between
+    lanes: a lane of (frame | 0x100) - reference holds a - b + 256, which is
+    within tolerance when adding ``tolerance`` reaches bit 8 or 9 and adding
+    ``255 - tolerance`` doesn't reach bit 9.
+    """
+    high, low_bound, high_bound, ones, pixel_lanes = _lane_constants(size, tolerance)
+    difference = (wide_frame | high) - wide_reference
+    low = difference + low_bound
+    near = ((low >> 8) | (low >> 9)) & ~((difference + high_bound) >> 9) & ones
+    return (near & (near >> 16) & (near >> 32) & pixel_lanes).bit_count()
+
+
+class ColorCondition:
+    """True when at least ``min_fraction`` of the pixels are within
+    ``tolerance`` (per channel) of ``color`` (r, g, b)."""
+
+    def __init__(self, color, tolerance=0, min_fraction=DEFAULT_MIN_FRACTION):
+        self.color = tuple(color)
+        self.tolerance = tolerance
+        self.min_fraction = min_fraction
+        # One 256-entry table per channel (B, G, R): value -> 1 if close enough
+        self._tables = [bytes(int(abs(value - target) <= tolerance) for value in range(256))
+                        for target in (self.color[2], self.color[1], self.color[0])]
+
+    def __call__(self, frame):
+        pixels = len(frame) // BYTES_PER_PIXEL
+        planes = [frame[c::4].translate(table) for c, table in enumerate(self._tables)]
+        return _count_all(planes) >= self.min_fraction * pixels
+
+
+class TemplateCondition:
+    """True when at least ``min_fraction`` of the pixels are within
+    ``tolerance`` of the same pixel of a BGRX ``template`` frame."""
+
+    def __init__(self, template, tolerance=0, min_fraction=DEFAULT_MIN_FRACTION):
+        self.template = bytes(template)
+        self.tolerance = tolerance
+        self.min_fraction = min_fraction
+        self._wide_template = _widen(self.template)
+
+    def __call__(self, frame):
+        if len(frame) != len(self.template):
+            raise ValueError("Template and sampled region differ in size")
+        pixels = len(frame) // BYTES_PER_PIXEL
+        if self.tolerance == 0 and self.min_fraction >= 1.0:
+            return frame == self.template  # memcmp
+        near = _count_near(_widen(frame), self._wide_template, len(frame), self.tolerance)
+        return near >= self.min_fraction * pixels
+
+
+class ChangeCondition:
+    """True when at least ``min_fraction`` of the pixels differ (beyond
+    ``tolerance``) from the previous sample. The first sample is False."""
+
+    def __init__(self, min_fraction=DEFAULT_CHANGE_FRACTION, tolerance=0):
+        self.min_fraction = min_fraction
+        self.tolerance = tolerance
+        self._previous = None
+        self._previous_wide = None
+
+    def __call__(self, frame):
+        frame = bytes(frame)  # The sampler reuses its buffer
+        previous, previous_wide = self._previous, self._previous_wide
+        self._previous, self._previous_wide = frame, None
+        if previous is None or frame == previous:  # memcmp
+            self._previous_wide = previous_wide
+            return False
+        pixels = len(frame) // BYTES_PER_PIXEL
+        self._previous_wide = wide = _widen(frame)
+        if previous_wide is None:
+            previous_wide = _widen(previous)
+        unchanged = _count_near(wide, previous_wide, len(frame), self.tolerance)
+        return pixels - unchanged >= self.min_fraction * pixels
+
+
+def load_ppm(path):
+    """Reads a binary PPM (P6, 8 bit) as ``(width, height, BGRX bytes)``.
+
+    Raises:
+        ValueError: If the file is not an 8-bit P6 image.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    fields = []
+    position = 0
+    while len(fields) < 4:  # Magic, width, height, maxval; '#' starts a comment
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b"#":
+            position = data.index(b"\n", position)
+            continue
+        end = position
+        while end < len(data) and not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[position:end])
+        position = end
+    if fields[0] != b"P6" or int(fields[3]) != 255:
+        raise ValueError(f"{path} is not an 8-bit binary PPM (P6)")
+    width, height = int(fields[1]), int(fields[2])
+    rgb = data[position + 1:position + 1 + 3 * width * height]
+    if len(rgb) != 3 * width * height:
+        raise ValueError(f"{path} is truncated")
+    frame = bytearray(width * height * BYTES_PER_PIXEL)
+    frame[0::4], frame[1::4], frame[2::4] = rgb[2::3], rgb[1::3], rgb[0::3]
+    return width, height, bytes(frame)
+
+
+class RegionTrigger(threading.Thread):
+    """Samples a region at ``rate`` Hz and keeps a gate open while the condition holds.
+
+    Pass :meth:`is_open` to ClickerThread.set_gate. ``on_change(is_open,
+    sampled_at)`` is called from this thread whenever the gate flips;
+    ``sampled_at`` is the perf_counter() at which the deciding sample began.
+    """
+
+    def __init__(self, sampler, condition, rate=DEFAULT_SAMPLE_HZ, on_change=None):
+        super().__init__(name="RegionTriggerThread", daemon=True)
+        self.sampler = sampler
+        self.condition = condition
+        self.period = 1.0 / rate
+        self.on_change = on_change
+        self.samples = 0
+        self.cpu_seconds = 0.0  # Thread CPU time spent grabbing and testing
+        self._open = False
+        self._stop_event = threading.Event()
+
+    def is_open(self):
+        return self._open
+
+    def run(self):
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            sampled_at = time.perf_counter()
+            cpu_started = time.thread_time()
+            try:
+                matched = bool(self.condition(self.sampler.grab()))
+            except (OSError, ValueError) as e:
+                log.error(f"Screen trigger stopped: {e}")
+                matched = False
+                self._stop_event.set()
+            self.cpu_seconds += time.thread_time() - cpu_started
+            self.samples += 1
+            if matched != self._open:
+                self._open = matched
+                if self.on_change is not None:
+                    self.on_change(matched, sampled_at)
+            next_sample += self.period
+            delay = next_sample - time.perf_counter()
+            if delay < 0:
+                next_sample = time.perf_counter()  # Fell behind: don't try to catch up
+            else:
+                self._stop_event.wait(delay)
+        self.sampler.close()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=2.0)
+        if self.samples:
+            log.info(f"Screen trigger: {self.samples} samples, "
+                     f"{self.cpu_seconds / self.samples * 1e6:.0f} us CPU per sample")
+
+
+def parse_trigger(spec):
+    """Builds ``(sampler, condition)`` from a command-line spec.
+
+    ``color:X,Y,WIDTH,HEIGHT,RRGGBB[,TOLERANCE[,FRACTION]]``,
+    ``change:X,Y,WIDTH,HEIGHT[,FRACTION]`` or
+    ``template:X,Y,FILE.ppm[,TOLERANCE[,FRACTION]]``.
+
+    Raises:
+        ValueError: If the spec is malformed.
+        OSError: If the screen cannot be sampled.
+    """
+    kind, _, params = spec.partition(":")
+    values = params.split(",")
+    required = {"color": 5, "change": 4, "template": 3}
+    if kind not in required:
+        raise ValueError(f"Unknown trigger '{kind}'. Choose from: {', '.join(required)}")
+    if len(values) < required[kind]:
+        raise ValueError(f"A {kind} trigger needs at least {required[kind]} parameters, got '{params}'")
+    if kind == "template":
+        x, y = int(values[0]), int(values[1])
+        width, height, template = load_ppm(values[2])
+        tolerance = int(values[3]) if len(values) > 3 else 0
+        fraction = float(values[4]) if len(values) > 4 else DEFAULT_MIN_FRACTION
+        return XlibSampler(x, y, width, height), TemplateCondition(template, tolerance, fraction)
+    x, y, width, height = (int(value) for value in values[:4])
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Region must not be empty: {width}x{height}")
+    if kind == "change":
+        fraction = float(values[4]) if len(values) > 4 else DEFAULT_CHANGE_FRACTION
+        return XlibSampler(x, y, width, height), ChangeCondition(fraction)
+    try:
+        color = bytes.fromhex(values[4])
+    except ValueError:
+        color = b""
+    if len(color) != 3:
+        raise ValueError(f"Colour must be RRGGBB, got '{values[4]}'")
+    tolerance = int(values[5]) if len(values) > 5 else 0
+    fraction = float(values[6]) if len(values) > 6 else DEFAULT_MIN_FRACTION
+    return XlibSampler(x, y, width, height), ColorCondition(color, tolerance, fraction)
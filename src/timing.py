@@ -0,0 +1,185 @@
+"""Click timing instrumentation.
+
+The click loop appends one entry per scheduler tick to a fixed-size ring of
+typed columns: no locks and no per-click allocation on the write side.
+Readers (GUI, logs, benchmarks) take a consistent snapshot on demand and
+compute rate and jitter figures from it. The ring can live in any writable
+buffer, including shared memory, so another process can read it.
+"""
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Literal, overload
+
+DEFAULT_RING_CAPACITY = 4096  # Must be a power of two
+_HEADER_FIELDS = 2  # total_ticks, total_clicks (uint64 each)
+DEFAULT_HISTOGRAM_BIN_MS = 0.25
+DEFAULT_HISTOGRAM_BINS = 16
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    """Rate and jitter figures over the ticks currently held in the ring."""
+
+    samples: int             # Intervals the figures are based on
+    achieved_cpm: float      # Clicks per minute actually delivered
+    target_cpm: float        # Clicks per minute requested for the latest tick
+    p50_error_ms: float      # Median |actual - target| tick interval
+    p99_error_ms: float
+    max_error_ms: float
+
+
+class ClickTimingRing:
+    """Single-writer ring buffer of click tick timestamps.
+
+    Only the click loop calls :meth:`record`; any thread may read. Each entry
+    holds the ``perf_counter()`` time of a tick, the cumulative click count
+    after it and the tick interval that was targeted. A target of ``0.0``
+    marks the first tick of a run, which has no meaningful predecessor.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY, buffer=None) -> None:
+        """
+        Args:
+            capacity: Number of ticks kept; must be a power of two.
+            buffer: Optional writable buffer of at least ``nbytes(capacity)``
+                bytes (e.g. ``SharedMemory.buf``). A private one is allocated
+                when omitted. Call :meth:`release` before freeing it.
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"Ring capacity must be a power of two, got {capacity}")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        view = memoryview(bytearray(self.nbytes(capacity)) if buffer is None else buffer)
+        column_bytes = 8 * capacity
+        offset = 8 * _HEADER_FIELDS
+        self._views = [view]
+        self._header = self._cast(view, 0, offset, "Q")
+        self._timestamps = self._cast(view, offset, column_bytes, "d")
+        self._click_totals = self._cast(view, offset + column_bytes, column_bytes, "Q")
+        self._targets = self._cast(view, offset + 2 * column_bytes, column_bytes, "d")
+
+    @staticmethod
+    def nbytes(capacity: int = DEFAULT_RING_CAPACITY) -> int:
+        """Size of the buffer a ring of ``capacity`` ticks needs."""
+        return 8 * (_HEADER_FIELDS + 3 * capacity)
+
+    @overload
+    def _cast(self, view: memoryview, start: int, length: int, typecode: Literal["Q"]) -> "memoryview[int]": ...
+    @overload
+    def _cast(self, view: memoryview, start: int, length: int, typecode: Literal["d"]) -> "memoryview[float]": ...
+
+    def _cast(self, view, start, length, typecode):
+        column = view[start:start + length].cast(typecode)
+        self._views.append(column)
+        return column
+
+    def release(self) -> None:
+        """Drops all views of the backing buffer (required before closing shared memory)."""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+
+    @property
+    def total_ticks(self) -> int:
+        """Ticks recorded so far. Published last by record(); readers load it first."""
+        return self._header[0]
+
+    @property
+    def total_clicks(self) -> int:
+        return self._header[1]
+
+    def record(self, timestamp: float, clicks: int, target_interval: float) -> None:
+        """Appends one tick. Must only be called from the click loop."""
+        header = self._header
+        ticks = header[0]
+        slot = ticks & self._mask
+        total_clicks = header[1] + clicks
+        header[1] = total_clicks
+        self._timestamps[slot] = timestamp
+        self._click_totals[slot] = total_clicks
+        self._targets[slot] = target_interval
+        header[0] = ticks + 1
+
+    def snapshot(self, max_ticks: int | None = None) -> tuple[array, array, array]:
+        """Copies the most recent ticks, oldest first.
+
+        Entries the writer may have overwritten while copying are dropped, so
+        the result is always internally consistent without taking a lock.
+
+        Returns:
+            ``(timestamps, click_totals, target_intervals)`` arrays.
+        """
+        end = self.total_ticks
+        count = min(end, self.capacity - 1 if max_ticks is None else min(max_ticks, self.capacity - 1))
+        start = end - count
+        first, last = start & self._mask, end & self._mask
+        columns = []
+        for column in (self._timestamps, self._click_totals, self._targets):
+            copy = array(column.format)
+            if count and first < last:
+                copy.frombytes(column[first:last].cast("B"))
+            elif count:
+                copy.frombytes(column[first:].cast("B"))
+                copy.frombytes(column[:last].cast("B"))
+            columns.append(copy)
+        # Anything older than the writer's position minus capacity was clobbered
+        overwritten = max(0, self.total_ticks - self.capacity - start + 1)
+        if overwritten:
+            columns = [column[overwritten:] for column in columns]
+        return columns[0], columns[1], columns[2]
+
+    def intervals(self, max_ticks: int | None = None) -> list[tuple[float, float]]:
+        """Returns ``(actual, target)`` tick interval pairs within runs, in seconds."""
+        timestamps, _, targets = self.snapshot(max_ticks)
+        return [(timestamps[i] - timestamps[i - 1], targets[i])
+                for i in range(1, len(timestamps)) if targets[i] > 0.0]
+
+    def stats(self, max_ticks: int | None = None) -> TimingStats:
+        """Computes achieved CPM and interval-error percentiles."""
+        timestamps, click_totals, targets = self.snapshot(max_ticks)
+        pairs = [(timestamps[i] - timestamps[i - 1], targets[i])
+                 for i in range(1, len(timestamps)) if targets[i] > 0.0]
+        errors = sorted(abs(actual - target) * 1000.0 for actual, target in pairs)
+
+        # Rate over the latest run only: ticks since the last run-start marker
+        achieved_cpm = 0.0
+        run_start = next((i for i in range(len(targets) - 1, -1, -1) if targets[i] == 0.0), 0)
+        span = timestamps[-1] - timestamps[run_start] if timestamps else 0.0
+        if span > 0:
+            achieved_cpm = (click_totals[-1] - click_totals[run_start]) * 60.0 / span
+        target = targets[-1] if targets and targets[-1] > 0.0 else 0.0
+        clicks_per_tick = (click_totals[-1] - click_totals[-2]) if len(click_totals) > 1 else 1
+        target_cpm = clicks_per_tick * 60.0 / target if target else 0.0
+
+        return TimingStats(
+            samples=len(errors),
+            achieved_cpm=achieved_cpm,
+            target_cpm=target_cpm,
+            p50_error_ms=percentile(errors, 50),
+            p99_error_ms=percentile(errors, 99),
+            max_error_ms=errors[-1] if errors else 0.0,
+        )
+
+    def histogram(self, bin_ms: float = DEFAULT_HISTOGRAM_BIN_MS,
+                  bins: int = DEFAULT_HISTOGRAM_BINS,
+                  max_ticks: int | None = None) -> list[int]:
+        """Buckets signed interval errors (actual - target) into ``bins`` bins.
+
+        Bins are ``bin_ms`` wide and centred on zero; the outermost bins also
+        collect everything beyond them.
+        """
+        counts = [0] * bins
+        offset = bins / 2
+        for actual, target in self.intervals(max_ticks):
+            index = math.floor((actual - target) * 1000.0 / bin_ms + offset)
+            counts[min(bins - 1, max(0, index))] += 1
+        return counts
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(percent / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[rank]
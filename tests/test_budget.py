@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+
+import pytest
+
+from backends import RecordingBackend
+from engine import MAX_CPM, ClickerThread
+from scheduler import CatchUpPolicy
+
+INTERVAL = 60.0 / MAX_CPM
+
+
+class Run:
+    """A ClickerThread at MAX_CPM on a recording backend, recording how runs end."""
+
+    def __init__(self, clicks=None, seconds=None, burst=1, gate=None):
+        self.backend = RecordingBackend()
+        # Catch-up, so a late wakeup on a busy machine can't drop a deadline and change the count
+        self.clicker = ClickerThread(backend=self.backend, catch_up_policy=CatchUpPolicy.CATCH_UP)
+        self.clicker.set_speed(MAX_CPM)
+        self.clicker.set_burst(burst)
+        if clicks is not None or seconds is not None:
+            self.clicker.set_budget(clicks, seconds)
+        if gate is not None:
+            self.clicker.set_gate(gate)
+        self.reasons = []
+        self.ended_at = None
+        self.finished = threading.Event()
+        self.clicker.on_finished = self._on_finished
+        self.clicker.start()
+
+    def _on_finished(self, reason):
+        self.reasons.append(reason)
+        self.ended_at = time.perf_counter()
+        self.finished.set()
+
+    def wait_for_clicks(self, count, timeout=10.0):
+        deadline = time.perf_counter() + timeout
+        while self.backend.count < count:
+            assert time.perf_counter() < deadline, f"only {self.backend.count} of {count} clicks"
+            time.sleep(0.001)
+
+    def finish(self, timeout=10.0):
+        assert self.finished.wait(timeout), "run never finished"
+        time.sleep(0.05)  # Anything sent after the switch-off would show up here
+        self.clicker.stop()
+        self.clicker.join()
+
+
+@pytest.mark.parametrize("burst", [1, 3, 7])
+def test_click_budget_is_exact(burst):
+    run = Run(clicks=250, burst=burst)
+    run.clicker.set_active(True)
+    run.finish()
+    assert run.backend.count == 250
+    assert run.clicker.run_clicks_sent == 250
+    assert run.reasons == ["clicks"]
+    assert not run.clicker.settings()[0]
+
+
+def test_time_budget_stops_before_the_limit():
+    seconds = 0.3
+    run = Run(seconds=seconds)
+    run.clicker.set_active(True)
+    run.finish()
+    stamps = run.backend.recorded()
+    assert run.backend.count == math.ceil(seconds / INTERVAL - 1e-9)
+    assert stamps[-1] - stamps[0] < seconds
+    assert run.reasons == ["duration"]
+
+
+def test_reactivation_starts_a_fresh_run():
+    run = Run(clicks=20)
+    for _ in range(2):
+        run.finished.clear()
+        run.clicker.set_active(True)
+        assert run.finished.wait(10.0)
+    run.finish()
+    assert run.backend.count == 40
+    assert run.reasons == ["clicks", "clicks"]
+
+
+def test_gate_reopening_continues_the_run():
+    gate_open = threading.Event()
+    gate_open.set()
+    run = Run(clicks=200, gate=gate_open.is_set)
+    run.clicker.set_active(True)
+    run.wait_for_clicks(50)
+    gate_open.clear()
+    run.clicker.gate_changed()
+    time.sleep(0.02)
+    paused_at = run.backend.count
+    time.sleep(0.1)
+    assert run.backend.count == paused_at  # Nothing fires while gated
+    gate_open.set()
+    run.clicker.gate_changed(time.perf_counter())
+    run.finish()
+    assert run.backend.count == 200  # The budget covers the clicks before the gate closed
+    assert run.reasons == ["clicks"]
+
+
+def test_time_budget_runs_on_while_gated():
+    gate_open = threading.Event()
+    gate_open.set()
+    run = Run(seconds=0.3, gate=gate_open.is_set)
+    run.clicker.set_active(True)
+    run.wait_for_clicks(10)
+    gate_open.clear()
+    run.clicker.gate_changed()
+    run.finish()
+    assert run.reasons == ["duration"]
+    assert 0.3 <= run.ended_at - run.clicker.run_started_at < 0.4  # Switched off while still gated
+
+
+def test_lowering_the_click_budget_ends_the_run():
+    run = Run()
+    run.clicker.set_active(True)
+    run.wait_for_clicks(50)
+    run.clicker.set_budget(clicks=10)
+    run.finish()
+    sent = run.backend.count
+    time.sleep(0.05)
+    assert run.backend.count == sent
+    assert run.reasons == ["clicks"]
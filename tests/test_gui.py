@@ -0,0 +1,31 @@
+import os
+from unittest import mock
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+pytest.importorskip("pynput.keyboard", reason="pynput needs a display or input permissions", exc_type=ImportError)
+
+import engine
+import main
+from backends import RecordingBackend
+
+
+@pytest.fixture
+def window():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with mock.patch.object(engine, "PynputBackend", RecordingBackend):  # Never touch the real mouse
+        window = main.MilkyClickerApp()
+    yield window
+    window.close_app()
+    app.processEvents()
+
+
+def test_socket_speed_moves_the_slider_for_the_step_buttons(window):
+    window.toggle_expand()  # The step buttons live in the expanded panel
+    window.control_change_signal.emit("speed", 5000)
+    window.speed_increase_button.click()
+    expected = 5000 + window.calculate_step(5000)
+    assert window.speed_slider.value() == expected
+    assert window.clicker_thread.settings()[1] == expected
@@ -0,0 +1,27 @@
+import math
+
+import pytest
+
+from jitter import DISTRIBUTIONS, JitterTable
+
+
+def factors(count, **kwargs):
+    table = JitterTable(block_size=256, **kwargs)
+    try:
+        return [table.next() for _ in range(count)]
+    finally:
+        table.close()
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+def test_seed_reproduces_factors_across_block_swaps(distribution):
+    first = factors(1000, distribution=distribution, seed=42)
+    assert factors(1000, distribution=distribution, seed=42) == first
+    assert factors(1000, distribution=distribution, seed=43) != first
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+def test_every_block_keeps_the_mean_interval(distribution):
+    samples = factors(1024, distribution=distribution, spread=0.3, seed=1)
+    for start in range(0, len(samples), 256):
+        assert math.fsum(samples[start:start + 256]) / 256 == pytest.approx(1.0, abs=1e-12)
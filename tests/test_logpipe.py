@@ -0,0 +1,43 @@
+import logging
+import time
+
+from logpipe import LogPipeline
+
+
+def record(message, level=logging.ERROR):
+    return logging.makeLogRecord({"name": "rich", "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": message})
+
+
+def test_summary_appears_when_a_burst_stops():
+    pipeline = LogPipeline(logging.NullHandler(), dedup_window=0.1)
+    pipeline.listener.start()  # Not installed: the test's own logging stays untouched
+    try:
+        for _ in range(50):
+            pipeline.handler.handle(record("Clicking error: boom"))
+        deadline = time.monotonic() + 2.0
+        lines = []
+        while time.monotonic() < deadline:
+            _, lines = pipeline.ring.since(0)
+            if len(lines) == 2:
+                break
+            time.sleep(0.01)
+        assert len(lines) == 2
+        assert lines[0].endswith("Clicking error: boom")
+        assert lines[1].endswith("Clicking error: boom (x49 more in 0s)")
+    finally:
+        pipeline.listener.stop()
+
+
+def test_distinct_records_pass_straight_through():
+    pipeline = LogPipeline(logging.NullHandler(), dedup_window=10.0)
+    pipeline.listener.start()
+    try:
+        for i in range(3):
+            pipeline.handler.handle(record(f"error {i}"))
+        pipeline.handler.handle(record("info", logging.INFO))
+        pipeline.handler.handle(record("info", logging.INFO))
+    finally:
+        pipeline.listener.stop()
+    _, lines = pipeline.ring.since(0)
+    assert len(lines) == 5
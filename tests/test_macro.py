@@ -0,0 +1,40 @@
+from array import array
+
+import pytest
+
+from macro import EVENT_BUTTON_DOWN, EVENT_BUTTON_UP, EVENT_MOVE, Macro
+
+
+def sample_macro():
+    return Macro(array("d", [0.0, 0.5, 0.6]), array("i", [10, 10, 10]), array("i", [20, 20, 20]),
+                 array("i", [0, 0, 0]), array("B", [EVENT_MOVE, EVENT_BUTTON_DOWN, EVENT_BUTTON_UP]),
+                 key_names=["shift"])
+
+
+def test_saved_macro_loads_back(tmp_path):
+    path = tmp_path / "clicks.mlkm"
+    sample_macro().save(path)
+    loaded = Macro.load(path)
+    try:
+        assert list(loaded.times) == [0.0, 0.5, 0.6]
+        assert list(loaded.kinds) == [EVENT_MOVE, EVENT_BUTTON_DOWN, EVENT_BUTTON_UP]
+        assert loaded.key_names == ["shift"]
+    finally:
+        loaded.close()
+
+
+@pytest.mark.parametrize("cut", [1, 8, 20])
+def test_truncated_file_raises_value_error(tmp_path, cut):
+    path = tmp_path / "clicks.mlkm"
+    sample_macro().save(path)
+    data = path.read_bytes()
+    path.write_bytes(data[:-cut])
+    with pytest.raises(ValueError, match="truncated"):
+        Macro.load(path)
+
+
+def test_other_file_raises_value_error(tmp_path):
+    path = tmp_path / "notes.mlkm"
+    path.write_bytes(b"not a macro recording at all, just some text")
+    with pytest.raises(ValueError):
+        Macro.load(path)
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from backends import NullBackend
+from multiclick import MultiClicker
+
+
+class RetuningBackend(NullBackend):
+    """Retunes the job from inside its first click, as a GUI thread might."""
+
+    def __init__(self):
+        super().__init__()
+        self.clicker = None
+        self.job_id = None
+        self.first_click = threading.Event()
+
+    def click(self, button, count):
+        super().click(button, count)
+        if not self.first_click.is_set():
+            self.clicker.retune_job(self.job_id, cpm=120)
+            self.first_click.set()
+
+
+def test_retune_while_firing_does_not_fire_again():
+    backend = RetuningBackend()
+    clicker = MultiClicker(backend=backend)
+    backend.clicker = clicker
+    backend.job_id = clicker.add_job(60)
+    clicker.start()
+    clicker.set_active(True)
+    assert backend.first_click.wait(5.0)
+    time.sleep(0.3)  # The next deadline is half a second after the first click
+    clicker.stop()
+    clicker.join()
+    assert clicker.jobs()[backend.job_id][4] == 1
+    assert backend.clicks == 1
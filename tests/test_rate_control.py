@@ -0,0 +1,45 @@
+import itertools
+
+import pytest
+
+from scheduler import ADAPT_TOLERANCE, RateController, RateStatus
+
+NOMINAL = 0.005  # 12000 CPM
+
+
+def drive(controller, tick_cost, seconds):
+    """Feeds the controller ticks on a simulated clock, each lasting
+    ``tick_cost(commanded interval)``; returns the relative error of the last update."""
+    now = 0.0
+    while now < seconds:
+        controller.observe(now, NOMINAL)
+        now += tick_cost(NOMINAL * controller.factor)
+    return controller.error
+
+
+def test_fixed_overhead_converges_and_locks():
+    controller = RateController()
+    error = drive(controller, lambda commanded: commanded + 0.0005, 10.0)
+    assert abs(error) <= ADAPT_TOLERANCE
+    assert controller.status is RateStatus.LOCKED
+    assert controller.factor == pytest.approx(0.9, abs=0.01)
+
+
+def test_slow_clicks_are_recovered_between_fast_ones():
+    costs = [0.002, 0.008]  # Every other click overruns the nominal interval
+    ticks = itertools.count()
+
+    def tick_cost(commanded):
+        return max(commanded, costs[next(ticks) % 2])
+
+    controller = RateController()
+    error = drive(controller, tick_cost, 20.0)
+    assert abs(error) <= ADAPT_TOLERANCE
+    assert controller.status is RateStatus.LOCKED
+
+
+def test_backend_slower_than_target_is_unreachable():
+    controller = RateController()
+    drive(controller, lambda commanded: max(commanded, 0.008), 10.0)
+    assert controller.status is RateStatus.UNREACHABLE
+    assert controller.factor == controller.min_factor